@@ -0,0 +1,281 @@
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import tempfile
+import time
+import faiss
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from common.logger_common import Logger
+from common.faiss_common import MuseFaiss
+from benchmark.catalog import SnapshotCatalog, SyntheticCatalog
+
+class FaissBenchmark:
+    """
+    합성 카탈로그로 배치 MuseFaiss(IVFPQ + HNSW quantizer) 인덱스를 구축하고
+    latency(p50/p99), thread 수별 QPS, recall@k를 측정하여 JSON으로 저장
+    """
+
+    @staticmethod
+    def build(catalog, train_ratio=0.05, nlist=None, store=None, factory=None):
+        """
+        muse.py train_faiss / add_faiss와 같은 방식 (학습 샘플 5%, nlist = sqrt(학습 벡터 수))
+        factory는 train_faiss --factory와 같은 index_factory 표기 (없으면 기본 IVF{nlist}_HNSW32,PQ16x8)
+        store가 있으면 build_vector_store와 같이 float16 사본도 FAISS id 순서로 채움
+        """
+        train_size = max(int(catalog.n * train_ratio), 10000)
+        nlist = nlist or int(math.sqrt(train_size))
+
+        muse_faiss = MuseFaiss(d=catalog.d)
+        muse_faiss.set_index(nlist=nlist, factory=factory)
+
+        start = time.time()
+        muse_faiss.train(vectors=catalog.draw(train_size, stream=2))
+        train_sec = time.time() - start
+        logging.info(f'''TRAIN COMPLETE: {muse_faiss.factory}, {train_size} vectors, {train_sec:.1f}s''')
+
+        start = time.time()
+        for offset, vectors in catalog.iter_chunks():
+            muse_faiss.add(vectors=vectors)
+            if store is not None:
+                store[offset:offset + len(vectors)] = vectors
+            logging.info(f'''ADD COMPLETE: {offset + len(vectors)} / {catalog.n}''')
+        add_sec = time.time() - start
+
+        # 서버가 로드하는 파일 크기 (quantizer / pre-transform 포함)
+        with tempfile.NamedTemporaryFile(suffix='.index') as f:
+            muse_faiss.write_index(f.name)
+            index_bytes = os.path.getsize(f.name)
+
+        return muse_faiss, {
+            'index': muse_faiss.factory,
+            'nlist': muse_faiss.nlist(),
+            'train_size': train_size,
+            'train_sec': round(train_sec, 2),
+            'add_sec': round(add_sec, 2),
+            'add_vectors_per_sec': round(catalog.n / add_sec, 1) if add_sec else None,
+            # 벡터 코드 + id (invlist 오버헤드, quantizer 제외)
+            'code_bytes': muse_faiss.code_bytes(),
+            'index_bytes': index_bytes
+        }
+
+    @staticmethod
+    def ground_truth(catalog, queries, k):
+        """카탈로그 chunk를 재생성하며 exact L2 top-k 계산"""
+        heap = faiss.ResultHeap(nq=len(queries), k=k)
+        for offset, vectors in catalog.iter_chunks():
+            D, I = faiss.knn(queries, vectors, min(k, len(vectors)))
+            heap.add_result(D, I + offset)
+        heap.finalize()
+        return heap.I
+
+    @staticmethod
+    def recall_at_k(I, gt_I, k):
+        hits = 0
+        for found, truth in zip(I, gt_I):
+            hits += len(set(found[:k]) & set(truth[:k]))
+        return hits / (len(gt_I) * k)
+
+    @staticmethod
+    def run_search(muse_faiss, queries, k, nprobe, efSearch, threads):
+        """
+        서버와 같은 방식(요청당 단일 쿼리 검색을 여러 스레드에서 동시 실행)으로 측정
+        OMP 스레드는 1로 고정하여 Python 스레드 수에 따른 확장성만 봄
+        """
+        latencies = np.zeros(len(queries))
+        I = np.empty((len(queries), k), dtype='int64')
+
+        def _search(q):
+            start = time.perf_counter()
+            _, I_q = muse_faiss.search_with_params(queries[q:q + 1], k, nprobe=nprobe, efSearch=efSearch)
+            latencies[q] = (time.perf_counter() - start) * 1000
+            I[q] = I_q[0]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(_search, range(len(queries))))
+        elapsed = time.perf_counter() - start
+
+        return I, {
+            'nprobe': nprobe,
+            'efSearch': efSearch,
+            'threads': threads,
+            'qps': round(len(queries) / elapsed, 1),
+            'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+            'p99_ms': round(float(np.percentile(latencies, 99)), 3)
+        }
+
+    @staticmethod
+    def run_refine(muse_faiss, store, queries, k, nprobe, efSearch, factor):
+        """
+        서버 MuseRefine과 같은 2단계 검색: k * factor개 후보를 IVFPQ로 찾고 float16 사본의 exact L2로 재정렬
+        단일 스레드 기준 latency (FAISS 검색 + 재정렬)
+        """
+        latencies = np.zeros(len(queries))
+        I = np.full((len(queries), k), -1, dtype='int64')
+        for q in range(len(queries)):
+            start = time.perf_counter()
+            _, I_q = muse_faiss.search_with_params(queries[q:q + 1], k * factor, nprobe=nprobe, efSearch=efSearch)
+            ids = I_q[0][I_q[0] >= 0]
+            ids.sort()
+            diff = store[ids].astype('float32') - queries[q]
+            order = np.argsort(np.einsum('ij,ij->i', diff, diff), kind='stable')[:k]
+            latencies[q] = (time.perf_counter() - start) * 1000
+            I[q, :len(order)] = ids[order]
+
+        return I, {
+            'nprobe': nprobe,
+            'efSearch': efSearch,
+            'refine_factor': factor,
+            'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+            'p99_ms': round(float(np.percentile(latencies, 99)), 3)
+        }
+
+    @staticmethod
+    def search_settings(muse_faiss, nprobe_list, efsearch_list):
+        """(nprobe, efSearch) 조합, IVF가 아닌 인덱스는 nprobe 없이 efSearch만"""
+        nlist = muse_faiss.nlist()
+        if nlist is None:
+            return [(None, efSearch) for efSearch in efsearch_list]
+        return [
+            (nprobe, efSearch)
+            for efSearch in efsearch_list
+            for nprobe in nprobe_list
+            if nprobe <= nlist and (efSearch is None or efSearch >= nprobe)
+        ]
+
+    @staticmethod
+    def summarize(config, k, target_recall):
+        """구성별 메모리 / 빌드 시간과 target_recall을 만족하는 가장 빠른 단일 스레드 설정 (없으면 최고 recall)"""
+        single = [result for result in config['search'] if result['threads'] == min(r['threads'] for r in config['search'])]
+        passed = [result for result in single if result[f'recall@{k}'] >= target_recall]
+        best = min(passed, key=lambda r: r['p50_ms']) if passed else max(single, key=lambda r: r[f'recall@{k}'], default=None)
+        build = config['build']
+        return {
+            'index': build['index'],
+            'index_bytes': build['index_bytes'],
+            'code_bytes': build['code_bytes'],
+            'build_sec': round(build['train_sec'] + build['add_sec'], 2),
+            'target_recall': target_recall,
+            'met_target': bool(passed),
+            'nprobe': best['nprobe'] if best else None,
+            'efSearch': best['efSearch'] if best else None,
+            'p50_ms': best['p50_ms'] if best else None,
+            'p99_ms': best['p99_ms'] if best else None,
+            f'recall@{k}': best[f'recall@{k}'] if best else None
+        }
+
+    @staticmethod
+    def run(catalog, nq=1000, k=100, nprobe_list=(16, 64, 256), efsearch_list=(None,), thread_list=(1, 2, 4, 8, 16), nlist=None, refine_list=(), factory_list=(None,), target_recall=0.9):
+        queries = catalog.draw(nq, stream=3)
+        start = time.time()
+        gt_I = FaissBenchmark.ground_truth(catalog, queries, k)
+        logging.info(f'''GROUND TRUTH COMPLETE: {time.time() - start:.1f}s''')
+
+        # refine 측정 시 float16 사본 (n * d * 2 byte)을 메모리에 유지, 첫 구성 빌드 때 한 번만 채움
+        store = np.empty((catalog.n, catalog.d), dtype='float16') if refine_list else None
+
+        configs = []
+        for config_no, factory in enumerate(factory_list):
+            faiss.omp_set_num_threads(os.cpu_count() or 1)
+            muse_faiss, build_info = FaissBenchmark.build(catalog, nlist=nlist, store=store if config_no == 0 else None, factory=factory)
+            settings = FaissBenchmark.search_settings(muse_faiss, nprobe_list, efsearch_list)
+
+            faiss.omp_set_num_threads(1)
+            search_results = []
+            for nprobe, efSearch in settings:
+                recall = None
+                for threads in thread_list:
+                    I, result = FaissBenchmark.run_search(muse_faiss, queries, k, nprobe, efSearch, threads)
+                    # recall은 스레드 수와 무관하므로 한 번만 계산
+                    if recall is None:
+                        recall = round(FaissBenchmark.recall_at_k(I, gt_I, k), 4)
+                    result[f'recall@{k}'] = recall
+                    logging.info(f'''SEARCH {build_info['index']} {result}''')
+                    search_results.append(result)
+
+            refine_results = []
+            for nprobe, efSearch in settings:
+                for factor in refine_list:
+                    I, result = FaissBenchmark.run_refine(muse_faiss, store, queries, k, nprobe, efSearch, factor)
+                    result[f'recall@{k}'] = round(FaissBenchmark.recall_at_k(I, gt_I, k), 4)
+                    logging.info(f'''REFINE {build_info['index']} {result}''')
+                    refine_results.append(result)
+
+            configs.append({'build': build_info, 'search': search_results, 'refine': refine_results})
+            del muse_faiss
+
+        return {
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'env': {
+                'faiss': faiss.__version__,
+                'numpy': np.__version__,
+                'cpu_count': os.cpu_count(),
+                'machine': platform.machine()
+            },
+            'catalog': catalog.info(),
+            'nq': nq,
+            'k': k,
+            'summary': [FaissBenchmark.summarize(config, k, target_recall) for config in configs],
+            'configs': configs
+        }
+
+def _int_list(value):
+    return [int(v) for v in value.split(',') if v]
+
+def _factory_list(value):
+    # index_factory 표기에 ','가 들어가므로 구성 구분은 ';', 'default'는 기본 구성
+    return [None if spec.strip() == 'default' else spec.strip() for spec in value.split(';') if spec.strip()]
+
+if __name__ == "__main__":
+    # 사용 예) cd batch && python -m benchmark.bench_faiss --n 1000000 --d 1024 --output ./bench/bgem3_1m.json
+    #         cd batch && python -m benchmark.bench_faiss --snapshot ./snapshot/bgem3_song_name --output ./bench/song_name.json
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n', type=int, default=None, help='catalog size (1000000 ~ 40000000), with --snapshot: first n rows (default all)')
+    parser.add_argument('--d', type=int, default=None, help='dimension (bgem3: 1024, clap: 512), ignored with --snapshot')
+    parser.add_argument('--snapshot', type=str, default=None, help='benchmark on a local snapshot (export_snapshot) instead of the synthetic catalog')
+    parser.add_argument('--output', type=str, required=True, help='result json path')
+    parser.add_argument('--nq', type=int, default=1000, help='number of queries')
+    parser.add_argument('--k', type=int, default=100, help='recall@k')
+    parser.add_argument('--nlist', type=int, default=None, help='default: sqrt(5%% of n)')
+    parser.add_argument('--nprobe', type=_int_list, default=[16, 64, 256], help='comma separated nprobe list')
+    parser.add_argument('--efsearch', type=_int_list, default=[], help='comma separated HNSW quantizer efSearch list')
+    parser.add_argument('--threads', type=_int_list, default=[1, 2, 4, 8, 16], help='comma separated thread counts')
+    parser.add_argument('--refine', type=_int_list, default=[], help='comma separated refine factors (k * factor candidates, float16 exact re-rank)')
+    parser.add_argument('--factory', type=_factory_list, default=[None], help="';' separated index_factory specs ({nlist} placeholder, 'default' = IVF{nlist}_HNSW32,PQ16x8)")
+    parser.add_argument('--target_recall', type=float, default=0.9, help='recall target of summary')
+    parser.add_argument('--clusters', type=int, default=4096, help='number of synthetic clusters')
+    parser.add_argument('--cluster_std', type=float, default=0.5, help='noise norm around cluster centers')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if not args.snapshot and (not args.n or not args.d):
+        parser.error('--n and --d are required without --snapshot')
+
+    if args.snapshot:
+        catalog = SnapshotCatalog(args.snapshot, n=args.n, seed=args.seed)
+    else:
+        catalog = SyntheticCatalog(n=args.n, d=args.d, n_clusters=args.clusters, cluster_std=args.cluster_std, seed=args.seed)
+    Logger.set_logger(log_path='./logs/bench_faiss', file_name=f'''bench_{catalog.d}_{catalog.n}.log''')
+    report = FaissBenchmark.run(
+        catalog,
+        nq=args.nq,
+        k=args.k,
+        nprobe_list=args.nprobe,
+        efsearch_list=args.efsearch or [None],
+        thread_list=args.threads,
+        nlist=args.nlist,
+        refine_list=args.refine,
+        factory_list=args.factory,
+        target_recall=args.target_recall
+    )
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    logging.info(f'''BENCHMARK SAVED: {args.output}''')
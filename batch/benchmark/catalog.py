@@ -0,0 +1,113 @@
+import json
+import numpy as np
+
+class SyntheticCatalog:
+    """
+    운영 임베딩과 비슷한 군집 구조를 가진 float32 합성 카탈로그
+
+    - 단위 벡터 중심 n_clusters개 + 군집별 가우시안 노이즈 후 L2 정규화 (bgem3/CLAP 출력과 동일하게 정규화)
+    - 군집 크기는 Zipf 분포 (인기 장르/아티스트에 곡이 몰리는 분포)
+    - chunk 단위로 시드를 고정해 생성하므로 4000만개도 메모리에 올리지 않고 add / ground truth 계산 시 동일하게 재생성
+    """
+
+    def __init__(self, n, d, n_clusters=4096, cluster_std=0.5, zipf=1.1, seed=0, chunk_size=100000):
+        self.n = n
+        self.d = d
+        self.n_clusters = n_clusters
+        self.cluster_std = cluster_std
+        self.zipf = zipf
+        self.seed = seed
+        self.chunk_size = chunk_size
+
+        rng = np.random.default_rng([seed, 0])
+        self.centers = self._normalize(rng.standard_normal((n_clusters, d), dtype=np.float32))
+        weights = 1.0 / np.arange(1, n_clusters + 1) ** zipf
+        rng.shuffle(weights)
+        self.weights = weights / weights.sum()
+
+    @staticmethod
+    def _normalize(x):
+        return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+    def _generate(self, rng, size):
+        assign = rng.choice(self.n_clusters, size=size, p=self.weights)
+        # 차원별 표준편차를 cluster_std / sqrt(d)로 두어 노이즈 norm이 차원과 무관하게 cluster_std 근처가 되도록 함
+        noise = rng.standard_normal((size, self.d), dtype=np.float32) * (self.cluster_std / np.sqrt(self.d))
+        return self._normalize(self.centers[assign] + noise).astype('float32')
+
+    def num_chunks(self):
+        return (self.n + self.chunk_size - 1) // self.chunk_size
+
+    def chunk(self, chunk_no):
+        """chunk_no번째 카탈로그 벡터 (FAISS id = chunk_no * chunk_size부터)"""
+        size = min(self.chunk_size, self.n - chunk_no * self.chunk_size)
+        return self._generate(np.random.default_rng([self.seed, 1, chunk_no]), size)
+
+    def iter_chunks(self):
+        for chunk_no in range(self.num_chunks()):
+            yield chunk_no * self.chunk_size, self.chunk(chunk_no)
+
+    def draw(self, size, stream):
+        """카탈로그와 같은 분포의 별도 샘플 (학습 벡터: stream=2, 쿼리: stream=3)"""
+        return self._generate(np.random.default_rng([self.seed, stream]), size)
+
+    def info(self):
+        return {
+            'n': self.n,
+            'd': self.d,
+            'n_clusters': self.n_clusters,
+            'cluster_std': self.cluster_std,
+            'zipf': self.zipf,
+            'seed': self.seed
+        }
+
+
+class SnapshotCatalog:
+    """
+    export_snapshot으로 만든 로컬 스냅샷(운영 임베딩)을 SyntheticCatalog와 같은 방식으로 제공
+
+    - shard를 mmap으로 열어 chunk_size씩 읽으므로 카탈로그 전체를 메모리에 올리지 않음 (DB 접속 없음)
+    - FAISS id = 스냅샷 전체 row 번호 (DB idx - 1과 달리 삭제된 idx는 건너뜀)
+    - 학습 벡터 / 쿼리는 카탈로그 row를 무작위로 선택 (쿼리 자신이 정답 1위에 포함)
+    """
+
+    def __init__(self, path, n=None, seed=0, chunk_size=100000):
+        with open(f'{path}/manifest.json', 'r') as f:
+            self.manifest = json.load(f)
+        self.path = path
+        self.shards = [np.load(f'{path}/{shard["name"]}.npy', mmap_mode='r') for shard in self.manifest['shards']]
+        self.offsets = np.cumsum([0] + [len(shard) for shard in self.shards])
+        self.n = min(n, int(self.offsets[-1])) if n else int(self.offsets[-1])
+        self.d = self.manifest['d']
+        self.seed = seed
+        self.chunk_size = chunk_size
+
+    def rows(self, positions):
+        """전체 row 번호 목록 → float32 벡터 (shard별로 모아서 읽음)"""
+        positions = np.asarray(positions)
+        vectors = np.empty((len(positions), self.d), dtype='float32')
+        shard_no = np.searchsorted(self.offsets, positions, side='right') - 1
+        for no in np.unique(shard_no):
+            mask = shard_no == no
+            vectors[mask] = self.shards[no][positions[mask] - self.offsets[no]]
+        return vectors
+
+    def iter_chunks(self):
+        for offset in range(0, self.n, self.chunk_size):
+            yield offset, self.rows(np.arange(offset, min(self.n, offset + self.chunk_size)))
+
+    def draw(self, size, stream):
+        """카탈로그 row 무작위 선택 (학습 벡터: stream=2, 쿼리: stream=3)"""
+        rng = np.random.default_rng([self.seed, stream])
+        return self.rows(np.sort(rng.choice(self.n, size=min(size, self.n), replace=False)))
+
+    def info(self):
+        return {
+            'n': self.n,
+            'd': self.d,
+            'snapshot': self.path,
+            'model': self.manifest.get('model'),
+            'type': self.manifest.get('type'),
+            'last_idx': self.manifest.get('last_idx'),
+            'seed': self.seed
+        }
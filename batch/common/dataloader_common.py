@@ -1,31 +1,27 @@
 from common.mysql_common import Database
+from common.registry_common import MuseRegistry
+from common.vector_codec_common import MuseVectorCodec
 import logging
 import pickle
 import torch
 import io
 import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 class MuseDataLoader:
     _selected_mod = [1, 21, 41, 61, 81]
     _table_name = 'muse.tb_embedding_{0}_{1}_h'        
     _mod_select_window_size = 5000
-    _table_names = {
-        'clap_song': 'muse.tb_embedding_clap_h',
-        'clap_lyrics_summary': 'muse.tb_embedding_clap_lyrics_summary_h',
-        'bgem3_artist': 'muse.tb_embedding_bgem3_artist_h',
-        'bgem3_song_name': 'muse.tb_embedding_bgem3_song_name_h',
-        'bgem3_lyrics_slide': 'muse.tb_embedding_bgem3_lyrics_slide_h',
-        'bgem3_lyrics_3_slide': 'muse.tb_embedding_bgem3_lyrics_3_slide_h',
-        'bgem3_album_name': 'muse.tb_embedding_bgem3_album_name_h'
-    }
-    _columns = {
-        'clap_song': 'embedding_result',
-        'clap_lyrics_summary': 'embedding_result',
-        'bgem3_artist': 'artist_embedding',
-        'bgem3_song_name': 'song_name_embedding',
-        'bgem3_lyrics_slide': 'embedding_result',
-        'bgem3_lyrics_3_slide': 'embedding_result',
-        'bgem3_album_name': 'album_name_embedding'
+    # 학습 벡터 blob decode 프로세스 수
+    _decode_workers = 4
+    # {model}_{type} → 테이블 / 벡터 컬럼 (MuseRegistry)
+    _table_names = {f'''{entry['model']}_{entry['type']}''': MuseRegistry.table_name(entry) for entry in MuseRegistry.entries().values()}
+    _columns = {f'''{entry['model']}_{entry['type']}''': entry['vector_column'] for entry in MuseRegistry.entries().values()}
+    # song id(add_with_ids) 생성용 곡 식별 컬럼 (trackno가 없는 album_name 등은 앨범 단위)
+    _song_columns = {
+        f'''{entry['model']}_{entry['type']}''': 'disccommseq, NULL'
+        for entry in MuseRegistry.entries().values() if 'trackno' not in entry['id_columns']
     }
 
     @staticmethod
@@ -56,7 +52,28 @@ class MuseDataLoader:
             logging.error(f'''MuseDataLoader.get_last_idx: {e}''')
     
     @staticmethod
-    def get_train_vectors(model, embedding_type):
+    def decode_vectors(blobs, dimension=None):
+        """벡터 blob 목록(raw / npy) → float32 (n, d) 배열 (decode worker 프로세스에서 실행)"""
+        return MuseVectorCodec.decode_many(blobs, dimension)
+
+    @staticmethod
+    def get_dimension(model, embedding_type):
+        _, entry = MuseRegistry.find(model, embedding_type)
+        return entry['dimension'] if entry else None
+
+    @staticmethod
+    def get_train_vectors(model, embedding_type, dimension=None, max_size=None, workers=None, memmap_path=None, seed=0):
+        """
+        학습 샘플(idx_mod_100이 _selected_mod인 row)을 미리 할당한 float32 배열에 바로 기록
+
+        - 배열 크기는 샘플 row 수 상한(last_idx / 100 * len(_selected_mod))과 max_size 중 작은 값
+        - max_size보다 샘플이 많으면 reservoir sampling으로 전체 샘플에서 균등하게 max_size개 유지
+        - blob decode는 workers개 프로세스에서 병렬 실행, DB 조회와 겹치도록 window 단위로 제출 (0이면 현재 프로세스)
+        - memmap_path를 주면 배열을 파일(np.memmap)로 만들어 학습 샘플이 메모리보다 커도 진행
+
+        Returns:
+            float32 (n, d) 배열 (memmap이면 np.memmap), 실패 시 None
+        """
         try:
             table_key = f'{model}_{embedding_type}'
             table_name = MuseDataLoader._table_names.get(table_key)
@@ -66,11 +83,40 @@ class MuseDataLoader:
                 logging.error(f'''MuseDataLoader.get_train_vectors: Unknown table key {table_key}''')
                 return None
 
+            if dimension is None:
+                dimension = MuseDataLoader.get_dimension(model, embedding_type)
+            workers = MuseDataLoader._decode_workers if workers is None else workers
+
             last_idx = MuseDataLoader.get_last_idx(model=model, embedding_type=embedding_type)
-            train_vectors=[]
             if not last_idx:
-                return
+                return None
+
+            capacity = (last_idx // 100 + 1) * len(MuseDataLoader._selected_mod)
+            if max_size:
+                capacity = min(capacity, max_size)
+            if memmap_path:
+                train_vectors = np.memmap(memmap_path, dtype='float32', mode='w+', shape=(capacity, dimension))
             else:
+                train_vectors = np.empty((capacity, dimension), dtype='float32')
+            logging.info(f'''MuseDataLoader.get_train_vectors: capacity {capacity} x {dimension} ({capacity * dimension * 4 / 1024 / 1024:.0f}MB{", memmap " + memmap_path if memmap_path else ""})''')
+
+            rng = np.random.default_rng(seed)
+            seen = 0
+
+            def _insert(vectors):
+                # reservoir sampling: 앞쪽 capacity개는 그대로, 이후 seen번째 row는 capacity / (seen + 1) 확률로 임의 위치 교체
+                nonlocal seen
+                fill = max(0, min(len(vectors), capacity - seen))
+                train_vectors[seen:seen + fill] = vectors[:fill]
+                if fill < len(vectors):
+                    positions = rng.integers(0, np.arange(seen + fill, seen + len(vectors)) + 1)
+                    replace = positions < capacity
+                    train_vectors[positions[replace]] = vectors[fill:][replace]
+                seen += len(vectors)
+
+            executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+            pending = deque()
+            try:
                 for i in range(1, last_idx+1, MuseDataLoader._mod_select_window_size):
                     results, code = Database.execute_query(
                         f'''
@@ -80,23 +126,87 @@ class MuseDataLoader:
                             AND idx >= %s and idx < %s
                         ''', params=(i, min(last_idx, i+MuseDataLoader._mod_select_window_size)), fetchall=True
                     )
-                    if code == 200:
-                        logging.info(f'''MuseDataLoader.get_train_vectors: load vectors in [{','.join(list(map(str, MuseDataLoader._selected_mod)))}] in range ({i} ~ {min(last_idx, i+MuseDataLoader._mod_select_window_size)})''')
-                        for res in results:
-                            train_vectors.append(np.atleast_2d(np.load(io.BytesIO(res[1]), allow_pickle=True))[0])
-                    else:
+                    if code != 200:
                         logging.error("MuseDataLoader.get_train_vetctors: FAILED TO GET TRAIN VECTORS")
-            return train_vectors
+                        continue
+                    if not results:
+                        continue
+                    logging.info(f'''MuseDataLoader.get_train_vectors: load vectors in [{','.join(list(map(str, MuseDataLoader._selected_mod)))}] in range ({i} ~ {min(last_idx, i+MuseDataLoader._mod_select_window_size)})''')
+                    blobs = [res[1] for res in results]
+                    if executor is None:
+                        _insert(MuseDataLoader.decode_vectors(blobs, dimension))
+                        continue
+                    pending.append(executor.submit(MuseDataLoader.decode_vectors, blobs, dimension))
+                    # decode 대기 window 수를 제한해 조회 결과가 메모리에 쌓이지 않도록 함
+                    while len(pending) > workers * 2:
+                        _insert(pending.popleft().result())
+                while pending:
+                    _insert(pending.popleft().result())
+            finally:
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
+
+            size = min(seen, capacity)
+            logging.info(f'''MuseDataLoader.get_train_vectors: {size} vectors (sampled from {seen})''')
+            if memmap_path:
+                train_vectors.flush()
+            return train_vectors[:size]
         except Exception as e:
             logging.error(f'''MuseDataLoader.get_train_vetctors: {e}''')
             return None
 
+    @staticmethod
+    def get_sample_vectors(model, embedding_type, sample_size, seed=0):
+        """
+        DB idx를 무작위로 골라 벡터 샘플 조회 (검색 파라미터 튜닝용 쿼리)
+
+        Returns:
+            [(idx, vector), ...] - idx는 DB idx (FAISS id = idx - 1)
+        """
+        try:
+            table_key = f'{model}_{embedding_type}'
+            table_name = MuseDataLoader._table_names.get(table_key)
+            column_name = MuseDataLoader._columns.get(table_key)
+            dimension = MuseDataLoader.get_dimension(model, embedding_type)
+
+            if not table_name or not column_name:
+                logging.error(f'''MuseDataLoader.get_sample_vectors: Unknown table key {table_key}''')
+                return None
+
+            last_idx = MuseDataLoader.get_last_idx(model=model, embedding_type=embedding_type)
+            if not last_idx:
+                return None
+
+            rng = np.random.default_rng(seed)
+            sample_idx = rng.choice(np.arange(1, last_idx + 1), size=min(sample_size, last_idx), replace=False)
+            sample_vectors = []
+            for i in range(0, len(sample_idx), MuseDataLoader._mod_select_window_size):
+                batch = sample_idx[i:i + MuseDataLoader._mod_select_window_size]
+                results, code = Database.execute_query(
+                    f'''
+                        SELECT idx, {column_name}
+                        FROM {table_name}
+                        WHERE idx in ({','.join(list(map(str, batch)))})
+                    ''', fetchall=True
+                )
+                if code == 200:
+                    for res in results:
+                        sample_vectors.append((res[0], MuseVectorCodec.decode(res[1], dimension)))
+                else:
+                    logging.error("MuseDataLoader.get_sample_vectors: FAILED TO GET SAMPLE VECTORS")
+            logging.info(f'''MuseDataLoader.get_sample_vectors: {len(sample_vectors)} vectors''')
+            return sample_vectors
+        except Exception as e:
+            logging.error(f'''MuseDataLoader.get_sample_vectors: {e}''')
+            return None
+
     @staticmethod
     def get_add_vectors(model, embedding_type, start_idx, end_idx):
         try:
             table_key = f'{model}_{embedding_type}'
             table_name = MuseDataLoader._table_names.get(table_key)
             column_name = MuseDataLoader._columns.get(table_key)
+            dimension = MuseDataLoader.get_dimension(model, embedding_type)
 
             if not table_name or not column_name:
                 logging.error(f'''MuseDataLoader.get_add_vectors: Unknown table key {table_key}''')
@@ -108,16 +218,116 @@ class MuseDataLoader:
                     SELECT idx, {column_name}
                     FROM {table_name}
                     WHERE idx >= %s and idx < %s
+                    ORDER BY idx
                 ''', params=(start_idx, end_idx), fetchall=True
             )
 
             if code == 200:
                 for res in results:
-                    add_vectors.append(np.atleast_2d(np.load(io.BytesIO(res[1]), allow_pickle=True))[0])
+                    add_vectors.append(MuseVectorCodec.decode(res[1], dimension))
             return add_vectors
         except Exception as e:
             logging.error(e)
             return None
 
+    @staticmethod
+    def migrate_blobs(model, embedding_type, start_idx, end_idx, dtype='float32', window_size=None, dry_run=False):
+        """
+        DB idx [start_idx, end_idx)의 벡터 blob을 raw 형식(dtype)으로 다시 기록 (이미 raw dtype인 row는 건너뜀)
+        window 단위로 조회 / 갱신하므로 중단되어도 같은 범위로 다시 실행하면 이어서 진행
+
+        Returns:
+            {'rows': 조회 row 수, 'converted': 변환 row 수, 'bytes_before', 'bytes_after'}, 실패 시 None
+        """
+        try:
+            table_key = f'{model}_{embedding_type}'
+            table_name = MuseDataLoader._table_names.get(table_key)
+            column_name = MuseDataLoader._columns.get(table_key)
+            dimension = MuseDataLoader.get_dimension(model, embedding_type)
+
+            if not table_name or not column_name or not dimension:
+                logging.error(f'''MuseDataLoader.migrate_blobs: Unknown table key {table_key}''')
+                return None
+
+            target_size = dimension * (4 if dtype == 'float32' else 2)
+            window_size = window_size or MuseDataLoader._mod_select_window_size
+            stats = {'rows': 0, 'converted': 0, 'bytes_before': 0, 'bytes_after': 0}
+            for i in range(start_idx, end_idx, window_size):
+                results, code = Database.execute_query(
+                    f'''
+                        SELECT idx, {column_name}
+                        FROM {table_name}
+                        WHERE idx >= %s and idx < %s
+                    ''', params=(i, min(end_idx, i + window_size)), fetchall=True
+                )
+                if code != 200:
+                    logging.error(f'''MuseDataLoader.migrate_blobs: FAILED TO GET VECTORS {i} ~ {min(end_idx, i + window_size) - 1} ({results})''')
+                    return None
+
+                updates = []
+                for idx, blob in results:
+                    stats['rows'] += 1
+                    if len(blob) == target_size and not MuseVectorCodec.is_npy(blob):
+                        continue
+                    encoded = MuseVectorCodec.encode(MuseVectorCodec.decode(blob, dimension), dtype=dtype)
+                    stats['bytes_before'] += len(blob)
+                    stats['bytes_after'] += len(encoded)
+                    updates.append((encoded, idx))
+
+                if updates and not dry_run:
+                    _, code = Database.execute_many(f'''UPDATE {table_name} SET {column_name} = %s WHERE idx = %s''', updates)
+                    if code != 200:
+                        logging.error(f'''MuseDataLoader.migrate_blobs: FAILED TO UPDATE {i} ~ {min(end_idx, i + window_size) - 1}''')
+                        return None
+                stats['converted'] += len(updates)
+                logging.info(f'''MuseDataLoader.migrate_blobs: {i} ~ {min(end_idx, i + window_size) - 1} converted {len(updates)} / {len(results)}{' (dry run)' if dry_run else ''}''')
+            return stats
+        except Exception as e:
+            logging.error(f'''MuseDataLoader.migrate_blobs: {e}''')
+            return None
+
+    @staticmethod
+    def stream_add_rows(model, embedding_type, start_idx, end_idx, with_song=False, fetch_size=5000):
+        """
+        DB idx [start_idx, end_idx) 범위를 idx 순서로 한 번의 쿼리로 스트리밍 (decode 전 원본 blob)
+
+        Yields:
+            [(idx, blob), ...] 또는 with_song이면 [(idx, disccommseq, trackno, blob), ...]
+        """
+        table_key = f'{model}_{embedding_type}'
+        table_name = MuseDataLoader._table_names.get(table_key)
+        column_name = MuseDataLoader._columns.get(table_key)
+        if not table_name or not column_name:
+            raise ValueError(f'''MuseDataLoader.stream_add_rows: Unknown table key {table_key}''')
+
+        song_columns = f'''{MuseDataLoader._song_columns.get(table_key, 'disccommseq, trackno')}, ''' if with_song else ''
+        yield from Database.stream_query(
+            f'''
+                SELECT idx, {song_columns}{column_name}
+                FROM {table_name}
+                WHERE idx >= %s and idx < %s
+                ORDER BY idx
+            ''', params=(start_idx, end_idx), fetch_size=fetch_size
+        )
+
+    @staticmethod
+    def stream_song_rows(model, embedding_type, start_idx, end_idx, fetch_size=50000):
+        """
+        DB idx [start_idx, end_idx) 범위의 곡 식별 컬럼만 idx 순서로 스트리밍 (벡터 blob 없음, tombstone 생성용)
+
+        Yields:
+            [(idx, disccommseq, trackno), ...] - album_name 등은 trackno None
+        """
+        table_key = f'{model}_{embedding_type}'
+        table_name = MuseDataLoader._table_names.get(table_key)
+        if not table_name:
+            raise ValueError(f'''MuseDataLoader.stream_song_rows: Unknown table key {table_key}''')
 
-            
\ No newline at end of file
+        yield from Database.stream_query(
+            f'''
+                SELECT idx, {MuseDataLoader._song_columns.get(table_key, 'disccommseq, trackno')}
+                FROM {table_name}
+                WHERE idx >= %s and idx < %s
+                ORDER BY idx
+            ''', params=(start_idx, end_idx), fetch_size=fetch_size
+        )
@@ -1,15 +1,51 @@
 import faiss
+import json
+import os
 import numpy as np
 
 class MuseFaiss:
+    # set_index 기본 구성 (IndexIVFPQ + HNSW32 quantizer)을 index_factory 표기로 나타낸 것, {nlist}는 학습 시 결정
+    _default_factory = 'IVF{nlist}_HNSW32,PQ16x8'
+
     def __init__(self, d=512):
         self.quantizer = faiss.IndexHNSWFlat(d, 32)
         self.d = d
         self.index = None
+        self.factory = None
         self.exception_list = [] 
     
-    def set_index(self, nlist):
-        self.index = faiss.IndexIVFPQ(self.quantizer, self.d, nlist, 16, 8)
+    def set_index(self, nlist, factory=None, require_ivf=False):
+        """
+        factory가 없으면 기존 IndexIVFPQ(HNSW32, PQ16x8), 있으면 faiss.index_factory 표기로 생성
+        예) 'OPQ16_64,IVF{nlist}_HNSW32,PQ16x8', 'PCAR256,IVF{nlist}_HNSW32,SQ8', 'IVF{nlist},SQ4', 'HNSW32,Flat'(벤치마크 비교용)
+        require_ivf면 IVF가 아닌 구성은 거부 (registry key는 일일 delta의 add_with_ids / compaction의 merge_from이 IVF만 지원)
+        """
+        if factory:
+            self.factory = factory.format(nlist=nlist)
+            self.index = faiss.index_factory(self.d, self.factory)
+        else:
+            self.factory = MuseFaiss._default_factory.format(nlist=nlist)
+            self.index = faiss.IndexIVFPQ(self.quantizer, self.d, nlist, 16, 8)
+        if require_ivf and self.ivf() is None:
+            raise ValueError(f'''MuseFaiss.set_index: {self.factory} is not an IVF index (segment add_with_ids / compact_faiss merge_from need IVF)''')
+
+    def ivf(self):
+        """pre-transform(OPQ / PCA) 안쪽의 IVF 인덱스 (IVF가 아니면 None)"""
+        try:
+            return faiss.extract_index_ivf(self.index)
+        except Exception:
+            return None
+
+    def nlist(self):
+        ivf = self.ivf()
+        return ivf.nlist if ivf is not None else None
+
+    def code_bytes(self):
+        """인덱스에 저장된 벡터 코드 크기 (IVF는 코드 + id, quantizer / pre-transform 제외)"""
+        ivf = self.ivf()
+        if ivf is not None:
+            return int(ivf.ntotal * (ivf.code_size + 8))
+        return int(self.index.ntotal * getattr(self.index, 'code_size', self.d * 4))
 
     def train(self, vectors):        
         self.index.train(vectors)
@@ -17,6 +53,30 @@ class MuseFaiss:
     def add(self, vectors):        
         self.index.add(vectors)
     
+    def add_with_ids(self, vectors, ids):
+        self.index.add_with_ids(vectors, np.asarray(ids, dtype='int64'))
+
+    @staticmethod
+    def meta_path(path):
+        """인덱스 메타 파일 경로 (muse_vibe.index → muse_vibe.meta.json)"""
+        return f'{path[:-len(".index")] if path.endswith(".index") else path}.meta.json'
+
+    @staticmethod
+    def read_meta(path):
+        """인덱스 메타 (id_format 등), 없으면 {} (기존 MySQL idx - 1 id 인덱스)"""
+        meta_path = MuseFaiss.meta_path(path)
+        if not os.path.exists(meta_path):
+            return {}
+        with open(meta_path, 'r') as f:
+            return json.load(f)
+
+    @staticmethod
+    def write_meta(path, meta):
+        meta_path = MuseFaiss.meta_path(path)
+        with open(f'{meta_path}.tmp', 'w') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        os.replace(f'{meta_path}.tmp', meta_path)
+
     def search(self, xq, k=5):
         if self.index:
             D, I = self.index.quantizer.search(xq, k)
@@ -25,6 +85,29 @@ class MuseFaiss:
             # print(D, I)
             return D, I
     
+    def search_with_params(self, xq, k, nprobe, efSearch=None):
+        if self.ivf() is None:
+            # IVF가 아닌 인덱스(HNSW32,Flat 등)는 nprobe 없이 HNSW efSearch만 적용
+            if efSearch and isinstance(faiss.downcast_index(self.index), faiss.IndexHNSW):
+                params = faiss.SearchParametersHNSW()
+                params.efSearch = efSearch
+                return self.index.search(xq, k, params=params)
+            return self.index.search(xq, k)
+        # pre-transform 인덱스도 IVF 파라미터는 안쪽 IVF로 그대로 전달됨
+        params = faiss.SearchParametersIVF()
+        params.nprobe = nprobe
+        quantizer_params = None
+        if efSearch:
+            # HNSW quantizer의 efSearch (nprobe개의 리스트를 찾는 탐색 폭)
+            quantizer_params = faiss.SearchParametersHNSW()
+            quantizer_params.efSearch = efSearch
+            params.quantizer_params = quantizer_params
+        return self.index.search(xq, k, params=params)
+
+    def has_hnsw_quantizer(self):
+        ivf = self.ivf()
+        return ivf is not None and isinstance(faiss.downcast_index(ivf.quantizer), faiss.IndexHNSW)
+
     def write_index(self, path):
         faiss.write_index(self.index, path)
 
@@ -36,7 +119,7 @@ class MuseFaiss:
         #     self.index.quantizer, self.index.nlist, self.index.is_trained, self.index.ntotal, self.index.d
         # )
         return 'nlist:{0}, is_trained:{1}, ntotal:{2}, d:{3}'.format(
-            self.index.nlist, self.index.is_trained, self.index.ntotal, self.index.d
+            self.nlist(), self.index.is_trained, self.index.ntotal, self.index.d
         )
     
     def ntotal(self):
@@ -0,0 +1,222 @@
+import logging
+import queue
+import threading
+import time
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from common.dataloader_common import MuseDataLoader
+from common.song_id_common import MuseSongId
+
+def _decode_chunk(blobs, dimension):
+    """decode worker 프로세스: blob 목록 → (float32 벡터 배열, decode 시간)"""
+    start = time.perf_counter()
+    vectors = MuseDataLoader.decode_vectors(blobs, dimension)
+    return vectors, time.perf_counter() - start
+
+
+class MuseIngest:
+    """
+    add_faiss / add_daily_faiss용 파이프라인 (읽기 → decode → add 단계를 동시에 실행)
+
+    - read: 별도 스레드에서 server-side cursor로 fetch_size row씩 읽어 read_queue(깊이 read_depth)에 넣음
+    - decode: 메인 스레드가 chunk를 worker 프로세스에 제출하고 idx 순서대로 결과를 모음 (동시 제출 decode_depth개)
+    - add: 별도 스레드에서 add_batch_size row 이상 모아 index.add (song id 인덱스는 SongIdPacker로 id 생성 후 add_with_ids)
+      FAISS add는 GIL을 해제하므로 add 중에도 읽기 / decode가 진행됨
+    - 큐가 가득 차면 앞 단계가 대기하므로 메모리는 (read_depth + decode_depth) * fetch_size row + add_batch_size 벡터로 제한
+
+    - run_snapshot: 로컬 스냅샷(MuseSnapshot) 범위는 read 단계가 mmap 읽기로 바뀌고 decode 단계 없음
+
+    add 순서는 DB idx 순서 그대로 유지 (기존 인덱스의 FAISS id == MySQL idx - 1 전제)
+    """
+    _fetch_size = 5000
+    _add_batch_size = 50000
+    _read_depth = 4
+    _workers = 4
+
+    def __init__(self, muse_faiss, packer=None, fetch_size=None, add_batch_size=None, read_depth=None, decode_depth=None, workers=None, next_id=None):
+        self.muse_faiss = muse_faiss
+        self.packer = packer
+        # delta segment: base 다음 위치부터 id를 이어 붙임 (add_with_ids), None이면 index.add
+        self.next_id = next_id
+        self.fetch_size = fetch_size or MuseIngest._fetch_size
+        self.add_batch_size = add_batch_size or MuseIngest._add_batch_size
+        self.read_depth = read_depth or MuseIngest._read_depth
+        self.workers = MuseIngest._workers if workers is None else workers
+        self.decode_depth = decode_depth or max(self.workers, 1) * 2
+        self.stats = {stage: {'rows': 0, 'sec': 0.0} for stage in ('read', 'decode', 'add')}
+        self.first_idx = None
+        self.last_idx = None
+
+    def _read(self, rows_iter, read_queue):
+        try:
+            while True:
+                start = time.perf_counter()
+                rows = next(rows_iter, None)
+                self.stats['read']['sec'] += time.perf_counter() - start
+                if rows is None:
+                    break
+                self.stats['read']['rows'] += len(rows)
+                read_queue.put(rows)
+            read_queue.put(None)
+        except Exception as e:
+            read_queue.put(e)
+
+    def _add(self, add_queue, errors):
+        buffer, buffered, done = [], 0, False
+        try:
+            while not done:
+                item = add_queue.get()
+                done = item is None
+                if not done:
+                    buffer.append(item)
+                    buffered += len(item[0])
+                if buffered and (done or buffered >= self.add_batch_size):
+                    self._flush(buffer)
+                    buffer, buffered = [], 0
+        except Exception as e:
+            errors.append(e)
+            # 메인 스레드가 add_queue.put에서 멈추지 않도록 종료 표시까지 남은 항목을 비움
+            while not done:
+                done = add_queue.get() is None
+
+    def _flush(self, buffer):
+        start = time.perf_counter()
+        vectors = np.concatenate([vectors for _, vectors in buffer])
+        rows = [row for row_meta, _ in buffer for row in row_meta]
+        if self.packer is None and self.next_id is None:
+            self.muse_faiss.add(vectors=vectors)
+            added = len(vectors)
+        elif self.packer is None:
+            self.muse_faiss.add_with_ids(vectors=vectors, ids=np.arange(self.next_id, self.next_id + len(vectors)))
+            self.next_id += len(vectors)
+            added = len(vectors)
+        else:
+            ids = [self.packer.pack(disccommseq, trackno) for _, disccommseq, trackno in rows]
+            keep = np.array([song_id is not None for song_id in ids], dtype=bool)
+            added = int(keep.sum())
+            if added:
+                self.muse_faiss.add_with_ids(vectors=vectors[keep], ids=[song_id for song_id in ids if song_id is not None])
+        self.stats['add']['sec'] += time.perf_counter() - start
+        self.stats['add']['rows'] += added
+        logging.info(f'''ADD COMPLETE({added}) DB idx {rows[0][0]} ~ {rows[-1][0]} ({self.stats['add']['rows']} added)''')
+
+    def _collect(self, pending, add_queue):
+        future, row_meta = pending.popleft()
+        vectors, decode_sec = future.result()
+        self.stats['decode']['sec'] += decode_sec
+        self.stats['decode']['rows'] += len(vectors)
+        add_queue.put((row_meta, vectors))
+
+    def run(self, model, embedding_type, start_idx, end_idx):
+        """DB idx [start_idx, end_idx) 추가 후 단계별 처리량(report) 반환"""
+        with_song = self.packer is not None
+        rows_iter = MuseDataLoader.stream_add_rows(model, embedding_type, start_idx, end_idx, with_song=with_song, fetch_size=self.fetch_size)
+        read_queue = queue.Queue(maxsize=self.read_depth)
+        add_queue = queue.Queue(maxsize=2)
+        errors = []
+
+        wall_start = time.perf_counter()
+        reader = threading.Thread(target=self._read, args=(rows_iter, read_queue), name='ingest-read', daemon=True)
+        adder = threading.Thread(target=self._add, args=(add_queue, errors), name='ingest-add', daemon=True)
+        reader.start()
+        adder.start()
+
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 0 else None
+        pending = deque()
+        try:
+            while not errors:
+                rows = read_queue.get()
+                if rows is None:
+                    break
+                if isinstance(rows, Exception):
+                    raise rows
+                blobs = [row[-1] for row in rows]
+                # add 단계에는 blob을 뺀 (idx[, disccommseq, trackno])만 전달
+                row_meta = [row[:-1] for row in rows]
+                if self.first_idx is None:
+                    self.first_idx = rows[0][0]
+                self.last_idx = rows[-1][0]
+                if executor is None:
+                    vectors, decode_sec = _decode_chunk(blobs, self.muse_faiss.d)
+                    self.stats['decode']['sec'] += decode_sec
+                    self.stats['decode']['rows'] += len(vectors)
+                    add_queue.put((row_meta, vectors))
+                    continue
+                pending.append((executor.submit(_decode_chunk, blobs, self.muse_faiss.d), row_meta))
+                while len(pending) >= self.decode_depth:
+                    self._collect(pending, add_queue)
+            while pending and not errors:
+                self._collect(pending, add_queue)
+        finally:
+            add_queue.put(None)
+            adder.join()
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        if errors:
+            raise errors[0]
+        return self.report(time.perf_counter() - wall_start)
+
+    def run_snapshot(self, snapshot, start_idx, end_idx):
+        """
+        DB idx [start_idx, end_idx)를 MySQL 대신 로컬 스냅샷(MuseSnapshot)에서 읽어 추가 (decode 단계 없음)
+        FAISS add는 GIL을 해제하므로 add 스레드가 add하는 동안 메인 스레드가 다음 chunk를 mmap에서 읽음
+        """
+        add_queue = queue.Queue(maxsize=2)
+        errors = []
+
+        wall_start = time.perf_counter()
+        adder = threading.Thread(target=self._add, args=(add_queue, errors), name='ingest-add', daemon=True)
+        adder.start()
+        try:
+            rows_iter = snapshot.iter_rows(start_idx, end_idx, chunk_rows=self.fetch_size)
+            while not errors:
+                start = time.perf_counter()
+                chunk = next(rows_iter, None)
+                self.stats['read']['sec'] += time.perf_counter() - start
+                if chunk is None:
+                    break
+                idx, vectors, songs = chunk
+                self.stats['read']['rows'] += len(idx)
+                if self.first_idx is None:
+                    self.first_idx = int(idx[0])
+                self.last_idx = int(idx[-1])
+                if self.packer is None:
+                    row_meta = [(int(i),) for i in idx]
+                else:
+                    # 스냅샷의 song id(chunk 0)를 (idx, disccommseq, trackno)로 풀어 SongIdPacker에 그대로 전달 (-1은 제외 대상)
+                    row_meta = [(int(i), *MuseSongId.unpack(int(song))[:2]) if song >= 0 else (int(i), None, None) for i, song in zip(idx, songs)]
+                add_queue.put((row_meta, vectors))
+        finally:
+            add_queue.put(None)
+            adder.join()
+        if errors:
+            raise errors[0]
+        return self.report(time.perf_counter() - wall_start)
+
+    def report(self, wall_sec):
+        """
+        Returns:
+            {'rows', 'first_idx', 'last_idx', 'wall_sec', 'rows_per_sec', 'stages': {read / decode / add: {rows, sec, rows_per_sec}}}
+        """
+        return {
+            'rows': self.stats['add']['rows'],
+            'first_idx': self.first_idx,
+            'last_idx': self.last_idx,
+            'wall_sec': round(wall_sec, 2),
+            'rows_per_sec': round(self.stats['add']['rows'] / wall_sec, 1) if wall_sec else None,
+            'fetch_size': self.fetch_size,
+            'add_batch_size': self.add_batch_size,
+            'read_depth': self.read_depth,
+            'decode_depth': self.decode_depth,
+            'workers': self.workers,
+            # 단계별 처리량은 해당 단계가 실제로 일한 시간 기준 (decode는 worker 프로세스 시간 합)
+            'stages': {
+                stage: {
+                    'rows': stat['rows'],
+                    'sec': round(stat['sec'], 2),
+                    'rows_per_sec': round(stat['rows'] / stat['sec'], 1) if stat['sec'] else None
+                }
+                for stage, stat in self.stats.items()
+            }
+        }
@@ -47,6 +47,39 @@ class Database:
         finally:
             Database.__close(connection)
 
+    @staticmethod
+    def execute_many(query, params_list):
+        """같은 쿼리를 여러 파라미터로 실행 (executemany, 한 트랜잭션으로 commit)"""
+        try:
+            connection = Database.__connect()
+            cursor = connection.cursor()
+            cursor.executemany(query, params_list)
+            connection.commit()
+            return cursor.rowcount, 200
+        except Exception as e:
+            return e, 500
+        finally:
+            Database.__close(connection)
+
+    @staticmethod
+    def stream_query(query, params=None, fetch_size=5000):
+        """
+        server-side cursor(SSCursor)로 결과를 fetch_size row씩 yield (전체 결과를 클라이언트 메모리에 올리지 않음)
+        스트리밍 중에는 커넥션을 점유하므로 소비가 오래 멈추면 MySQL net_write_timeout에 걸릴 수 있음
+        """
+        connection = Database.__connect()
+        cursor = connection.cursor(pymysql.cursors.SSCursor)
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+            Database.__close(connection)
+
     @staticmethod
     def get_all_program_ids():
         try:
@@ -103,4 +136,31 @@ class Database:
                 return []
         except Exception as e:
             logging.error(f"Database.get_program_songs error for program_id={program_id}: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    @staticmethod
+    def get_banned_songs():
+        """
+        tb_playlist_song_pool_m에서 금지된 곡 (is_banned는 program별 값이므로 곡이 들어 있는 모든 program에서 금지된 곡만)
+
+        Returns:
+            [(disc_id, track_no), ...], 실패 시 None
+        """
+        try:
+            results, code = Database.execute_query(
+                f"""
+                    SELECT disc_id, track_no
+                    FROM muse.tb_playlist_song_pool_m
+                    GROUP BY disc_id, track_no
+                    HAVING MIN(is_banned) = 1
+                """,
+                fetchall=True
+            )
+            if code == 200:
+                logging.info(f"Database.get_banned_songs: {len(results)} songs")
+                return [(row[0], row[1]) for row in results]
+            logging.error(f"Database.get_banned_songs: FAILED ({results})")
+            return None
+        except Exception as e:
+            logging.error(f"Database.get_banned_songs: {e}")
+            return None
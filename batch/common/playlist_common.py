@@ -1,5 +1,7 @@
 from common.mysql_common import Database
 from common.redis_common import RedisClient
+from common.song_id_common import MuseSongId
+from common.registry_common import MuseRegistry
 import logging
 import time
 from typing import List, Dict, Tuple
@@ -7,25 +9,9 @@ from typing import List, Dict, Tuple
 class PlaylistLoader:
     """Program별 Playlist 데이터를 Redis에 캐싱"""
 
-    _table_mapping = {
-        'artist': 'muse.tb_embedding_bgem3_artist_h',
-        'album_name': 'muse.tb_embedding_bgem3_album_name_h',
-        'title': 'muse.tb_embedding_bgem3_song_name_h',
-        'vibe': 'muse.tb_embedding_clap_h',
-        'lyrics': 'muse.tb_embedding_bgem3_lyrics_slide_h',
-        'lyrics_3': 'muse.tb_embedding_bgem3_lyrics_3_slide_h',
-        'lyrics_summary': 'muse.tb_embedding_clap_lyrics_summary_h'
-    }
-
-    _column_mapping = {
-        'artist': ['disccommseq', 'trackno'],
-        'album_name': ['disccommseq'],
-        'title': ['disccommseq', 'trackno'],
-        'vibe': ['disccommseq', 'trackno'],
-        'lyrics': ['disccommseq', 'trackno'],
-        'lyrics_3': ['disccommseq', 'trackno'],
-        'lyrics_summary': ['disccommseq', 'trackno']
-    }
+    # key별 임베딩 테이블 / 곡 식별 컬럼 (MuseRegistry)
+    _table_mapping = {key: MuseRegistry.table_name(entry) for key, entry in MuseRegistry.entries().items()}
+    _column_mapping = MuseRegistry.mapping('id_columns')
 
     @staticmethod
     def load_all_programs_to_redis():
@@ -107,7 +93,12 @@ class PlaylistLoader:
             except Exception as e:
                 logging.error(f"  → [{key}] Error: {e}")
 
-        # 3. 갱신 시간 저장
+        # 3. song id 인덱스용 곡 식별자 (DB 조회 없이 변환)
+        song_ids = PlaylistLoader._get_song_ids(songs)
+        if song_ids:
+            RedisClient.set_playlist_song_ids(program_id, song_ids)
+
+        # 4. 갱신 시간 저장
         RedisClient.set_last_update_time(program_id, time.time())
 
     @staticmethod
@@ -142,6 +133,16 @@ class PlaylistLoader:
 
         return include_ids
 
+    @staticmethod
+    def _get_song_ids(songs: List[Dict]) -> List[int]:
+        """곡 목록 → song id 리스트 (MuseSongId, chunk 0), 표현할 수 없는 곡은 제외"""
+        song_ids = set()
+        for song in songs:
+            song_id = MuseSongId.pack(song['disc_comm_seq'].strip(), song['track_no'].strip())
+            if song_id is not None:
+                song_ids.add(song_id)
+        return sorted(song_ids)
+
     @staticmethod
     def _get_idx_batch(key: str, disc_track_pairs: List[Tuple], columns: List[str]) -> List[int]:
         """
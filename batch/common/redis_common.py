@@ -57,6 +57,22 @@ class RedisClient:
         except Exception as e:
             logging.error(f"Error setting playlist include_ids to Redis: {e}")
 
+    @staticmethod
+    def set_playlist_song_ids(playlist_id: str, song_ids: List[int]):
+        """
+        playlist 곡의 song id(MuseSongId, chunk 0) 저장 (영구 저장)
+        song id 인덱스는 key와 무관하게 곡 식별자가 id이므로 key별 조회 없이 하나만 저장
+
+        Redis key: playlist_song:{playlist_id}
+        """
+        try:
+            client = RedisClient.get_client()
+            redis_key = f"playlist_song:{playlist_id}"
+            client.set(redis_key, json.dumps(song_ids))
+            logging.info(f"Cache SET: {redis_key} ({len(song_ids)} song ids, permanent)")
+        except Exception as e:
+            logging.error(f"Error setting playlist song ids to Redis: {e}")
+
     @staticmethod
     def delete_playlist_include_ids(key: str, playlist_id: str):
         """
@@ -0,0 +1,141 @@
+import faiss
+import json
+import logging
+import os
+import shutil
+import numpy as np
+from datetime import datetime
+
+class MuseSegments:
+    """
+    base 인덱스 + 일일 delta segment 구성 (서버 MuseFaiss가 함께 검색하고 top-k 병합)
+
+    - {stem}.index: 변경하지 않는 base 인덱스 (compact_faiss 때만 새로 만듦)
+    - {stem}.empty.index: base와 같은 quantizer / 코드북의 빈 인덱스 (delta 생성용 template)
+    - {stem}.delta_YYYYMMDD.index: add_daily_faiss --segment가 만드는 작은 delta
+    - {stem}.segments.json: {"base_ntotal", "removed", "last_idx", "deltas": [{"file", "ntotal", "first_id", "first_idx", "last_idx", "created_at"}]}
+      deltas는 추가 순서, first_id는 idx id 인덱스에서 delta 첫 FAISS id (song id 인덱스는 None)
+      removed는 compaction 때 카탈로그에서 삭제된 row(tombstone removed)를 base에서 지운 벡터 수 (지운 id 자리는 비워 두고 다시 쓰지 않음)
+
+    idx id 인덱스의 delta는 base / 이전 delta 다음 위치부터 add_with_ids로 id를 이어 붙여 기존 add_daily_faiss와 같은 id를 유지
+    """
+
+    @staticmethod
+    def _stem(base_path):
+        return base_path[:-len('.index')] if base_path.endswith('.index') else base_path
+
+    @staticmethod
+    def manifest_path(base_path):
+        return f'{MuseSegments._stem(base_path)}.segments.json'
+
+    @staticmethod
+    def template_path(base_path):
+        return f'{MuseSegments._stem(base_path)}.empty.index'
+
+    @staticmethod
+    def read(base_path):
+        """segment manifest, 없으면 None (단일 인덱스)"""
+        path = MuseSegments.manifest_path(base_path)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    @staticmethod
+    def write(base_path, manifest):
+        path = MuseSegments.manifest_path(base_path)
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(f'{path}.tmp', path)
+
+    @staticmethod
+    def ntotal(manifest):
+        return manifest['base_ntotal'] + sum(delta['ntotal'] for delta in manifest['deltas'])
+
+    @staticmethod
+    def next_id(manifest):
+        """idx id 인덱스에서 다음 delta의 첫 FAISS id (base / delta 벡터 수 + 지운 id 수)"""
+        return MuseSegments.ntotal(manifest) + manifest.get('removed', 0)
+
+    @staticmethod
+    def init(base_path, last_idx=None):
+        """
+        base 인덱스를 segment 구성으로 전환 (manifest / template가 없을 때 한 번, base 전체를 읽음)
+
+        Returns:
+            manifest
+        """
+        manifest = MuseSegments.read(base_path)
+        if manifest is not None and os.path.exists(MuseSegments.template_path(base_path)):
+            return manifest
+
+        index = faiss.read_index(base_path)
+        if manifest is None:
+            manifest = {'base_ntotal': int(index.ntotal), 'last_idx': last_idx if last_idx is not None else int(index.ntotal), 'deltas': []}
+        # reset은 inverted list만 비우고 학습된 quantizer / PQ 코드북은 유지
+        index.reset()
+        template_path = MuseSegments.template_path(base_path)
+        faiss.write_index(index, f'{template_path}.tmp')
+        os.replace(f'{template_path}.tmp', template_path)
+        MuseSegments.write(base_path, manifest)
+        logging.info(f'''MuseSegments: {base_path} segment 구성 전환 (base ntotal {manifest['base_ntotal']}, template {template_path})''')
+        return manifest
+
+    @staticmethod
+    def add_delta(base_path, manifest, delta_path, ntotal, first_id, first_idx, last_idx):
+        """delta를 manifest에 추가 (delta 파일은 base와 같은 디렉토리, manifest에는 파일명만 기록)"""
+        manifest['deltas'].append({
+            'file': os.path.basename(delta_path),
+            'ntotal': int(ntotal),
+            'first_id': first_id,
+            'first_idx': first_idx,
+            'last_idx': last_idx,
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+        manifest['last_idx'] = max(manifest['last_idx'], last_idx)
+        MuseSegments.write(base_path, manifest)
+
+    @staticmethod
+    def compact(base_path, output_path, remove_ids=None):
+        """
+        base에 delta를 merge_from으로 합친 새 base를 output_path에 저장하고 output 쪽 manifest는 delta 없이 기록
+        remove_ids(삭제 row FAISS id 배열, MuseTombstones.removed_ids)가 있으면 합친 뒤 remove_ids로 지움
+
+        Returns:
+            {'base_ntotal', 'merged_deltas', 'merged_ntotal', 'removed'}
+        """
+        manifest = MuseSegments.read(base_path)
+        if manifest is None:
+            raise ValueError(f'''MuseSegments.compact: {MuseSegments.manifest_path(base_path)} not found''')
+
+        index = faiss.read_index(base_path)
+        base_ivf = faiss.extract_index_ivf(index)
+        base_dir = os.path.dirname(base_path)
+        merged = 0
+        for delta in manifest['deltas']:
+            delta_index = faiss.read_index(os.path.join(base_dir, delta['file']))
+            # quantizer / 코드북이 같아야 함 (check_compatible), id는 delta에 저장된 값 그대로 (add_id=0)
+            base_ivf.merge_from(faiss.extract_index_ivf(delta_index), 0)
+            merged += delta_index.ntotal
+            logging.info(f'''MuseSegments.compact: merged {delta['file']} ({delta_index.ntotal})''')
+        removed = 0
+        if remove_ids is not None and len(remove_ids):
+            ids = np.ascontiguousarray(remove_ids, dtype='int64')
+            # inverted list 전체를 훑어 id가 selector에 있는 항목을 지움 (남은 벡터의 id는 그대로)
+            removed = int(base_ivf.remove_ids(faiss.IDSelectorBatch(len(ids), faiss.swig_ptr(ids))))
+            logging.info(f'''MuseSegments.compact: removed {removed} deleted-row vectors ({len(ids)} ids)''')
+        # OPQ / PCA pre-transform이면 바깥 인덱스의 ntotal도 맞춤
+        index.ntotal = base_ivf.ntotal
+
+        faiss.write_index(index, f'{output_path}.tmp')
+        os.replace(f'{output_path}.tmp', output_path)
+        MuseSegments.write(output_path, {
+            'base_ntotal': int(index.ntotal),
+            'removed': manifest.get('removed', 0) + removed,
+            'last_idx': manifest['last_idx'],
+            'deltas': []
+        })
+        template_path = MuseSegments.template_path(base_path)
+        if os.path.exists(template_path) and template_path != MuseSegments.template_path(output_path):
+            shutil.copyfile(template_path, MuseSegments.template_path(output_path))
+        return {'base_ntotal': int(index.ntotal), 'merged_deltas': len(manifest['deltas']), 'merged_ntotal': int(merged), 'removed': removed}
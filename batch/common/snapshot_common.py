@@ -0,0 +1,212 @@
+import json
+import logging
+import os
+import numpy as np
+from common.dataloader_common import MuseDataLoader
+from common.song_id_common import MuseSongId
+from common.vector_codec_common import MuseVectorCodec
+
+class MuseSnapshot:
+    """
+    임베딩 테이블의 로컬 columnar 사본 (학습 / 추가 / 벤치마크 / 서버 유사곡 조회를 MySQL 전체 조회 없이 디스크에서 읽음)
+
+    {path}/
+        manifest.json               {"model", "type", "d", "rows", "last_idx", "song_rows", "shards": [{"name", "rows", "first_idx", "last_idx"}]}
+        shard_00000.npy             float32 (rows, d) 벡터 (np.load(mmap_mode='r')로 읽음)
+        shard_00000.idx.npy         int64 DB idx (오름차순, FAISS id = idx - 1)
+        shard_00000.song.npy        int64 MuseSongId(chunk 0), 표현할 수 없는 곡은 -1
+        song_sorted.npy             전체 row의 song id 정렬본 (서버 곡 → 벡터 조회용)
+        song_order.npy              song_sorted 순서의 전체 row 번호
+
+    - export는 manifest의 last_idx 이후 row만 새 shard로 추가 (기존 shard는 다시 쓰지 않음)
+    - 파일은 .tmp에 쓴 뒤 os.replace, manifest는 shard를 다 쓴 뒤 마지막에 교체하므로 중단되어도 이전 상태 유지
+    - 서버 common/snapshot_common.py가 같은 디렉토리를 읽기 전용으로 사용
+    """
+    _shard_rows = 1000000
+    _manifest_file = 'manifest.json'
+
+    def __init__(self, path):
+        self.path = path
+        self.manifest = MuseSnapshot.read_manifest(path)
+        self._shards = None
+
+    @staticmethod
+    def default_path(model, embedding_type):
+        return f'./snapshot/{model}_{embedding_type}'
+
+    @staticmethod
+    def read_manifest(path):
+        manifest_path = f'{path}/{MuseSnapshot._manifest_file}'
+        if not os.path.exists(manifest_path):
+            return {}
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+
+    def exists(self):
+        return bool(self.manifest.get('shards'))
+
+    @property
+    def d(self):
+        return self.manifest.get('d')
+
+    @property
+    def rows(self):
+        return self.manifest.get('rows', 0)
+
+    @property
+    def last_idx(self):
+        return self.manifest.get('last_idx', 0)
+
+    def _save(self, name, array):
+        # np.save는 .npy가 없으면 붙이므로 tmp 파일명도 .npy로 끝나게 함
+        tmp_path = f'{self.path}/{name}.tmp.npy'
+        np.save(tmp_path, array)
+        os.replace(tmp_path, f'{self.path}/{name}.npy')
+
+    def _write_manifest(self):
+        tmp_path = f'{self.path}/{MuseSnapshot._manifest_file}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, f'{self.path}/{MuseSnapshot._manifest_file}')
+        self._shards = None
+
+    def _write_shard(self, vectors, idx, song):
+        shards = self.manifest['shards']
+        name = f'shard_{len(shards):05d}'
+        self._save(name, vectors)
+        self._save(f'{name}.idx', np.asarray(idx, dtype='int64'))
+        self._save(f'{name}.song', np.asarray(song, dtype='int64'))
+        shards.append({'name': name, 'rows': len(idx), 'first_idx': int(idx[0]), 'last_idx': int(idx[-1])})
+        self.manifest['rows'] = self.rows + len(idx)
+        self.manifest['last_idx'] = int(idx[-1])
+        self._write_manifest()
+        logging.info(f'''MuseSnapshot: {self.path}/{name} {len(idx)} rows (DB idx {idx[0]} ~ {idx[-1]})''')
+
+    def write_song_order(self):
+        """전체 row를 song id 기준으로 정렬한 조회용 파일 (같은 곡 안에서는 idx 순서 유지)"""
+        songs = np.concatenate([np.load(f'{self.path}/{shard["name"]}.song.npy') for shard in self.manifest['shards']])
+        order = np.argsort(songs, kind='stable')
+        self._save('song_order', order.astype('int64'))
+        self._save('song_sorted', songs[order])
+        self.manifest['song_rows'] = int(len(songs))
+        self._write_manifest()
+
+    def export(self, model, embedding_type, end_idx=None, shard_rows=None, fetch_size=5000):
+        """
+        DB idx (manifest last_idx, end_idx)를 shard로 추가 (end_idx가 없으면 테이블 마지막 idx까지)
+
+        Returns:
+            {'rows': 이번에 추가한 row 수, 'shards': 이번에 추가한 shard 수, 'last_idx', 'total_rows'}
+        """
+        os.makedirs(self.path, exist_ok=True)
+        dimension = MuseDataLoader.get_dimension(model, embedding_type)
+        if self.manifest and (self.manifest['model'], self.manifest['type'], self.manifest['d']) != (model, embedding_type, dimension):
+            raise ValueError(f'''MuseSnapshot: {self.path} is {self.manifest['model']}_{self.manifest['type']} (d={self.manifest['d']}), not {model}_{embedding_type} (d={dimension})''')
+        if not self.manifest:
+            self.manifest = {'model': model, 'type': embedding_type, 'd': dimension, 'rows': 0, 'last_idx': 0, 'song_rows': 0, 'shards': []}
+
+        if end_idx is None:
+            end_idx = (MuseDataLoader.get_last_idx(model=model, embedding_type=embedding_type) or 0) + 1
+        start_idx = self.last_idx + 1
+        shard_rows = shard_rows or MuseSnapshot._shard_rows
+        shard_count = len(self.manifest['shards'])
+        exported = 0
+
+        vectors = np.empty((shard_rows, dimension), dtype='float32')
+        idx, song = [], []
+        for rows in MuseDataLoader.stream_add_rows(model, embedding_type, start_idx, end_idx, with_song=True, fetch_size=fetch_size):
+            decoded = MuseVectorCodec.decode_many([row[3] for row in rows], dimension)
+            pos = 0
+            while pos < len(rows):
+                take = min(len(rows) - pos, shard_rows - len(idx))
+                vectors[len(idx):len(idx) + take] = decoded[pos:pos + take]
+                for row in rows[pos:pos + take]:
+                    song_id = MuseSongId.pack(row[1], row[2])
+                    idx.append(row[0])
+                    song.append(-1 if song_id is None else song_id)
+                pos += take
+                if len(idx) == shard_rows:
+                    self._write_shard(vectors, idx, song)
+                    exported += len(idx)
+                    idx, song = [], []
+        if idx:
+            self._write_shard(vectors[:len(idx)], idx, song)
+            exported += len(idx)
+
+        if exported or self.manifest.get('song_rows') != self.rows:
+            self.write_song_order()
+        return {
+            'rows': exported,
+            'shards': len(self.manifest['shards']) - shard_count,
+            'last_idx': self.last_idx,
+            'total_rows': self.rows
+        }
+
+    def shards(self):
+        """[(manifest shard, 벡터 mmap, idx mmap, song mmap), ...]"""
+        if self._shards is None:
+            self._shards = [
+                (
+                    shard,
+                    np.load(f'{self.path}/{shard["name"]}.npy', mmap_mode='r'),
+                    np.load(f'{self.path}/{shard["name"]}.idx.npy', mmap_mode='r'),
+                    np.load(f'{self.path}/{shard["name"]}.song.npy', mmap_mode='r')
+                )
+                for shard in self.manifest.get('shards', [])
+            ]
+        return self._shards
+
+    def iter_rows(self, start_idx, end_idx, chunk_rows=50000):
+        """
+        DB idx [start_idx, end_idx) 범위를 idx 순서로 chunk_rows씩 읽음
+
+        Yields:
+            (idx int64 배열, float32 (n, d) 벡터, song id int64 배열) - 벡터는 mmap에서 복사한 연속 배열
+        """
+        for shard, vectors, idx, song in self.shards():
+            if shard['last_idx'] < start_idx or shard['first_idx'] >= end_idx:
+                continue
+            lo = int(np.searchsorted(idx, start_idx, side='left'))
+            hi = int(np.searchsorted(idx, end_idx, side='left'))
+            for i in range(lo, hi, chunk_rows):
+                j = min(hi, i + chunk_rows)
+                yield np.asarray(idx[i:j]), np.ascontiguousarray(vectors[i:j]), np.asarray(song[i:j])
+
+    def train_vectors(self, selected_mod=None, max_size=None, seed=0):
+        """
+        학습 샘플 (DB의 idx_mod_100 조건과 같은 idx % 100 in selected_mod)
+        max_size보다 많으면 전체 샘플에서 균등하게 max_size개 선택
+
+        Returns:
+            float32 (n, d) 배열
+        """
+        selected_mod = np.asarray(selected_mod or MuseDataLoader._selected_mod)
+        masks = [np.isin(np.asarray(idx) % 100, selected_mod) for _, _, idx, _ in self.shards()]
+        total = int(sum(mask.sum() for mask in masks))
+        size = min(total, max_size) if max_size else total
+        keep = np.sort(np.random.default_rng(seed).choice(total, size=size, replace=False)) if size < total else None
+
+        train_vectors = np.empty((size, self.d), dtype='float32')
+        seen, filled = 0, 0
+        for (_, vectors, _, _), mask in zip(self.shards(), masks):
+            rows = np.flatnonzero(mask)
+            if keep is not None:
+                # 전체 샘플 번호(seen ~ seen + len(rows)) 중 선택된 것만
+                lo, hi = np.searchsorted(keep, [seen, seen + len(rows)])
+                rows = rows[keep[lo:hi] - seen]
+            seen += int(mask.sum())
+            train_vectors[filled:filled + len(rows)] = vectors[rows]
+            filled += len(rows)
+        logging.info(f'''MuseSnapshot.train_vectors: {filled} vectors (sampled from {total}) in {self.path}''')
+        return train_vectors
+
+    def info(self):
+        return {
+            'path': self.path,
+            'model': self.manifest.get('model'),
+            'type': self.manifest.get('type'),
+            'd': self.d,
+            'rows': self.rows,
+            'last_idx': self.last_idx,
+            'shards': len(self.manifest.get('shards', []))
+        }
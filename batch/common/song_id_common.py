@@ -0,0 +1,70 @@
+import logging
+from typing import Optional, Tuple
+
+class MuseSongId:
+    """
+    곡 식별자를 그대로 담은 64bit FAISS id (add_with_ids용, 서버 common/song_id_common.py와 동일한 구성)
+
+    [0][disccommseq 36bit][trackno 12bit][chunk 15bit]
+    - trackno: (숫자 값 << 2 | 자릿수-1) + 1 ('01'과 '1'을 구분해 Oracle TRACK_NO 문자열 그대로 복원, 0은 trackno 없음)
+    - chunk: 같은 곡의 가사 window 번호 (곡 단위 테이블은 0)
+    - album_name 테이블은 trackno 없이 disccommseq만 (trackno 필드 0)
+    """
+    _chunk_bits = 15
+    _track_bits = 12
+    _disc_bits = 36
+    _track_value_max = 1000
+    _track_width_max = 4
+
+    @staticmethod
+    def pack(disccommseq, trackno=None, chunk: int = 0) -> Optional[int]:
+        """표현할 수 없는 값(숫자가 아닌 trackno, 범위 초과)이면 None"""
+        try:
+            disc = int(disccommseq)
+        except (TypeError, ValueError):
+            return None
+        if not 0 <= disc < (1 << MuseSongId._disc_bits) or not 0 <= chunk < (1 << MuseSongId._chunk_bits):
+            return None
+        track = 0
+        if trackno is not None:
+            text = str(trackno).strip()
+            if not text.isdigit() or len(text) > MuseSongId._track_width_max or int(text) > MuseSongId._track_value_max:
+                return None
+            track = ((int(text) << 2) | (len(text) - 1)) + 1
+        return (((disc << MuseSongId._track_bits) | track) << MuseSongId._chunk_bits) | chunk
+
+    @staticmethod
+    def unpack(song_id: int) -> Tuple[int, Optional[str], int]:
+        """id → (disccommseq, trackno 문자열 또는 None, chunk)"""
+        chunk = song_id & ((1 << MuseSongId._chunk_bits) - 1)
+        track = (song_id >> MuseSongId._chunk_bits) & ((1 << MuseSongId._track_bits) - 1)
+        disc = song_id >> (MuseSongId._chunk_bits + MuseSongId._track_bits)
+        trackno = str((track - 1) >> 2).zfill(((track - 1) & 3) + 1) if track else None
+        return disc, trackno, chunk
+
+
+class SongIdPacker:
+    """
+    add 순서대로 row의 song id 생성
+
+    - 같은 곡이 연속으로 나오면(가사 window) chunk 번호 증가, 곡이 바뀌면 0부터
+    - 여러 배치에 걸쳐 호출해도 직전 곡 상태를 유지 (일일 배치 경계에서 끊기면 chunk가 겹칠 수 있으나 IVF는 중복 id 허용)
+    """
+
+    def __init__(self, max_chunk: int = 0):
+        self.last_song = None
+        self.chunk = 0
+        self.max_chunk = max_chunk
+        self.skipped = 0
+
+    def pack(self, disccommseq, trackno=None) -> Optional[int]:
+        song = (disccommseq, trackno)
+        self.chunk = self.chunk + 1 if song == self.last_song else 0
+        self.last_song = song
+        song_id = MuseSongId.pack(disccommseq, trackno, self.chunk)
+        if song_id is None:
+            self.skipped += 1
+            logging.warning(f'''SongIdPacker: song id로 표현할 수 없는 row 제외 ({disccommseq}, {trackno}, chunk={self.chunk})''')
+            return None
+        self.max_chunk = max(self.max_chunk, self.chunk)
+        return song_id
@@ -0,0 +1,147 @@
+import faiss
+import json
+import logging
+import os
+import numpy as np
+from datetime import datetime
+from common.dataloader_common import MuseDataLoader
+from common.faiss_common import MuseFaiss
+from common.mysql_common import Database
+from common.segment_common import MuseSegments
+from common.song_id_common import MuseSongId
+
+class MuseTombstones:
+    """
+    key별 검색 제외 목록 (금지 / 삭제된 곡, 서버 common/tombstone_common.py가 검색 시 IDSelector로 제외)
+
+    - {stem}.tombstone.npy
+        idx id 인덱스: FAISS id 비트맵 uint8 (np.packbits bitorder little, bit i == FAISS id i == DB idx i + 1)
+        song id 인덱스: 제외 곡 song id(chunk 0) 정렬 배열 int64 (서버가 max_chunk까지 확장)
+    - {stem}.tombstone.removed.npy: idx id 인덱스의 삭제 row만 담은 같은 형식의 비트맵 (compaction용, 서버로 복사하지 않음)
+    - {stem}.tombstone.json: {"id_format", "ntotal", "max_chunk", "count", "banned", "removed", "built_at"}
+
+    - banned: tb_playlist_song_pool_m에서 곡이 들어 있는 모든 program에서 is_banned = 1인 곡
+    - removed: idx id 인덱스에서 임베딩 테이블에 row가 더 이상 없는 위치 (카탈로그에서 빠져 row가 삭제된 곡)
+      song id 인덱스는 id가 곡 자체라 빈 위치가 없으므로 banned만 기록
+    - 매번 테이블 전체의 곡 식별 컬럼(벡터 제외)을 다시 읽어 새로 만듦 (해제된 곡은 다음 빌드에서 빠짐)
+    - 금지는 해제될 수 있으므로 검색 시 제외만 하고, compact_faiss --tombstone은 removed(삭제 row)만 remove_ids로 인덱스에서 지움
+    """
+    _fetch_size = 50000
+
+    @staticmethod
+    def _stem(index_path):
+        return index_path[:-len('.index')] if index_path.endswith('.index') else index_path
+
+    @staticmethod
+    def path(index_path):
+        return f'{MuseTombstones._stem(index_path)}.tombstone.npy'
+
+    @staticmethod
+    def removed_path(index_path):
+        return f'{MuseTombstones._stem(index_path)}.tombstone.removed.npy'
+
+    @staticmethod
+    def meta_path(index_path):
+        return f'{MuseTombstones._stem(index_path)}.tombstone.json'
+
+    @staticmethod
+    def read_meta(index_path):
+        meta_path = MuseTombstones.meta_path(index_path)
+        if not os.path.exists(meta_path):
+            return {}
+        with open(meta_path, 'r') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _id_end(index_path):
+        """idx id 인덱스의 FAISS id 범위 (segment 구성이면 manifest 기준, 지운 id 자리 포함)"""
+        manifest = MuseSegments.read(index_path)
+        if manifest is not None:
+            return MuseSegments.next_id(manifest)
+        # ntotal만 필요하므로 inverted list는 mmap으로 열어 전체를 메모리에 올리지 않음
+        return int(faiss.read_index(index_path, faiss.IO_FLAG_MMAP).ntotal)
+
+    @staticmethod
+    def build(model, embedding_type, index_path, fetch_size=None):
+        """
+        인덱스의 tombstone을 새로 만들어 인덱스 옆에 저장 (npy → json 순서로 교체)
+
+        Returns:
+            tombstone 메타
+        """
+        banned_rows = Database.get_banned_songs()
+        if banned_rows is None:
+            raise ValueError('MuseTombstones.build: failed to read banned songs')
+        banned = {song_id for song_id in (MuseSongId.pack(disc, track) for disc, track in banned_rows) if song_id is not None}
+
+        index_meta = MuseFaiss.read_meta(index_path)
+        song_format = index_meta.get('id_format') == 'song'
+        id_end = index_meta.get('last_idx', 0) + 1 if song_format else MuseTombstones._id_end(index_path) + 1
+        banned_sorted = np.array(sorted(banned), dtype='int64')
+
+        present = np.zeros(0 if song_format else id_end - 1, dtype=bool)
+        dead = np.zeros(0 if song_format else id_end - 1, dtype=bool)
+        dead_songs = set()
+        rows_read = 0
+        for rows in MuseDataLoader.stream_song_rows(model, embedding_type, 1, id_end, fetch_size=fetch_size or MuseTombstones._fetch_size):
+            rows_read += len(rows)
+            songs = (MuseSongId.pack(disc, track) for _, disc, track in rows)
+            songs = np.array([-1 if song_id is None else song_id for song_id in songs], dtype='int64')
+            hit = np.isin(songs, banned_sorted)
+            if song_format:
+                dead_songs.update(songs[hit].tolist())
+                continue
+            pos = np.array([row[0] for row in rows], dtype='int64') - 1
+            present[pos] = True
+            dead[pos[hit]] = True
+
+        if song_format:
+            array = np.array(sorted(dead_songs), dtype='int64')
+            banned_count, removed_count, count = len(array), 0, len(array)
+        else:
+            banned_count = int(dead.sum())
+            removed = ~present
+            removed_count = int(removed.sum())
+            dead |= removed
+            count = int(dead.sum())
+            array = np.packbits(dead, bitorder='little')
+            # 삭제 row만 따로 저장 (compaction은 이 파일만 지움, 금지 곡은 인덱스에 남김)
+            MuseTombstones._save(MuseTombstones.removed_path(index_path), np.packbits(removed, bitorder='little'))
+
+        meta = {
+            'id_format': 'song' if song_format else 'idx',
+            'ntotal': id_end - 1,
+            'max_chunk': int(index_meta.get('max_chunk', 0)),
+            'count': count,
+            'banned': banned_count,
+            'removed': removed_count,
+            'rows': rows_read,
+            'built_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        path = MuseTombstones.path(index_path)
+        MuseTombstones._save(path, array)
+        meta_path = MuseTombstones.meta_path(index_path)
+        with open(f'{meta_path}.tmp', 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(f'{meta_path}.tmp', meta_path)
+        logging.info(f'''MuseTombstones: {path} {meta}''')
+        return meta
+
+    @staticmethod
+    def _save(path, array):
+        """np.save 후 교체 (np.save는 .npy가 없으면 붙이므로 tmp 파일명도 .npy로 끝나게 함)"""
+        tmp_path = f'{path[:-len(".npy")]}.tmp.npy'
+        np.save(tmp_path, array)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def removed_ids(index_path):
+        """
+        카탈로그에서 삭제된 row의 FAISS id 배열 (compaction remove_ids용), 없으면 빈 배열
+        금지 곡은 해제될 수 있으므로 포함하지 않음, song id 인덱스는 빈 위치가 없으므로 항상 빈 배열
+        """
+        path = MuseTombstones.removed_path(index_path)
+        meta = MuseTombstones.read_meta(index_path)
+        if not meta or meta['id_format'] == 'song' or not os.path.exists(path):
+            return np.zeros(0, dtype='int64')
+        return np.flatnonzero(np.unpackbits(np.load(path), count=meta['ntotal'], bitorder='little')).astype('int64')
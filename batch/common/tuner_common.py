@@ -0,0 +1,153 @@
+from common.dataloader_common import MuseDataLoader
+from common.song_id_common import SongIdPacker
+from datetime import datetime
+import faiss
+import json
+import logging
+import os
+import time
+import numpy as np
+
+class MuseTuner:
+    """nprobe / HNSW efSearch 조합별 recall-latency 측정 후 Pareto 최적 설정 선택"""
+    _nprobe_grid = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024]
+    _efsearch_grid = [16, 32, 64, 128, 256, 512]
+    _gt_window_size = 5000
+
+    @staticmethod
+    def ground_truth(model, embedding_type, queries, k, song_id=False):
+        """
+        DB 전체 벡터를 window 단위로 읽어 exact L2 top-k 계산
+
+        FAISS id는 add_faiss와 같은 규칙으로 row의 DB idx에서 계산
+        - idx id 인덱스: idx - 1
+        - song id 인덱스(song_id): SongIdPacker로 idx 순서대로 생성 (일일 배치 경계에서 window가 끊긴 곡은 chunk 번호가 다를 수 있음)
+        """
+        last_idx = MuseDataLoader.get_last_idx(model=model, embedding_type=embedding_type)
+        heap = faiss.ResultHeap(nq=len(queries), k=k)
+        packer = SongIdPacker() if song_id else None
+
+        for i in range(1, last_idx + 1, MuseTuner._gt_window_size):
+            end_idx = min(last_idx + 1, i + MuseTuner._gt_window_size)
+            vectors = MuseDataLoader.get_add_vectors(model=model, embedding_type=embedding_type, start_idx=i, end_idx=end_idx)
+            if not vectors:
+                continue
+            rows = [row for batch in MuseDataLoader.stream_song_rows(model, embedding_type, i, end_idx, fetch_size=MuseTuner._gt_window_size) for row in batch]
+            if len(rows) != len(vectors):
+                raise ValueError(f'''MuseTuner.ground_truth: DB idx {i} ~ {end_idx - 1} rows changed while reading ({len(rows)} != {len(vectors)})''')
+            if packer is None:
+                ids = np.array([idx - 1 for idx, _, _ in rows], dtype='int64')
+            else:
+                songs = (packer.pack(disccommseq, trackno) for _, disccommseq, trackno in rows)
+                ids = np.array([-1 if song is None else song for song in songs], dtype='int64')
+            # song id로 표현할 수 없는 row는 add 때처럼 제외
+            valid = ids >= 0
+            xb = np.array(vectors, dtype='float32')[valid]
+            ids = ids[valid]
+            if len(xb) == 0:
+                continue
+            D, I = faiss.knn(queries, xb, min(k, len(xb)))
+            heap.add_result(D, np.ascontiguousarray(ids[I]))
+            if (i // MuseTuner._gt_window_size) % 100 == 0:
+                logging.info(f'''GROUND TRUTH: DB idx {i} / {last_idx}''')
+
+        heap.finalize()
+        return heap.D, heap.I
+
+    @staticmethod
+    def recall_at_k(I, gt_I, k):
+        hits = 0
+        for found, truth in zip(I, gt_I):
+            hits += len(set(found[:k]) & set(truth[:k]))
+        return hits / (len(gt_I) * k)
+
+    @staticmethod
+    def measure(muse_faiss, queries, gt_I, k, nprobe, efSearch):
+        """서버와 같은 조건(단일 쿼리 검색)으로 latency 측정"""
+        latencies = []
+        I = np.empty((len(queries), k), dtype='int64')
+        for q in range(len(queries)):
+            start = time.perf_counter()
+            _, I_q = muse_faiss.search_with_params(queries[q:q + 1], k, nprobe=nprobe, efSearch=efSearch)
+            latencies.append((time.perf_counter() - start) * 1000)
+            I[q] = I_q[0]
+
+        return {
+            'nprobe': nprobe,
+            'efSearch': efSearch,
+            'recall': round(MuseTuner.recall_at_k(I, gt_I, k), 4),
+            'latency_ms': round(float(np.percentile(latencies, 50)), 3),
+            'latency_p99_ms': round(float(np.percentile(latencies, 99)), 3)
+        }
+
+    @staticmethod
+    def pareto(points):
+        """latency 오름차순으로 보며 recall이 갱신되는 점만 유지"""
+        front = []
+        best_recall = -1.0
+        for point in sorted(points, key=lambda x: (x['latency_ms'], -x['recall'])):
+            if point['recall'] > best_recall:
+                front.append(point)
+                best_recall = point['recall']
+        return front
+
+    @staticmethod
+    def tune(muse_faiss, model, embedding_type, k=100, sample_size=500, target_recall=0.9, song_id=False):
+        samples = MuseDataLoader.get_sample_vectors(model=model, embedding_type=embedding_type, sample_size=sample_size)
+        if not samples:
+            logging.error('MuseTuner.tune: no sample vectors')
+            return None
+        queries = np.array([vector for _, vector in samples], dtype='float32')
+
+        logging.info(f'''GROUND TRUTH 계산 중... (nq={len(queries)}, k={k})''')
+        _, gt_I = MuseTuner.ground_truth(model=model, embedding_type=embedding_type, queries=queries, k=k, song_id=song_id)
+
+        nlist = muse_faiss.nlist()
+        if nlist is None:
+            logging.error('MuseTuner.tune: nprobe 튜닝은 IVF 계열 인덱스만 지원')
+            return None
+        nprobe_grid = [nprobe for nprobe in MuseTuner._nprobe_grid if nprobe <= nlist]
+        efsearch_grid = MuseTuner._efsearch_grid if muse_faiss.has_hnsw_quantizer() else [None]
+
+        points = []
+        for efSearch in efsearch_grid:
+            for nprobe in nprobe_grid:
+                # efSearch가 nprobe보다 작으면 HNSW가 nprobe개를 제대로 찾지 못하므로 제외
+                if efSearch is not None and efSearch < nprobe:
+                    continue
+                point = MuseTuner.measure(muse_faiss, queries, gt_I, k, nprobe, efSearch)
+                logging.info(f'''TUNE {point}''')
+                points.append(point)
+
+        front = MuseTuner.pareto(points)
+        selected = next((point for point in front if point['recall'] >= target_recall), None)
+        if selected is None:
+            # 목표 recall에 닿는 설정이 없으면 ground truth id가 인덱스 id와 어긋난 경우일 수 있으므로 저장하지 않음
+            logging.error(f'''MuseTuner.tune: target recall {target_recall} not reached (best {front[-1]}), profile not written''')
+            return None
+        logging.info(f'''SELECTED {selected} (target recall {target_recall})''')
+
+        profile = {
+            'nprobe': selected['nprobe'],
+            'recall': selected['recall'],
+            'latency_ms': selected['latency_ms'],
+            'k': k,
+            'nq': len(queries),
+            'target_recall': target_recall,
+            'pareto': front,
+            'tuned_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        if selected['efSearch'] is not None:
+            profile['efSearch'] = selected['efSearch']
+        return profile
+
+    @staticmethod
+    def write_profile(path, key, profile):
+        """key별 프로파일을 기존 파일에 병합 저장 (서버 MuseFaiss.load_search_profiles 형식)"""
+        profiles = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                profiles = json.load(f)
+        profiles[key] = profile
+        with open(path, 'w') as f:
+            json.dump(profiles, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,46 @@
+import json
+import os
+import numpy as np
+
+class MuseVectorStore:
+    """
+    FAISS 인덱스에 추가한 원본 벡터의 float16 사본 (서버 refine 단계의 exact 거리 계산용)
+
+    - {path}: header 없는 float16 row-major 배열, row 번호 == FAISS id (add_faiss와 같은 순서로 append)
+    - {path}.json: {"d": 차원, "rows": row 수}, 벡터 파일을 다 쓴 뒤 마지막에 갱신 (서버는 rows까지만 사용)
+    """
+    _dtype = np.float16
+
+    def __init__(self, path, d=512):
+        self.path = path
+        self.meta_path = f'{path}.json'
+        self.d = d
+        self.row_bytes = d * np.dtype(self._dtype).itemsize
+
+    def rows(self):
+        """meta 기준 row 수 (meta 갱신 전에 중단된 append는 버리고 그 지점부터 다시 씀)"""
+        if not os.path.exists(self.meta_path) or not os.path.exists(self.path):
+            return 0
+        with open(self.meta_path, 'r') as f:
+            meta = json.load(f)
+        if meta.get('d') != self.d:
+            raise ValueError(f'dimension mismatch: {self.meta_path} d={meta.get("d")}, expected {self.d}')
+        return min(int(meta.get('rows', 0)), os.path.getsize(self.path) // self.row_bytes)
+
+    def truncate(self, rows):
+        with open(self.path, 'ab') as f:
+            f.truncate(rows * self.row_bytes)
+
+    def append(self, vectors):
+        vectors = np.ascontiguousarray(vectors, dtype=self._dtype)
+        if vectors.ndim != 2 or vectors.shape[1] != self.d:
+            raise ValueError(f'vector shape {vectors.shape} does not match d={self.d}')
+        with open(self.path, 'ab') as f:
+            f.write(vectors.tobytes())
+        return len(vectors)
+
+    def write_meta(self, rows):
+        tmp_path = f'{self.meta_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'d': self.d, 'rows': rows, 'dtype': 'float16'}, f)
+        os.replace(tmp_path, self.meta_path)
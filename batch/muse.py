@@ -1,6 +1,7 @@
 import logging
 import os
 import argparse
+import json
 import math
 import numpy as np
 from datetime import datetime
@@ -8,9 +9,57 @@ from common.logger_common import Logger
 from common.dataloader_common import MuseDataLoader
 from common.faiss_common import MuseFaiss
 from common.playlist_common import PlaylistLoader
+from common.tuner_common import MuseTuner
+from common.vector_store_common import MuseVectorStore
+from common.song_id_common import SongIdPacker
+from common.registry_common import MuseRegistry
+from common.ingest_common import MuseIngest
+from common.snapshot_common import MuseSnapshot
+from common.segment_common import MuseSegments
+from common.tombstone_common import MuseTombstones
 
 Logger.set_logger(log_path='./logs', file_name='etc.log')
 
+def add_ingest_arguments(parser):
+    """add_faiss / add_daily_faiss 공통 파이프라인 옵션 (MuseIngest)"""
+    parser.add_argument('--fetch_size', type=int, default=None, help='Rows per server-side cursor fetch (default 5000)')
+    parser.add_argument('--add_batch_size', type=int, default=None, help='Rows per index.add call (default 50000)')
+    parser.add_argument('--read_depth', type=int, default=None, help='Fetched chunks queued ahead of decode (default 4)')
+    parser.add_argument('--decode_depth', type=int, default=None, help='Chunks in flight in decode workers (default workers * 2)')
+    parser.add_argument('--decode_workers', type=int, default=None, help='Vector decode processes (default 4, 0: in-process)')
+    parser.add_argument('--ingest_report', type=str, default=None, help='Write per-stage throughput report json')
+    parser.add_argument('--snapshot', type=str, default=None, help='Read rows up to the snapshot last_idx from this local snapshot (export_snapshot), the rest from MySQL')
+
+def run_ingest(args, muse_faiss, packer, start_idx, end_idx, next_id=None):
+    """DB idx [start_idx, end_idx)를 파이프라인으로 추가하고 단계별 처리량 기록 (--snapshot이 있으면 스냅샷 범위는 로컬 파일에서)"""
+    ingest = MuseIngest(
+        muse_faiss, packer=packer, fetch_size=args.fetch_size, add_batch_size=args.add_batch_size,
+        read_depth=args.read_depth, decode_depth=args.decode_depth, workers=args.decode_workers, next_id=next_id
+    )
+    wall_start = datetime.now()
+    snapshot_rows = 0
+    snapshot = MuseSnapshot(args.snapshot) if args.snapshot else None
+    if snapshot is not None and not snapshot.exists():
+        logging.warning(f'''스냅샷이 없어 MySQL에서 읽습니다: {args.snapshot}''')
+    elif snapshot is not None and snapshot.d != muse_faiss.d:
+        logging.warning(f'''스냅샷 차원 {snapshot.d} != 인덱스 차원 {muse_faiss.d}, MySQL에서 읽습니다: {args.snapshot}''')
+    elif snapshot is not None:
+        snapshot_end = min(end_idx, snapshot.last_idx + 1)
+        if start_idx < snapshot_end:
+            logging.info(f'''스냅샷에서 추가: DB idx {start_idx} ~ {snapshot_end - 1} ({args.snapshot})''')
+            snapshot_rows = ingest.run_snapshot(snapshot, start_idx=start_idx, end_idx=snapshot_end)['rows']
+            start_idx = snapshot_end
+    if start_idx < end_idx:
+        ingest.run(model=args.model, embedding_type=args.type, start_idx=start_idx, end_idx=end_idx)
+    report = ingest.report((datetime.now() - wall_start).total_seconds())
+    report['snapshot_rows'] = snapshot_rows
+    logging.info(f'''INGEST REPORT {json.dumps(report)}''')
+    logging.info(f'''{muse_faiss.info()}''')
+    if args.ingest_report:
+        with open(args.ingest_report, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
+
 if __name__ == "__main__":
     try:
         parser = argparse.ArgumentParser()
@@ -22,6 +71,11 @@ if __name__ == "__main__":
         train_parser.add_argument('--type', type=str, required=True, help='Select a type(song, artist, song_name)')
         train_parser.add_argument('--output', type=str, required=True, help='Output file path')
         train_parser.add_argument('--dimension', type=int, required=True, help='dimension of model')
+        train_parser.add_argument('--max_train_size', type=int, default=None, help='Cap of training sample (reservoir sampling over the 5% sample)')
+        train_parser.add_argument('--decode_workers', type=int, default=None, help='Vector decode processes (0: in-process)')
+        train_parser.add_argument('--train_memmap', type=str, default=None, help='Write training sample to this memmap file instead of memory')
+        train_parser.add_argument('--snapshot', type=str, default=None, help='Read the training sample from this local snapshot (export_snapshot) instead of MySQL')
+        train_parser.add_argument('--factory', type=str, default=None, help='faiss index_factory spec, {nlist} = sqrt(train size) (default: registry factory, else IVF{nlist}_HNSW32,PQ16x8)')
 
         # add parser
         vector_add_parser = subparsers.add_parser('add_faiss', help='Add vectors into pre-clustered FAISS')
@@ -30,6 +84,10 @@ if __name__ == "__main__":
         vector_add_parser.add_argument('--dimension', type=int, required=True, help='dimension of model')
         vector_add_parser.add_argument('--input', type=str, required=True, help='Input file path')
         vector_add_parser.add_argument('--output', type=str, required=True, help='Output file path')
+        vector_add_parser.add_argument('--start_idx', type=int, default=1, help='First DB idx to add (id-range shard)')
+        vector_add_parser.add_argument('--end_idx', type=int, default=None, help='Last DB idx to add, inclusive (id-range shard)')
+        vector_add_parser.add_argument('--id_format', type=str, default='idx', choices=['idx', 'song'], help='FAISS id: idx(MySQL idx - 1) or song(packed disccommseq/trackno/chunk)')
+        add_ingest_arguments(vector_add_parser)
 
         # add daily parser
         daily_add_parser = subparsers.add_parser('add_daily_faiss', help='Add daily new vectors into existing FAISS index')
@@ -37,13 +95,70 @@ if __name__ == "__main__":
         daily_add_parser.add_argument('--type', type=str, required=True, help='Select a type(song, artist, song_name)')
         daily_add_parser.add_argument('--dimension', type=int, required=True, help='dimension of model')
         daily_add_parser.add_argument('--input', type=str, required=True, help='Input file path (existing FAISS index)')
-        daily_add_parser.add_argument('--output', type=str, required=True, help='Output file path')
+        daily_add_parser.add_argument('--output', type=str, required=True, help='Output file path (with --segment: delta file in the same directory as --input)')
+        daily_add_parser.add_argument('--segment', action='store_true', help='Write only the new rows as a delta segment of --input (base index is not rewritten)')
+        add_ingest_arguments(daily_add_parser)
+
+        # compact parser
+        compact_parser = subparsers.add_parser('compact_faiss', help='Fold delta segments into a new base index with merge_from')
+        compact_parser.add_argument('--input', type=str, required=True, help='Base index path (with {stem}.segments.json)')
+        compact_parser.add_argument('--output', type=str, required=True, help='New base index path (may be the same as --input)')
+        compact_parser.add_argument('--keep_deltas', action='store_true', help='Keep merged delta files (deleted only when --output is --input)')
+        compact_parser.add_argument('--tombstone', action='store_true', help='Also remove_ids the catalog-deleted rows ({stem}.tombstone.removed.npy from build_tombstones) from the new base, banned songs stay in the index')
+
+        # tombstone parser
+        tombstone_parser = subparsers.add_parser('build_tombstones', help='Rebuild the per-index tombstone of banned / removed songs excluded at search time')
+        tombstone_parser.add_argument('--model', type=str, required=True, help='Select a model')
+        tombstone_parser.add_argument('--type', type=str, required=True, help='Select a type(song, artist, song_name)')
+        tombstone_parser.add_argument('--input', type=str, required=True, help='FAISS index path (tombstone is written next to it)')
+        tombstone_parser.add_argument('--fetch_size', type=int, default=None, help='Rows per server-side cursor fetch (default 50000)')
+
+        # vector store parser
+        store_parser = subparsers.add_parser('build_vector_store', help='Append float16 copy of vectors for server-side exact re-ranking')
+        store_parser.add_argument('--model', type=str, required=True, help='Select a model')
+        store_parser.add_argument('--type', type=str, required=True, help='Select a type(song, artist, song_name)')
+        store_parser.add_argument('--dimension', type=int, required=True, help='dimension of model')
+        store_parser.add_argument('--output', type=str, required=True, help='Vector store file path (e.g. muse_vibe.f16)')
 
         #info parer
         info_add_parser = subparsers.add_parser('info_faiss', help='info faiss index')
         info_add_parser.add_argument('--dimension', type=int, required=True, help='dimension of model')
         info_add_parser.add_argument('--input', type=str, required=True, help='Input file path')
 
+        # tune parser
+        tune_parser = subparsers.add_parser('tune_faiss', help='Sweep nprobe/efSearch and write per-key search params')
+        tune_parser.add_argument('--model', type=str, required=True, help='Select a model')
+        tune_parser.add_argument('--type', type=str, required=True, help='Select a type(song, artist, song_name)')
+        tune_parser.add_argument('--key', type=str, required=True, help='Server index key(vibe, artist, title, ...)')
+        tune_parser.add_argument('--dimension', type=int, required=True, help='dimension of model')
+        tune_parser.add_argument('--input', type=str, required=True, help='Input file path (FAISS index)')
+        tune_parser.add_argument('--output', type=str, required=True, help='Search params json path')
+        tune_parser.add_argument('--k', type=int, default=100, help='recall@k')
+        tune_parser.add_argument('--sample_size', type=int, default=500, help='number of sampled query vectors')
+        tune_parser.add_argument('--target_recall', type=float, default=0.9, help='minimum recall of selected setting')
+
+        # migrate parser
+        migrate_parser = subparsers.add_parser('migrate_embeddings', help='Rewrite npy embedding blobs as raw little-endian float32/float16')
+        migrate_parser.add_argument('--model', type=str, required=True, help='Select a model')
+        migrate_parser.add_argument('--type', type=str, required=True, help='Select a type(song, artist, song_name)')
+        migrate_parser.add_argument('--dtype', type=str, default='float32', choices=['float32', 'float16'], help='Raw blob dtype')
+        migrate_parser.add_argument('--start_idx', type=int, default=1, help='First DB idx to migrate')
+        migrate_parser.add_argument('--end_idx', type=int, default=None, help='Last DB idx to migrate, inclusive (default: DB max idx)')
+        migrate_parser.add_argument('--dry_run', action='store_true', help='Count rows to convert without updating')
+
+        # snapshot parser
+        snapshot_parser = subparsers.add_parser('export_snapshot', help='Export an embedding table incrementally to a local memory-mappable snapshot')
+        snapshot_parser.add_argument('--model', type=str, required=True, help='Select a model')
+        snapshot_parser.add_argument('--type', type=str, required=True, help='Select a type(song, artist, song_name)')
+        snapshot_parser.add_argument('--output', type=str, default=None, help='Snapshot directory (default: ./snapshot/{model}_{type})')
+        snapshot_parser.add_argument('--end_idx', type=int, default=None, help='Last DB idx to export, inclusive (default: DB max idx)')
+        snapshot_parser.add_argument('--shard_rows', type=int, default=None, help='Rows per shard file (default 1000000)')
+        snapshot_parser.add_argument('--fetch_size', type=int, default=5000, help='Rows per server-side cursor fetch')
+
+        # registry parser
+        registry_parser = subparsers.add_parser('registry', help='Show or write the resolved per-key index registry')
+        registry_parser.add_argument('--output', type=str, default=None, help='Write registry json (default: print only)')
+
         # cache_playlist parser (NEW!)
         cache_playlist_parser = subparsers.add_parser('cache_playlist', help='Cache playlist include_ids to Redis (permanent)')
 
@@ -57,15 +172,43 @@ if __name__ == "__main__":
         if args.func == 'train_faiss':
             Logger.set_logger(log_path=log_path, file_name= f'''train_{args.model}.log''')
  
-            train_vectors = MuseDataLoader.get_train_vectors(model=args.model, embedding_type=args.type)
+            snapshot = MuseSnapshot(args.snapshot) if args.snapshot else None
+            if snapshot is not None and snapshot.exists():
+                # 스냅샷 이후 추가된 row는 학습 샘플에서 빠지지만 클러스터 학습에는 영향이 작음
+                logging.info(f'''스냅샷에서 학습 샘플 조회: {snapshot.info()}''')
+                train_vectors = snapshot.train_vectors(max_size=args.max_train_size)
+            else:
+                if snapshot is not None:
+                    logging.warning(f'''스냅샷이 없어 MySQL에서 읽습니다: {args.snapshot}''')
+                train_vectors = MuseDataLoader.get_train_vectors(
+                    model=args.model, embedding_type=args.type, dimension=args.dimension,
+                    max_size=args.max_train_size, workers=args.decode_workers, memmap_path=args.train_memmap
+                )
 
-            if train_vectors:
+            if train_vectors is not None and len(train_vectors):
+                # --factory가 없으면 registry에 선언된 key별 구성 사용
+                key, entry = MuseRegistry.find(args.model, args.type)
+                factory = args.factory or (entry or {}).get('factory')
+                if entry and entry['dimension'] != args.dimension:
+                    logging.warning(f'''registry [{key}] dimension {entry['dimension']} != --dimension {args.dimension}''')
                 muse_faiss = MuseFaiss(d=args.dimension)
-                muse_faiss.set_index(nlist=int(math.sqrt(len(train_vectors))))
-                logging.info(f'''벡터 학습 중...''')
-                muse_faiss.train(vectors=np.array(train_vectors, dtype='float32'))
-                logging.info(f'''벡터 학습 완료''')
+                # registry key는 delta segment / song id(add_with_ids)와 compaction(merge_from)을 쓰므로 IVF 구성만 허용
+                muse_faiss.set_index(nlist=int(math.sqrt(len(train_vectors))), factory=factory, require_ivf=entry is not None)
+                logging.info(f'''벡터 학습 중... ({muse_faiss.factory})''')
+                train_start = datetime.now()
+                muse_faiss.train(vectors=train_vectors)
+                train_sec = (datetime.now() - train_start).total_seconds()
+                logging.info(f'''벡터 학습 완료 ({train_sec:.1f}s)''')
                 muse_faiss.write_index(args.output)                
+                # 인덱스 구성은 메타에 기록되어 add_faiss / add_daily_faiss 결과로 이어짐
+                MuseFaiss.write_meta(args.output, {
+                    'factory': muse_faiss.factory,
+                    'd': args.dimension,
+                    'nlist': muse_faiss.nlist(),
+                    'train_size': len(train_vectors),
+                    'train_sec': round(train_sec, 1),
+                    'trained_at': train_start.strftime('%Y-%m-%d %H:%M:%S')
+                })
                 logging.info(f'''벡터 cluster 생성 완료''')
 
         elif args.func == 'add_faiss':
@@ -75,25 +218,93 @@ if __name__ == "__main__":
             muse_faiss.read_index(args.input)
             
             last_idx = MuseDataLoader.get_last_idx(model=args.model, embedding_type=args.type)
+            if args.end_idx:
+                last_idx = min(last_idx, args.end_idx)
+            # song id 인덱스는 id 자체가 곡 식별자이므로 shard도 id_offset 0
+            packer = SongIdPacker() if args.id_format == 'song' else None
+            if args.start_idx > 1:
+                # id 범위 shard: shard 내부 id 0 == DB idx start_idx (search node의 id_offset = start_idx - 1)
+                logging.info(f'''SHARD RANGE: DB idx {args.start_idx} ~ {last_idx} (id_offset={args.start_idx - 1 if packer is None else 0})''')
 
-            for i in range(1, last_idx + 1, 5000):
-                add_vectors  = MuseDataLoader.get_add_vectors(model=args.model, embedding_type=args.type, start_idx=i, end_idx=min(last_idx+1, i+5000))
-                muse_faiss.add(vectors=np.array(add_vectors, dtype='float32'))
-                logging.info(f'''ADD COMPLETE({len(add_vectors)}) {i} ~ {min(last_idx, i+5000-1)}''')
-                logging.info(f'''{muse_faiss.info()}''')
+            run_ingest(args, muse_faiss, packer, start_idx=args.start_idx, end_idx=last_idx + 1)
 
             muse_faiss.write_index(args.output)
+            # 학습 인덱스의 메타(factory 등)를 이어받고 song id 정보 추가
+            meta = MuseFaiss.read_meta(args.input)
+            if packer is not None:
+                meta.update({'id_format': 'song', 'last_idx': last_idx, 'max_chunk': packer.max_chunk})
+                logging.info(f'''song id 인덱스: 제외 row {packer.skipped}개''')
+            if meta:
+                MuseFaiss.write_meta(args.output, meta)
+                logging.info(f'''메타 저장 완료: {MuseFaiss.meta_path(args.output)} {meta}''')
             
+        elif args.func == 'add_daily_faiss' and args.segment:
+            Logger.set_logger(log_path=log_path, file_name=f'''add_daily_{args.model}.log''')
+
+            # base 인덱스는 읽지 않고 manifest / template만 사용 (처음 한 번은 base를 읽어 template 생성)
+            meta = MuseFaiss.read_meta(args.input)
+            packer = SongIdPacker(max_chunk=meta.get('max_chunk', 0)) if meta.get('id_format') == 'song' else None
+            manifest = MuseSegments.init(args.input, last_idx=meta.get('last_idx', 0) if packer is not None else None)
+            added_idx = manifest['last_idx']
+            logging.info(f'''segment 인덱스: base {manifest['base_ntotal']} + delta {len(manifest['deltas'])}개, DB idx 1~{added_idx}까지 저장됨''')
+
+            last_idx = MuseDataLoader.get_last_idx(model=args.model, embedding_type=args.type)
+            logging.info(f'''DB의 마지막 idx: {last_idx}''')
+            start_from = added_idx + 1
+
+            if os.path.dirname(os.path.abspath(args.output)) != os.path.dirname(os.path.abspath(args.input)):
+                logging.error(f'''delta는 base와 같은 디렉토리에 있어야 합니다: {args.output}''')
+            elif any(delta['file'] == os.path.basename(args.output) for delta in manifest['deltas']):
+                logging.error(f'''이미 manifest에 있는 delta입니다: {args.output}''')
+            elif start_from > last_idx:
+                logging.info(f'''추가할 새로운 벡터가 없습니다. (FAISS에 저장된 DB idx: 1~{added_idx}, DB 최신 idx: {last_idx})''')
+            else:
+                muse_faiss = MuseFaiss(d=args.dimension)
+                muse_faiss.read_index(MuseSegments.template_path(args.input))
+                # idx id 인덱스는 base / 이전 delta 다음 위치부터 id를 이어 붙임
+                next_id = None if packer is not None else MuseSegments.next_id(manifest)
+                logging.info(f'''DB idx {start_from}부터 {last_idx}까지 delta 추가 시작 (first id {next_id})''')
+                report = run_ingest(args, muse_faiss, packer, start_idx=start_from, end_idx=last_idx + 1, next_id=next_id)
+                if report['rows']:
+                    muse_faiss.write_index(args.output)
+                    MuseSegments.add_delta(args.input, manifest, args.output, muse_faiss.ntotal(), next_id, start_from, last_idx)
+                    logging.info(f'''delta 저장 완료: {args.output} ({muse_faiss.ntotal()}), manifest {MuseSegments.manifest_path(args.input)}''')
+                else:
+                    logging.warning(f'''범위 DB idx {start_from} ~ {last_idx}에 추가할 벡터가 없습니다''')
+                    manifest['last_idx'] = last_idx
+                    MuseSegments.write(args.input, manifest)
+                if packer is not None:
+                    meta.update({'last_idx': last_idx, 'max_chunk': packer.max_chunk})
+                    MuseFaiss.write_meta(args.input, meta)
+                    logging.info(f'''song id 인덱스: 제외 row {packer.skipped}개''')
+
         elif args.func == 'add_daily_faiss':
             Logger.set_logger(log_path=log_path, file_name=f'''add_daily_{args.model}.log''')
 
+            manifest = MuseSegments.read(args.input)
+            if manifest and manifest['deltas']:
+                # base ntotal만으로는 delta에 들어간 row를 알 수 없으므로 중복 추가 방지
+                raise ValueError(f'''{args.input} has {len(manifest['deltas'])} delta segments, use --segment or compact_faiss first''')
+            if manifest and manifest.get('removed'):
+                # 삭제 row를 지운 base는 ntotal != 다음 id이므로 index.add로 이어 붙이면 id가 겹침
+                raise ValueError(f'''{args.input} has {manifest['removed']} removed ids, use --segment''')
+
             muse_faiss = MuseFaiss(d=args.dimension)
             muse_faiss.read_index(args.input)
 
             # 기존 인덱스에 저장된 벡터 개수 확인
             current_ntotal = muse_faiss.ntotal()
             logging.info(f'''현재 FAISS 인덱스에 저장된 벡터 수: {current_ntotal}''')
-            logging.info(f'''DB idx 1~{current_ntotal}까지 이미 FAISS에 저장됨 (FAISS index 0~{current_ntotal-1})''')
+
+            # song id 인덱스는 ntotal과 DB idx가 일치하지 않으므로(제외 row, 삭제) 메타의 last_idx 기준으로 이어서 추가
+            meta = MuseFaiss.read_meta(args.input)
+            packer = SongIdPacker(max_chunk=meta.get('max_chunk', 0)) if meta.get('id_format') == 'song' else None
+            if packer is None:
+                logging.info(f'''DB idx 1~{current_ntotal}까지 이미 FAISS에 저장됨 (FAISS index 0~{current_ntotal-1})''')
+                added_idx = current_ntotal
+            else:
+                added_idx = meta.get('last_idx', 0)
+                logging.info(f'''song id 인덱스: DB idx 1~{added_idx}까지 이미 FAISS에 저장됨''')
 
             # DB의 마지막 인덱스 확인
             last_idx = MuseDataLoader.get_last_idx(model=args.model, embedding_type=args.type)
@@ -102,24 +313,81 @@ if __name__ == "__main__":
             # 이미 추가된 부분은 건너뛰고, 새로운 부분만 추가
             # DB idx는 1부터 시작, FAISS는 0부터 시작하므로
             # ntotal이 N이면 DB idx 1~N이 FAISS index 0~N-1에 저장된 것
-            start_from = current_ntotal + 1
+            start_from = added_idx + 1
 
             if start_from > last_idx:
-                logging.info(f'''추가할 새로운 벡터가 없습니다. (FAISS에 저장된 DB idx: 1~{current_ntotal}, DB 최신 idx: {last_idx})''')
+                logging.info(f'''추가할 새로운 벡터가 없습니다. (FAISS에 저장된 DB idx: 1~{added_idx}, DB 최신 idx: {last_idx})''')
             else:
                 logging.info(f'''DB idx {start_from}부터 {last_idx}까지 추가 시작''')
-                # 1~5000
+                report = run_ingest(args, muse_faiss, packer, start_idx=start_from, end_idx=last_idx + 1)
+                if not report['rows']:
+                    logging.warning(f'''범위 DB idx {start_from} ~ {last_idx}에 추가할 벡터가 없습니다''')
+
+            muse_faiss.write_index(args.output)
+            logging.info(f'''인덱스 저장 완료: {args.output}''')
+            if packer is not None:
+                meta.update({'last_idx': max(added_idx, last_idx), 'max_chunk': packer.max_chunk})
+                logging.info(f'''song id 인덱스: 제외 row {packer.skipped}개''')
+            if meta:
+                MuseFaiss.write_meta(args.output, meta)
+                logging.info(f'''메타 저장 완료: {MuseFaiss.meta_path(args.output)}''')
+
+        elif args.func == 'compact_faiss':
+            Logger.set_logger(log_path=log_path, file_name=f'''compact_{os.path.basename(args.input)}.log''')
+            manifest = MuseSegments.read(args.input)
+            # 금지 곡은 해제될 수 있으므로 지우지 않고 (서버가 검색 시 제외) 카탈로그에서 삭제된 row만 지움
+            remove_ids = MuseTombstones.removed_ids(args.input) if args.tombstone else None
+            if (manifest is None or not manifest['deltas']) and (remove_ids is None or not len(remove_ids)):
+                logging.info(f'''합칠 delta / 지울 삭제 row가 없습니다: {args.input}''')
+            else:
+                if manifest is None:
+                    # 단일 인덱스도 tombstone 삭제 후에는 지운 id 수를 manifest에 남겨야 다음 delta id가 겹치지 않음
+                    meta = MuseFaiss.read_meta(args.input)
+                    manifest = MuseSegments.init(args.input, last_idx=meta.get('last_idx', 0) if meta.get('id_format') == 'song' else None)
+                compact_start = datetime.now()
+                result = MuseSegments.compact(args.input, args.output, remove_ids=remove_ids)
+                logging.info(f'''compaction 완료 ({(datetime.now() - compact_start).total_seconds():.1f}s): {args.output} {result}''')
+                meta = MuseFaiss.read_meta(args.input)
+                if meta and MuseFaiss.meta_path(args.output) != MuseFaiss.meta_path(args.input):
+                    MuseFaiss.write_meta(args.output, meta)
+                # 다른 경로로 만들었으면 기존 base의 delta는 그대로 둠
+                if not args.keep_deltas and os.path.abspath(args.output) == os.path.abspath(args.input):
+                    for delta in manifest['deltas']:
+                        delta_path = os.path.join(os.path.dirname(args.input), delta['file'])
+                        if os.path.exists(delta_path):
+                            os.remove(delta_path)
+                    logging.info(f'''delta {len(manifest['deltas'])}개 삭제''')
+
+        elif args.func == 'build_tombstones':
+            Logger.set_logger(log_path=log_path, file_name=f'''tombstone_{args.model}_{args.type}.log''')
+            tombstone_start = datetime.now()
+            meta = MuseTombstones.build(model=args.model, embedding_type=args.type, index_path=args.input, fetch_size=args.fetch_size)
+            logging.info(f'''tombstone 생성 완료 ({(datetime.now() - tombstone_start).total_seconds():.1f}s): {MuseTombstones.path(args.input)} (금지 {meta['banned']}, 삭제 {meta['removed']}, 전체 {meta['count']})''')
+
+        elif args.func == 'build_vector_store':
+            Logger.set_logger(log_path=log_path, file_name=f'''vector_store_{args.model}_{args.type}.log''')
+
+            store = MuseVectorStore(path=args.output, d=args.dimension)
+            # add_daily_faiss와 동일하게 row N개 == DB idx 1~N 저장됨, meta 이후 쓰다 만 부분은 잘라냄
+            current_rows = store.rows()
+            store.truncate(current_rows)
+            last_idx = MuseDataLoader.get_last_idx(model=args.model, embedding_type=args.type)
+            logging.info(f'''현재 vector store row 수: {current_rows}, DB의 마지막 idx: {last_idx}''')
+
+            start_from = current_rows + 1
+            if start_from > last_idx:
+                logging.info(f'''추가할 새로운 벡터가 없습니다. (저장된 DB idx: 1~{current_rows})''')
+            else:
+                rows = current_rows
                 for i in range(start_from, last_idx + 1, 5000):
                     add_vectors = MuseDataLoader.get_add_vectors(model=args.model, embedding_type=args.type, start_idx=i, end_idx=min(last_idx + 1, i+5000))
                     if add_vectors:
-                        muse_faiss.add(vectors=np.array(add_vectors, dtype='float32'))
-                        logging.info(f'''ADD COMPLETE({len(add_vectors)}) DB idx {i} ~ {min(last_idx, i+5000-1)}''')
-                        logging.info(f'''{muse_faiss.info()}''')
+                        rows += store.append(np.array(add_vectors, dtype='float32'))
+                        logging.info(f'''STORE COMPLETE({len(add_vectors)}) DB idx {i} ~ {min(last_idx, i+5000-1)}, rows={rows}''')
                     else:
                         logging.warning(f'''범위 DB idx {i} ~ {min(last_idx, i+5000-1)}에 추가할 벡터가 없습니다''')
-
-            muse_faiss.write_index(args.output)
-            logging.info(f'''인덱스 저장 완료: {args.output}''')
+                store.write_meta(rows)
+                logging.info(f'''vector store 저장 완료: {args.output} (rows={rows}, d={args.dimension})''')
 
         elif args.func =='info_faiss':
             Logger.set_logger(log_path=log_path, file_name='info.log')
@@ -127,6 +395,51 @@ if __name__ == "__main__":
             muse_faiss.read_index(args.input)
             logging.info(f'''{muse_faiss.info()}''')
 
+        elif args.func == 'tune_faiss':
+            Logger.set_logger(log_path=log_path, file_name=f'''tune_{args.key}.log''')
+            muse_faiss = MuseFaiss(d=args.dimension)
+            muse_faiss.read_index(args.input)
+            logging.info(f'''{muse_faiss.info()}''')
+
+            # song id 인덱스는 ground truth id도 SongIdPacker로 만들어야 recall이 맞음
+            song_id = MuseFaiss.read_meta(args.input).get('id_format') == 'song'
+            profile = MuseTuner.tune(muse_faiss, model=args.model, embedding_type=args.type, k=args.k, sample_size=args.sample_size, target_recall=args.target_recall, song_id=song_id)
+            if profile:
+                MuseTuner.write_profile(args.output, key=args.key, profile=profile)
+                logging.info(f'''검색 파라미터 저장 완료: {args.output} [{args.key}] nprobe={profile['nprobe']}, efSearch={profile.get('efSearch')}''')
+
+        elif args.func == 'migrate_embeddings':
+            Logger.set_logger(log_path=log_path, file_name=f'''migrate_{args.model}_{args.type}.log''')
+            last_idx = MuseDataLoader.get_last_idx(model=args.model, embedding_type=args.type)
+            if args.end_idx:
+                last_idx = min(last_idx, args.end_idx)
+            logging.info(f'''blob 변환 시작: DB idx {args.start_idx} ~ {last_idx} → raw {args.dtype}{' (dry run)' if args.dry_run else ''}''')
+            stats = MuseDataLoader.migrate_blobs(
+                model=args.model, embedding_type=args.type, start_idx=args.start_idx, end_idx=last_idx + 1,
+                dtype=args.dtype, dry_run=args.dry_run
+            )
+            if stats is not None:
+                logging.info(f'''blob 변환 완료: {stats}''')
+
+        elif args.func == 'export_snapshot':
+            Logger.set_logger(log_path=log_path, file_name=f'''snapshot_{args.model}_{args.type}.log''')
+            snapshot = MuseSnapshot(args.output or MuseSnapshot.default_path(args.model, args.type))
+            logging.info(f'''스냅샷 export 시작: {snapshot.path} (DB idx {snapshot.last_idx + 1}부터)''')
+            export_start = datetime.now()
+            result = snapshot.export(
+                model=args.model, embedding_type=args.type, end_idx=args.end_idx + 1 if args.end_idx else None,
+                shard_rows=args.shard_rows, fetch_size=args.fetch_size
+            )
+            logging.info(f'''스냅샷 export 완료 ({(datetime.now() - export_start).total_seconds():.1f}s): {result}''')
+
+        elif args.func == 'registry':
+            Logger.set_logger(log_path=log_path, file_name='registry.log')
+            for key, entry in MuseRegistry.entries().items():
+                logging.info(f'''[{key}] {entry['model']}/{entry['type']} {MuseRegistry.table_name(entry)} → {entry['index_file']} (factory={entry.get('factory')}, k={entry['k']})''')
+            if args.output:
+                MuseRegistry.write(args.output)
+                logging.info(f'''registry 저장 완료: {args.output}''')
+
         elif args.func == 'cache_playlist':
             Logger.set_logger(log_path=log_path, file_name='cache_playlist.log')
             logging.info(f'''Starting playlist cache job (permanent storage)''')
@@ -5,54 +5,137 @@ cd /data1/muse-search/batch
 
 INDEX_DIR="/data1/muse-search/batch/index/prod"
 SERVER_DIR="/data1/muse-search/server/app/files/index"
+SNAPSHOT_DIR="/data1/muse-search/batch/snapshot"
 TODAY="$(date +%Y%m%d)"
 
-# server 쪽 index 백업 + 배치 최신본 복사
-sync_server() {
+# delta segment 서버 복사 (base 인덱스는 그대로, 새 delta와 메타 / manifest만 복사)
+# 서버는 manifest(.segments.json)에 있는 delta만 읽으므로 delta → 메타 → manifest 순서로 임시 파일 복사 후 rename
+sync_segment() {
     local base="$1"  # e.g. muse_vibe, muse_artist ...
+    local delta="${base}.delta_${TODAY}.index"
 
-    local server_file="${SERVER_DIR}/${base}.index"
-    local server_backup="${SERVER_DIR}/${base}_backup.index"
-    local batch_file="${INDEX_DIR}/${base}.index"
-
-    # 기존 서버 index 백업 (있을 때만)
-    if [ -f "$server_file" ]; then
-        echo "[SERVER BACKUP] $server_file -> $server_backup"
-        mv -f "$server_file" "$server_backup"
+    if [ -f "${INDEX_DIR}/${delta}" ]; then
+        echo "[SERVER UPDATE] ${INDEX_DIR}/${delta} -> ${SERVER_DIR}/${delta}"
+        cp -f "${INDEX_DIR}/${delta}" "${SERVER_DIR}/${delta}.tmp"
+        mv -f "${SERVER_DIR}/${delta}.tmp" "${SERVER_DIR}/${delta}"
     else
-        echo "[SERVER BACKUP] $server_file 없음 → 백업 생략"
+        echo "[SERVER UPDATE] ${base}: 새 delta 없음"
+    fi
+
+    # song id 인덱스 메타 (id_format / last_idx), 있을 때만
+    if [ -f "${INDEX_DIR}/${base}.meta.json" ]; then
+        cp -f "${INDEX_DIR}/${base}.meta.json" "${SERVER_DIR}/${base}.meta.json.tmp"
+        mv -f "${SERVER_DIR}/${base}.meta.json.tmp" "${SERVER_DIR}/${base}.meta.json"
     fi
+    cp -f "${INDEX_DIR}/${base}.segments.json" "${SERVER_DIR}/${base}.segments.json.tmp"
+    mv -f "${SERVER_DIR}/${base}.segments.json.tmp" "${SERVER_DIR}/${base}.segments.json"
+}
 
-    echo "[SERVER UPDATE] $batch_file -> $server_file"
-    cp -f "$batch_file" "$server_file"
+# 금지 / 삭제 곡 tombstone 재생성 + 서버 복사 (서버는 검색 시 제외, 실제 삭제는 compact_faiss.sh)
+# 비트맵(.npy) → 메타(.json) 순서로 임시 파일 복사 후 rename
+sync_tombstone() {
+    local model="$1"
+    local type="$2"
+    local base="$3"
+
+    /home/miniconda3/envs/muse-search/bin/python muse.py build_tombstones \
+        --model="$model" \
+        --type="$type" \
+        --input="${INDEX_DIR}/${base}.index"
+
+    if [ -f "${INDEX_DIR}/${base}.tombstone.json" ]; then
+        echo "[SERVER UPDATE] ${INDEX_DIR}/${base}.tombstone.npy -> ${SERVER_DIR}/${base}.tombstone.npy"
+        cp -f "${INDEX_DIR}/${base}.tombstone.npy" "${SERVER_DIR}/${base}.tombstone.npy.tmp"
+        mv -f "${SERVER_DIR}/${base}.tombstone.npy.tmp" "${SERVER_DIR}/${base}.tombstone.npy"
+        cp -f "${INDEX_DIR}/${base}.tombstone.json" "${SERVER_DIR}/${base}.tombstone.json.tmp"
+        mv -f "${SERVER_DIR}/${base}.tombstone.json.tmp" "${SERVER_DIR}/${base}.tombstone.json"
+    fi
+}
+
+# float16 vector store (refine 단계) 갱신 + 서버 복사
+# 서버가 mmap 중인 파일을 덮어쓰지 않도록 임시 파일로 복사 후 rename, meta(.json)는 마지막에 교체
+sync_vector_store() {
+    local model="$1"
+    local type="$2"
+    local base="$3"
+    local dimension="$4"
+
+    /home/miniconda3/envs/muse-search/bin/python muse.py build_vector_store \
+        --model="$model" \
+        --type="$type" \
+        --output="${INDEX_DIR}/${base}.f16" \
+        --dimension="$dimension"
+
+    echo "[SERVER UPDATE] ${INDEX_DIR}/${base}.f16 -> ${SERVER_DIR}/${base}.f16"
+    cp -f "${INDEX_DIR}/${base}.f16" "${SERVER_DIR}/${base}.f16.tmp"
+    mv -f "${SERVER_DIR}/${base}.f16.tmp" "${SERVER_DIR}/${base}.f16"
+    cp -f "${INDEX_DIR}/${base}.f16.json" "${SERVER_DIR}/${base}.f16.json.tmp"
+    mv -f "${SERVER_DIR}/${base}.f16.json.tmp" "${SERVER_DIR}/${base}.f16.json"
+}
+
+# 임베딩 로컬 스냅샷 증분 export (새 row만 MySQL에서 읽음) + 서버 복사 (유사곡 조회용)
+# shard는 한 번 쓰면 바뀌지 않으므로 서버에 없는 shard만 복사, 조회용 파일과 manifest는 임시 파일로 복사 후 rename (manifest 마지막)
+sync_snapshot() {
+    local model="$1"
+    local type="$2"
+    local src="${SNAPSHOT_DIR}/${model}_${type}"
+    local dst="${SERVER_DIR}/snapshot/${model}_${type}"
+
+    /home/miniconda3/envs/muse-search/bin/python muse.py export_snapshot \
+        --model="$model" \
+        --type="$type" \
+        --output="$src"
+
+    mkdir -p "$dst"
+    for file in "$src"/shard_*.npy; do
+        local name
+        name="$(basename "$file")"
+        if [ ! -f "${dst}/${name}" ]; then
+            cp -f "$file" "${dst}/${name}.tmp"
+            mv -f "${dst}/${name}.tmp" "${dst}/${name}"
+        fi
+    done
+    for name in song_sorted.npy song_order.npy manifest.json; do
+        cp -f "${src}/${name}" "${dst}/${name}.tmp"
+        mv -f "${dst}/${name}.tmp" "${dst}/${name}"
+    done
+    echo "[SERVER UPDATE] $src -> $dst"
 }
 
 # ----------------------------------
 # CLAP - SONG
 # ----------------------------------
+sync_snapshot clap song
 /home/miniconda3/envs/muse-search/bin/python muse.py add_daily_faiss \
     --model=clap \
     --type=song \
+    --snapshot="${SNAPSHOT_DIR}/clap_song" \
     --input="${INDEX_DIR}/muse_vibe.index" \
-    --output="${INDEX_DIR}/muse_vibe_${TODAY}.index" \
+    --segment \
+    --output="${INDEX_DIR}/muse_vibe.delta_${TODAY}.index" \
     --dimension=512
 
-cp -f "${INDEX_DIR}/muse_vibe_${TODAY}.index" "${INDEX_DIR}/muse_vibe.index"
-sync_server "muse_vibe"
+sync_segment "muse_vibe"
+sync_tombstone clap song muse_vibe
+sync_vector_store clap song muse_vibe 512
 
 
 # ----------------------------------
 # CLAP - LYRICS SUMMARY
 # ----------------------------------
+sync_snapshot clap lyrics_summary
 /home/miniconda3/envs/muse-search/bin/python muse.py add_daily_faiss \
     --model=clap \
     --type=lyrics_summary \
+    --snapshot="${SNAPSHOT_DIR}/clap_lyrics_summary" \
     --input="${INDEX_DIR}/muse_lyrics_summary.index" \
-    --output="${INDEX_DIR}/muse_lyrics_summary_${TODAY}.index" \
+    --segment \
+    --output="${INDEX_DIR}/muse_lyrics_summary.delta_${TODAY}.index" \
     --dimension=512
 
-cp -f "${INDEX_DIR}/muse_lyrics_summary_${TODAY}.index" "${INDEX_DIR}/muse_lyrics_summary.index"
-sync_server "muse_lyrics_summary"
+sync_segment "muse_lyrics_summary"
+sync_tombstone clap lyrics_summary muse_lyrics_summary
+sync_vector_store clap lyrics_summary muse_lyrics_summary 512
 
 
 # ----------------------------------
@@ -62,25 +145,29 @@ sync_server "muse_lyrics_summary"
     --model=bgem3 \
     --type=artist \
     --input="${INDEX_DIR}/muse_artist.index" \
-    --output="${INDEX_DIR}/muse_artist_${TODAY}.index" \
+    --segment \
+    --output="${INDEX_DIR}/muse_artist.delta_${TODAY}.index" \
     --dimension=1024
 
-cp -f "${INDEX_DIR}/muse_artist_${TODAY}.index" "${INDEX_DIR}/muse_artist.index"
-sync_server "muse_artist"
+sync_segment "muse_artist"
+sync_tombstone bgem3 artist muse_artist
 
 
 # ----------------------------------
 # BGE-M3 - SONG NAME
 # ----------------------------------
+sync_snapshot bgem3 song_name
 /home/miniconda3/envs/muse-search/bin/python muse.py add_daily_faiss \
     --model=bgem3 \
     --type=song_name \
+    --snapshot="${SNAPSHOT_DIR}/bgem3_song_name" \
     --input="${INDEX_DIR}/muse_title.index" \
-    --output="${INDEX_DIR}/muse_title_${TODAY}.index" \
+    --segment \
+    --output="${INDEX_DIR}/muse_title.delta_${TODAY}.index" \
     --dimension=1024
 
-cp -f "${INDEX_DIR}/muse_title_${TODAY}.index" "${INDEX_DIR}/muse_title.index"
-sync_server "muse_title"
+sync_segment "muse_title"
+sync_tombstone bgem3 song_name muse_title
 
 
 # ----------------------------------
@@ -90,11 +177,12 @@ sync_server "muse_title"
     --model=bgem3 \
     --type=album_name \
     --input="${INDEX_DIR}/muse_album_name.index" \
-    --output="${INDEX_DIR}/muse_album_name_${TODAY}.index" \
+    --segment \
+    --output="${INDEX_DIR}/muse_album_name.delta_${TODAY}.index" \
     --dimension=1024
 
-cp -f "${INDEX_DIR}/muse_album_name_${TODAY}.index" "${INDEX_DIR}/muse_album_name.index"
-sync_server "muse_album_name"
+sync_segment "muse_album_name"
+sync_tombstone bgem3 album_name muse_album_name
 
 
 # ----------------------------------
@@ -104,11 +192,12 @@ sync_server "muse_album_name"
     --model=bgem3 \
     --type=lyrics_slide \
     --input="${INDEX_DIR}/muse_lyrics.index" \
-    --output="${INDEX_DIR}/muse_lyrics_${TODAY}.index" \
+    --segment \
+    --output="${INDEX_DIR}/muse_lyrics.delta_${TODAY}.index" \
     --dimension=1024
 
-cp -f "${INDEX_DIR}/muse_lyrics_${TODAY}.index" "${INDEX_DIR}/muse_lyrics.index"
-sync_server "muse_lyrics"
+sync_segment "muse_lyrics"
+sync_tombstone bgem3 lyrics_slide muse_lyrics
 
 
 # ----------------------------------
@@ -118,12 +207,30 @@ sync_server "muse_lyrics"
     --model=bgem3 \
     --type=lyrics_3_slide \
     --input="${INDEX_DIR}/muse_lyrics_3.index" \
-    --output="${INDEX_DIR}/muse_lyrics_3_${TODAY}.index" \
+    --segment \
+    --output="${INDEX_DIR}/muse_lyrics_3.delta_${TODAY}.index" \
     --dimension=1024
 
-cp -f "${INDEX_DIR}/muse_lyrics_3_${TODAY}.index" "${INDEX_DIR}/muse_lyrics_3.index"
-sync_server "muse_lyrics_3"
-
-echo "[DONE] batch & server index 모두 갱신 완료"
-
-systemctl restart muse_search_fastapi.service
\ No newline at end of file
+sync_segment "muse_lyrics_3"
+sync_tombstone bgem3 lyrics_3_slide muse_lyrics_3
+
+# 속성 필터 배열(연도 / 장르 / MP3) 재생성: 오늘 추가된 idx까지 포함 (서버 index/attrs에 바로 쓰고 genres.json을 마지막에 교체)
+# 서버 코드 / Oracle client를 사용하므로 서버 디렉토리에서 실행
+echo "[SERVER UPDATE] build_attributes.py -> ${SERVER_DIR}/attrs"
+(
+    cd /data1/muse-search/server/app
+    LD_LIBRARY_PATH="/data1/muse-search/server/app/oracle/instantclient_21_17:${LD_LIBRARY_PATH:-}" \
+        /home/miniconda3/envs/muse-search/bin/python build_attributes.py
+)
+
+# key별 인덱스 선언 (서버는 재기동 시 읽음), 있을 때만
+REGISTRY_FILE="/data1/muse-search/batch/index/muse_index_registry.json"
+if [ -f "$REGISTRY_FILE" ]; then
+    echo "[SERVER UPDATE] $REGISTRY_FILE -> ${SERVER_DIR}/muse_index_registry.json"
+    cp -f "$REGISTRY_FILE" "${SERVER_DIR}/muse_index_registry.json.tmp"
+    mv -f "${SERVER_DIR}/muse_index_registry.json.tmp" "${SERVER_DIR}/muse_index_registry.json"
+fi
+
+# 서버는 재기동하지 않음: delta / tombstone / float16 사본 / 스냅샷 / 속성 배열은 서버 MuseReloader가 manifest / 메타 파일 mtime을 보고 반영
+# (registry는 재기동 시 읽으므로 registry를 바꾼 날은 별도로 재기동)
+echo "[DONE] batch & server index delta 모두 갱신 완료, 서버 재기동 없이 반영 (delta 정리는 compact_faiss.sh)"
\ No newline at end of file
@@ -1,6 +1,8 @@
 #!/bin/bash
 cd /data1/muse-search/batch
 
+# export_snapshot으로 만든 로컬 스냅샷이 있으면 --snapshot=./snapshot/{model}_{type}으로 스냅샷 범위는 MySQL 대신 로컬 파일에서 추가
+
 # 인덱스 전부 추가(CLAP)
 # 1. tb_embedding_clap_h
 /home/miniconda3/envs/muse-search/bin/python muse.py add_faiss --model=clap --type=song --input=./index/cluster/clap_vibe_cluster.index --output=./index/dev/muse_vibe.index --dimension=512
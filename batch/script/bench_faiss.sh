@@ -0,0 +1,15 @@
+#!/bin/bash
+cd /data1/muse-search/batch
+
+# 합성 카탈로그 FAISS 벤치마크 (DB/서버 불필요)
+# 결과: ./bench/{model}_{n}.json (회귀 비교용)
+PYTHON=/home/miniconda3/envs/muse-search/bin/python
+TODAY="$(date +%Y%m%d)"
+OUTPUT_DIR="./bench/${TODAY}"
+
+for N in 1000000 10000000 40000000; do
+    # CLAP (512D)
+    ${PYTHON} -m benchmark.bench_faiss --n=${N} --d=512 --nprobe=16,64,256 --efsearch=64,256 --output=${OUTPUT_DIR}/clap_${N}.json
+    # BGE-M3 (1024D)
+    ${PYTHON} -m benchmark.bench_faiss --n=${N} --d=1024 --nprobe=16,64,256 --efsearch=64,256 --output=${OUTPUT_DIR}/bgem3_${N}.json
+done
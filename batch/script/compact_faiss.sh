@@ -0,0 +1,46 @@
+#!/bin/bash
+set -euo pipefail
+
+cd /data1/muse-search/batch
+
+INDEX_DIR="/data1/muse-search/batch/index/prod"
+SERVER_DIR="/data1/muse-search/server/app/files/index"
+
+# 주기 실행 (예: 주 1회 add_daily_faiss.sh 이후)
+# base 인덱스에 delta segment를 merge_from으로 합치고 카탈로그에서 삭제된 row(tombstone removed)를 remove_ids로 지운 새 base로 교체하고 서버에 배포
+# 금지 곡은 해제될 수 있으므로 인덱스에 남기고 서버가 검색 시 제외
+compact() {
+    local base="$1"  # e.g. muse_vibe, muse_artist ...
+
+    # 합칠 delta도 지울 삭제 row도 없으면 compact_faiss가 base를 다시 쓰지 않음
+    /home/miniconda3/envs/muse-search/bin/python muse.py compact_faiss \
+        --input="${INDEX_DIR}/${base}.index" \
+        --output="${INDEX_DIR}/${base}.index" \
+        --tombstone
+
+    # 새 base가 만들어졌을 때만 (서버 base보다 새 파일) 배포
+    if [ ! "${INDEX_DIR}/${base}.index" -nt "${SERVER_DIR}/${base}.index" ]; then
+        echo "[SKIP] ${base}: 새 base 없음"
+        return
+    fi
+
+    # 기존 서버 base 백업 후 새 base → manifest(delta 없음, removed) 순서로 교체, 서버의 이전 delta 삭제
+    if [ -f "${SERVER_DIR}/${base}.index" ]; then
+        echo "[SERVER BACKUP] ${SERVER_DIR}/${base}.index -> ${SERVER_DIR}/${base}_backup.index"
+        mv -f "${SERVER_DIR}/${base}.index" "${SERVER_DIR}/${base}_backup.index"
+    fi
+    echo "[SERVER UPDATE] ${INDEX_DIR}/${base}.index -> ${SERVER_DIR}/${base}.index"
+    cp -f "${INDEX_DIR}/${base}.index" "${SERVER_DIR}/${base}.index.tmp"
+    mv -f "${SERVER_DIR}/${base}.index.tmp" "${SERVER_DIR}/${base}.index"
+    cp -f "${INDEX_DIR}/${base}.segments.json" "${SERVER_DIR}/${base}.segments.json.tmp"
+    mv -f "${SERVER_DIR}/${base}.segments.json.tmp" "${SERVER_DIR}/${base}.segments.json"
+    rm -f "${SERVER_DIR}/${base}".delta_*.index
+}
+
+for base in muse_vibe muse_lyrics_summary muse_artist muse_title muse_album_name muse_lyrics muse_lyrics_3; do
+    compact "$base"
+done
+
+echo "[DONE] base 인덱스 compaction / 삭제 row 정리 완료"
+
+systemctl restart muse_search_fastapi.service
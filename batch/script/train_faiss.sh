@@ -1,6 +1,10 @@
 #!/bin/bash
 cd /data1/muse-search/batch
 
+# 인덱스 구성(factory)은 ./index/muse_index_registry.json의 key별 선언을 따름 (없으면 IVF{nlist}_HNSW32,PQ16x8)
+# 변경 전 benchmark/bench_faiss.py --factory로 비교, 일회성으로 바꿀 때만 --factory 지정
+# export_snapshot으로 만든 로컬 스냅샷이 있으면 --snapshot=./snapshot/{model}_{type}으로 MySQL 대신 스냅샷에서 학습 샘플 조회
+
 # 클러스터 학습(CLAP)
 # 1. tb_embedding_clap_h
 /home/miniconda3/envs/muse-search/bin/python muse.py train_faiss --model=clap --type=song --output=./index/cluster/clap_vibe_cluster.index --dimension=512
@@ -0,0 +1,18 @@
+#!/bin/bash
+cd /data1/muse-search/batch
+
+INDEX_DIR="/data1/muse-search/batch/index/prod"
+SERVER_DIR="/data1/muse-search/server/app/files/index"
+OUTPUT="${INDEX_DIR}/muse_search_params.json"
+
+# key별 nprobe / efSearch 튜닝 (결과는 하나의 json에 key별로 병합 저장)
+/home/miniconda3/envs/muse-search/bin/python muse.py tune_faiss --model=clap --type=song --key=vibe --input=${INDEX_DIR}/muse_vibe.index --output=${OUTPUT} --dimension=512
+/home/miniconda3/envs/muse-search/bin/python muse.py tune_faiss --model=clap --type=lyrics_summary --key=lyrics_summary --input=${INDEX_DIR}/muse_lyrics_summary.index --output=${OUTPUT} --dimension=512
+/home/miniconda3/envs/muse-search/bin/python muse.py tune_faiss --model=bgem3 --type=artist --key=artist --input=${INDEX_DIR}/muse_artist.index --output=${OUTPUT} --dimension=1024
+/home/miniconda3/envs/muse-search/bin/python muse.py tune_faiss --model=bgem3 --type=song_name --key=title --input=${INDEX_DIR}/muse_title.index --output=${OUTPUT} --dimension=1024
+/home/miniconda3/envs/muse-search/bin/python muse.py tune_faiss --model=bgem3 --type=album_name --key=album_name --input=${INDEX_DIR}/muse_album_name.index --output=${OUTPUT} --dimension=1024
+/home/miniconda3/envs/muse-search/bin/python muse.py tune_faiss --model=bgem3 --type=lyrics_slide --key=lyrics --input=${INDEX_DIR}/muse_lyrics.index --output=${OUTPUT} --dimension=1024
+/home/miniconda3/envs/muse-search/bin/python muse.py tune_faiss --model=bgem3 --type=lyrics_3_slide --key=lyrics_3 --input=${INDEX_DIR}/muse_lyrics_3.index --output=${OUTPUT} --dimension=1024
+
+# 서버는 재시작 시 files/index/muse_search_params.json 을 로드
+cp -f "${OUTPUT}" "${SERVER_DIR}/muse_search_params.json"
@@ -0,0 +1,89 @@
+from common.attribute_common import MuseAttributes
+from daos.search_dao import SearchDAO
+from config import BASE_LOG_PATH
+from common.logger_common import Logger
+import argparse
+import json
+import logging
+import os
+import time
+import numpy as np
+
+def _save(path, array):
+    # 서버가 mmap 중인 파일을 덮어쓰지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+def load_song_attributes(seq_step, genre_path):
+    """Oracle 전체 곡의 (disccommseq, trackno) → (연도, 장르 코드, MP3 여부)"""
+    min_seq, max_seq = SearchDAO.get_disc_seq_range()
+    if min_seq is None:
+        return {}, []
+
+    # 일부 key만 다시 만들 때도 기존 배열과 장르 코드가 어긋나지 않도록 기존 목록 뒤에 추가
+    genres = {}
+    if os.path.exists(genre_path):
+        with open(genre_path, 'r') as f:
+            genres = {genre: code for code, genre in enumerate(json.load(f))}
+    songs = {}
+    for start_seq in range(min_seq, max_seq + 1, seq_step):
+        for row in SearchDAO.get_song_attributes(start_seq, start_seq + seq_step):
+            genre = (row['disc_genre_txt'] or '').strip()
+            if genre not in genres:
+                genres[genre] = len(genres)
+            year = MuseAttributes.parse_year(row['hit_year']) or MuseAttributes.parse_year(row['mastering_year'])
+            songs[(int(row['disc_comm_seq']), str(row['track_no']).strip())] = (year, genres[genre], int(row['mp3_path_flag']))
+        logging.info(f'''SONG ATTRIBUTES: DISC_COMM_SEQ ~ {start_seq + seq_step - 1} ({len(songs)} songs)''')
+    return songs, [genre for genre, _ in sorted(genres.items(), key=lambda item: item[1])]
+
+def build_key(key, songs, idx_step):
+    """key 테이블 idx 순서대로 속성 배열 생성 (FAISS id = idx - 1)"""
+    max_idx = SearchDAO.get_max_idx(key)
+    year = np.zeros(max_idx, dtype='int16')
+    genre = np.full(max_idx, -1, dtype='int16')
+    mp3 = np.zeros(max_idx, dtype='uint8')
+
+    missing = 0
+    for start_idx in range(1, max_idx + 1, idx_step):
+        for idx, disccommseq, trackno in SearchDAO.get_song_rows(key, start_idx, start_idx + idx_step):
+            attrs = songs.get((int(disccommseq), str(trackno).strip()))
+            if attrs is None:
+                missing += 1
+                continue
+            year[idx - 1], genre[idx - 1], mp3[idx - 1] = attrs
+    logging.info(f'''{key}: {max_idx} rows, {missing} rows without song meta''')
+    return {'year': year, 'genre': genre, 'mp3': mp3}
+
+if __name__ == "__main__":
+    # 사용 예) python build_attributes.py            (batch add_daily_faiss.sh가 매일 실행, 서버 MuseReloader가 재기동 없이 반영)
+    #         python build_attributes.py --keys vibe
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--keys', type=str, default=','.join(MuseAttributes._keys), help='comma separated index keys')
+    parser.add_argument('--output', type=str, default=MuseAttributes._attr_path, help='attribute dir')
+    parser.add_argument('--seq_step', type=int, default=20000, help='DISC_COMM_SEQ range per Oracle query')
+    parser.add_argument('--idx_step', type=int, default=100000, help='idx range per MySQL query')
+    args = parser.parse_args()
+
+    Logger.set_logger(log_path=BASE_LOG_PATH, file_name='build_attributes.log')
+    if not os.path.exists(args.output):
+        os.makedirs(args.output)
+
+    start = time.time()
+    songs, genres = load_song_attributes(args.seq_step, f'{args.output}/genres.json')
+    logging.info(f'''{len(songs)} songs, {len(genres)} genres ({time.time() - start:.1f}s)''')
+
+    for key in [key for key in args.keys.split(',') if key]:
+        if key not in MuseAttributes._keys:
+            logging.error(f'''{key} is not an attribute key''')
+            continue
+        for field, array in build_key(key, songs, args.idx_step).items():
+            _save(f'{args.output}/{key}.{field}.npy', array)
+
+    # genres.json을 마지막에 써서 서버가 불완전한 배열 세트를 읽지 않도록 함
+    tmp_path = f'{args.output}/genres.json.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(genres, f, ensure_ascii=False)
+    os.replace(tmp_path, f'{args.output}/genres.json')
+    logging.info(f'''ATTRIBUTES SAVED: {args.output} ({time.time() - start:.1f}s)''')
@@ -0,0 +1,176 @@
+from common.lyrics_index_common import MuseLyricsIndex
+from daos.search_dao import SearchDAO
+from config import BASE_LOG_PATH
+from common.logger_common import Logger
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+import zlib
+import numpy as np
+
+def _save(path, array):
+    # 서버가 mmap 중인 파일을 덮어쓰지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+def read_lyrics(path):
+    """가사 export (JSON lines: disccommseq, trackno, lyrics) → (disccommseq, trackno, 정규화 가사)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            text = MuseLyricsIndex.normalize(row.get('lyrics'))
+            if len(text) >= MuseLyricsIndex._min_query_chars:
+                yield int(row['disccommseq']), str(row['trackno']).strip(), text
+
+def encode_varint(values):
+    """0 이상 정수 배열 → varint 바이트 (7bit씩, 마지막 바이트만 최상위 bit 0)"""
+    values = values.astype('int64')
+    nbytes = 1 + sum((values >= (1 << (7 * i))).astype('int64') for i in range(1, 5))
+    starts = np.zeros(len(values), dtype='int64')
+    starts[1:] = np.cumsum(nbytes)[:-1]
+    out = np.zeros(int(nbytes.sum()), dtype='uint8')
+    for i in range(5):
+        rows = np.flatnonzero(nbytes > i)
+        if len(rows) == 0:
+            break
+        chunk = (values[rows] >> (7 * i)) & 0x7f
+        chunk |= np.where(nbytes[rows] > i + 1, 0x80, 0)
+        out[starts[rows] + i] = chunk
+    return out, nbytes
+
+def build_postings(work_dir, docs, buckets, block_docs, texts_path):
+    """
+    곡별 trigram을 bucket 파일로 나눠 쓴 뒤 bucket 단위로 정렬 / 인코딩 (전체 posting을 메모리에 올리지 않음)
+    """
+    bucket_files = [open(f'{work_dir}/{bucket}.pairs', 'wb') for bucket in range(buckets)]
+    text_offsets = [0]
+    codes_block, docs_block = [], []
+    with open(texts_path, 'wb') as texts:
+        for doc, text in enumerate(docs):
+            compressed = zlib.compress(text.encode('utf-8'))
+            texts.write(compressed)
+            text_offsets.append(text_offsets[-1] + len(compressed))
+
+            chars = np.frombuffer(text.encode('utf-32-le'), dtype='uint32').astype('int64')
+            codes = np.unique(chars[:-2] << 42 | chars[1:-1] << 21 | chars[2:])
+            codes_block.append(codes)
+            docs_block.append(np.full(len(codes), doc, dtype='int64'))
+            if len(codes_block) >= block_docs:
+                _flush_block(bucket_files, codes_block, docs_block, buckets)
+                codes_block, docs_block = [], []
+        _flush_block(bucket_files, codes_block, docs_block, buckets)
+    for f in bucket_files:
+        f.close()
+
+    grams, offsets, postings = [], [], []
+    bucket_offsets = [0]
+    byte_base = 0
+    for bucket in range(buckets):
+        pairs = np.fromfile(f'{work_dir}/{bucket}.pairs', dtype='int64').reshape(-1, 2)
+        os.remove(f'{work_dir}/{bucket}.pairs')
+        if len(pairs) == 0:
+            bucket_offsets.append(bucket_offsets[-1])
+            continue
+        # 곡 번호 순으로 기록했으므로 stable 정렬이면 trigram별 곡 번호는 오름차순
+        pairs = pairs[np.argsort(pairs[:, 0], kind='stable')]
+        codes, first = np.unique(pairs[:, 0], return_index=True)
+        gaps = np.diff(pairs[:, 1], prepend=0)
+        gaps[first] = pairs[first, 1]
+        encoded, nbytes = encode_varint(gaps)
+        byte_starts = np.zeros(len(nbytes), dtype='int64')
+        byte_starts[1:] = np.cumsum(nbytes)[:-1]
+
+        grams.append(codes)
+        offsets.append(byte_base + byte_starts[first])
+        postings.append(encoded)
+        bucket_offsets.append(bucket_offsets[-1] + len(codes))
+        byte_base += len(encoded)
+
+    return {
+        'grams': np.concatenate(grams) if grams else np.empty(0, dtype='int64'),
+        'bucket_offsets': np.asarray(bucket_offsets, dtype='int64'),
+        'posting_offsets': np.append(np.concatenate(offsets) if offsets else np.empty(0, dtype='int64'), byte_base).astype('int64'),
+        'postings': np.concatenate(postings) if postings else np.empty(0, dtype='uint8'),
+        'text_offsets': np.asarray(text_offsets, dtype='int64')
+    }
+
+def _flush_block(bucket_files, codes_block, docs_block, buckets):
+    if not codes_block:
+        return
+    codes = np.concatenate(codes_block)
+    docs = np.concatenate(docs_block)
+    bucket_of = codes % buckets
+    for bucket in np.unique(bucket_of).tolist():
+        rows = bucket_of == bucket
+        np.stack([codes[rows], docs[rows]], axis=1).tofile(bucket_files[bucket])
+
+def build_ids(key, songs, idx_step):
+    """곡 번호 → key 인덱스의 첫 window FAISS id (FAISS id = idx - 1)"""
+    ids = np.full(len(songs), -1, dtype='int32')
+    max_idx = SearchDAO.get_max_idx(key)
+    for start_idx in range(1, max_idx + 1, idx_step):
+        for idx, disccommseq, trackno in SearchDAO.get_song_rows(key, start_idx, start_idx + idx_step):
+            doc = songs.get((int(disccommseq), str(trackno).strip()))
+            if doc is not None and (ids[doc] < 0 or idx - 1 < ids[doc]):
+                ids[doc] = idx - 1
+    logging.info(f'''{key}: {max_idx} rows, {int((ids >= 0).sum())} / {len(songs)} songs mapped''')
+    return ids
+
+if __name__ == "__main__":
+    # 사용 예) python build_lyrics_index.py --input lyrics.jsonl      (서버 MuseReloader가 재기동 없이 반영)
+    # 가사 원문은 MySQL / Oracle 검색 테이블에 없으므로 가사 임베딩 생성에 쓴 원문 export를 입력으로 사용
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--input', type=str, required=True, help='lyrics export (JSON lines: disccommseq, trackno, lyrics)')
+    parser.add_argument('--output', type=str, default=MuseLyricsIndex._lyrics_path, help='lyrics index dir')
+    parser.add_argument('--buckets', type=int, default=64, help='trigram hash buckets (build memory ~ 1 / buckets)')
+    parser.add_argument('--block_docs', type=int, default=20000, help='songs per bucket file flush')
+    parser.add_argument('--idx_step', type=int, default=100000, help='idx range per MySQL query')
+    args = parser.parse_args()
+
+    Logger.set_logger(log_path=BASE_LOG_PATH, file_name='build_lyrics_index.log')
+    if not os.path.exists(args.output):
+        os.makedirs(args.output)
+    work_dir = f'{args.output}/build.tmp'
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir)
+
+    start = time.time()
+    songs = {}
+
+    def docs():
+        # 같은 곡이 여러 줄이면 첫 줄만 사용
+        for disccommseq, trackno, text in read_lyrics(args.input):
+            if (disccommseq, trackno) in songs:
+                continue
+            songs[(disccommseq, trackno)] = len(songs)
+            yield text
+
+    texts_path = f'{args.output}/texts.bin'
+    arrays = build_postings(work_dir, docs(), args.buckets, args.block_docs, f'{texts_path}.tmp')
+    logging.info(f'''{len(songs)} songs, {len(arrays['grams'])} trigrams, {len(arrays['postings'])} posting bytes ({time.time() - start:.1f}s)''')
+
+    for field, array in arrays.items():
+        _save(f'{args.output}/{field}.npy', array)
+    os.replace(f'{texts_path}.tmp', texts_path)
+    for key in MuseLyricsIndex._keys:
+        _save(f'{args.output}/{key}.ids.npy', build_ids(key, songs, args.idx_step))
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+    # manifest.json을 마지막에 써서 서버가 불완전한 배열 세트를 읽지 않도록 함
+    manifest = {
+        'docs': len(songs),
+        'grams': len(arrays['grams']),
+        'keys': MuseLyricsIndex._keys
+    }
+    tmp_path = f'{args.output}/manifest.json.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, f'{args.output}/manifest.json')
+    logging.info(f'''LYRICS INDEX SAVED: {args.output} {manifest} ({time.time() - start:.1f}s)''')
@@ -0,0 +1,136 @@
+from common.name_index_common import MuseNameIndex
+from daos.search_dao import SearchDAO
+from config import BASE_LOG_PATH
+from common.logger_common import Logger
+from collections import defaultdict
+import argparse
+import json
+import logging
+import os
+import time
+import numpy as np
+
+def _save(path, array):
+    # 서버가 mmap 중인 파일을 덮어쓰지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+def load_song_names(seq_step):
+    """Oracle 전체 곡의 (disccommseq, trackno) → 이름, disccommseq → 앨범명"""
+    min_seq, max_seq = SearchDAO.get_disc_seq_range()
+    if min_seq is None:
+        return {}, {}
+
+    songs, discs = {}, {}
+    for start_seq in range(min_seq, max_seq + 1, seq_step):
+        for row in SearchDAO.get_song_names(start_seq, start_seq + seq_step):
+            disccommseq = int(row['disc_comm_seq'])
+            songs[(disccommseq, str(row['track_no']).strip())] = (
+                MuseNameIndex.normalize(row['artist']),
+                MuseNameIndex.normalize(row['song_name'])
+            )
+            discs[disccommseq] = MuseNameIndex.normalize(row['disc_name'])
+        logging.info(f'''SONG NAMES: DISC_COMM_SEQ ~ {start_seq + seq_step - 1} ({len(songs)} songs)''')
+    return songs, discs
+
+def collect_names(key, songs, discs, idx_step):
+    """
+    key 테이블 idx 순서대로 정규화 이름 → FAISS id 목록 (FAISS id = idx - 1)
+    artist: ARTIST / title: SONG_NAME / album_name: DISC_NAME (_process_batch 가산점 비교 대상과 동일)
+    """
+    max_idx = SearchDAO.get_max_idx(key)
+    name_ids = defaultdict(list)
+    missing = 0
+    for start_idx in range(1, max_idx + 1, idx_step):
+        if key == 'album_name':
+            for idx, disccommseq in SearchDAO.get_album_rows(key, start_idx, start_idx + idx_step):
+                name = discs.get(int(disccommseq))
+                if name is None:
+                    missing += 1
+                elif name:
+                    name_ids[name].append(idx - 1)
+        else:
+            for idx, disccommseq, trackno in SearchDAO.get_song_rows(key, start_idx, start_idx + idx_step):
+                names = songs.get((int(disccommseq), str(trackno).strip()))
+                if names is None:
+                    missing += 1
+                    continue
+                name = names[0] if key == 'artist' else names[1]
+                if name:
+                    name_ids[name].append(idx - 1)
+    logging.info(f'''{key}: {max_idx} rows, {len(name_ids)} names, {missing} rows without song meta''')
+    return name_ids
+
+def build_index(name_ids):
+    """이름 → id 목록을 NameIndex 배열로 변환"""
+    names = sorted(name_ids)
+    encoded = [name.encode('utf-8') for name in names]
+    name_offsets = np.zeros(len(names) + 1, dtype='int64')
+    name_offsets[1:] = np.cumsum([len(name) for name in encoded])
+    id_offsets = np.zeros(len(names) + 1, dtype='int64')
+    id_offsets[1:] = np.cumsum([len(name_ids[name]) for name in names])
+
+    postings = defaultdict(list)
+    for ordinal, name in enumerate(names):
+        for code in set(MuseNameIndex.bigrams(name)):
+            postings[code].append(ordinal)
+    grams = sorted(postings)
+    gram_offsets = np.zeros(len(grams) + 1, dtype='int64')
+    gram_offsets[1:] = np.cumsum([len(postings[code]) for code in grams])
+
+    return {
+        'names': np.frombuffer(b''.join(encoded), dtype='uint8'),
+        'name_offsets': name_offsets,
+        'id_offsets': id_offsets,
+        'ids': np.fromiter((i for name in names for i in sorted(name_ids[name])), dtype='int32', count=int(id_offsets[-1])),
+        'grams': np.asarray(grams, dtype='int64'),
+        'gram_offsets': gram_offsets,
+        # 이름 번호 순으로 추가했으므로 bigram별로 이미 오름차순
+        'gram_names': np.fromiter((o for code in grams for o in postings[code]), dtype='int32', count=int(gram_offsets[-1]))
+    }
+
+if __name__ == "__main__":
+    # 사용 예) python build_name_index.py            (add_daily_faiss 이후 실행, 서버 MuseReloader가 재기동 없이 반영)
+    #         python build_name_index.py --keys artist
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--keys', type=str, default=','.join(MuseNameIndex._keys), help='comma separated index keys')
+    parser.add_argument('--output', type=str, default=MuseNameIndex._name_path, help='name index dir')
+    parser.add_argument('--seq_step', type=int, default=20000, help='DISC_COMM_SEQ range per Oracle query')
+    parser.add_argument('--idx_step', type=int, default=100000, help='idx range per MySQL query')
+    args = parser.parse_args()
+
+    Logger.set_logger(log_path=BASE_LOG_PATH, file_name='build_name_index.log')
+    if not os.path.exists(args.output):
+        os.makedirs(args.output)
+
+    start = time.time()
+    songs, discs = load_song_names(args.seq_step)
+    logging.info(f'''{len(songs)} songs, {len(discs)} discs ({time.time() - start:.1f}s)''')
+
+    manifest_path = f'{args.output}/manifest.json'
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+
+    for key in [key for key in args.keys.split(',') if key]:
+        if key not in MuseNameIndex._keys:
+            logging.error(f'''{key} is not a name key''')
+            continue
+        arrays = build_index(collect_names(key, songs, discs, args.idx_step))
+        for field, array in arrays.items():
+            _save(f'{args.output}/{key}.{field}.npy', array)
+        manifest[key] = {
+            'names': len(arrays['name_offsets']) - 1,
+            'ids': len(arrays['ids']),
+            'grams': len(arrays['grams'])
+        }
+
+    # manifest.json을 마지막에 써서 서버가 불완전한 배열 세트를 읽지 않도록 함
+    tmp_path = f'{manifest_path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+    logging.info(f'''NAME INDEX SAVED: {args.output} {manifest} ({time.time() - start:.1f}s)''')
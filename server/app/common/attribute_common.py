@@ -0,0 +1,192 @@
+import json
+import logging
+import math
+import os
+import re
+import threading
+import faiss
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from config import INDEX_PATH
+from common.registry_common import MuseRegistry
+
+class AttributeFilter:
+    """
+    key 하나에 대한 속성 필터 (FAISS id 기준 bool mask)
+
+    - 통과 id가 적으면 IDSelectorBatch로 FAISS 검색 자체를 제한
+    - 많으면 (selector 생성 비용 > 이득) k를 통과 비율만큼 늘려 검색 후 mask로 후처리
+    - 속성 배열 생성 이후 추가된 id(len(mask) 이상)는 속성을 모르므로 필터 없이 통과
+    """
+
+    def __init__(self, mask: np.ndarray, selector_max_ids: int):
+        self.mask = mask
+        self.count = int(mask.sum())
+        self.ratio = self.count / len(mask) if len(mask) else 0.0
+        self.ids = None
+        self.selector = None
+        if self.count <= selector_max_ids:
+            # selector가 참조하는 배열 / 안쪽 selector는 필터 객체가 살아있는 동안 유지
+            self.ids = np.flatnonzero(mask).astype('int64')
+            newer = faiss.IDSelectorRange(len(mask), np.iinfo('int64').max)
+            if self.count == 0:
+                self.selector = newer
+            else:
+                batch = faiss.IDSelectorBatch(len(self.ids), faiss.swig_ptr(self.ids))
+                self.selector = faiss.IDSelectorOr(batch, newer)
+                self.selector.referenced_objects = [batch, newer]
+
+    def passes(self, ids: np.ndarray) -> np.ndarray:
+        """ids 중 mask를 통과하거나 속성 배열 이후에 추가된 id (음수 id는 False)"""
+        ids = np.asarray(ids, dtype='int64')
+        keep = ids >= 0
+        known = keep & (ids < len(self.mask))
+        keep[known] = self.mask[ids[known]]
+        return keep
+
+    def search_k(self, k: int, max_oversample: int) -> int:
+        if self.ratio <= 0:
+            return k
+        return int(math.ceil(k * min(1.2 / self.ratio, max_oversample)))
+
+    def post_filter(self, D: np.ndarray, I: np.ndarray, k: int):
+        """mask를 통과하지 못한 결과 제거 후 앞에서부터 k개 (빈 자리는 -1 / inf)"""
+        I_flat = I.reshape(-1)
+        D_flat = D.reshape(-1)
+        valid = self.passes(I_flat)
+        D_kept, I_kept = D_flat[valid][:k], I_flat[valid][:k]
+        D_out = np.full(k, np.inf, dtype='float32')
+        I_out = np.full(k, -1, dtype='int64')
+        D_out[:len(D_kept)] = D_kept
+        I_out[:len(I_kept)] = I_kept
+        return D_out.reshape(1, -1), I_out.reshape(1, -1)
+
+    def restrict(self, include_ids: List[int]) -> List[int]:
+        """플레이리스트 include_ids 중 mask 통과 id만 (속성 배열 이후 추가된 id 포함)"""
+        ids = np.asarray(include_ids, dtype='int64')
+        return ids[self.passes(ids)].tolist()
+
+
+class MuseAttributes:
+    """
+    FAISS id(= MySQL idx - 1)별 곡 속성 배열 (build_attributes.py로 생성)
+
+        {INDEX_PATH}/attrs/{key}.year.npy   int16  HIT_YEAR, 없으면 MASTERING_YEAR (모르면 0)
+        {INDEX_PATH}/attrs/{key}.genre.npy  int16  genres.json의 DISC_GENRE_TXT 코드 (없으면 -1)
+        {INDEX_PATH}/attrs/{key}.mp3.npy    uint8  MP3_PATH 존재 여부
+        {INDEX_PATH}/attrs/genres.json      장르 텍스트 목록
+
+    mmap으로 열어서 gunicorn 워커끼리 page cache를 공유함
+    LLM이 뽑은 year / category와 재생 가능 여부를 id 필터로 바꿔 메타데이터 조회 전에 걸러냄
+    """
+    _attr_path = f'{INDEX_PATH}/attrs'
+    # 속성 배열을 만드는 key (MuseRegistry의 attributes, album_name은 앨범 단위 id라 곡 속성을 붙이지 않음)
+    _keys = [key for key, enabled in MuseRegistry.mapping('attributes').items() if enabled]
+    _fields = ('year', 'genre', 'mp3')
+    # 통과 id가 이 값 이하면 IDSelectorBatch, 초과하면 oversample 후 후처리
+    _selector_max_ids = 500000
+    _max_oversample = 10
+    _cache_size = 32
+
+    arrays: Dict[str, Dict[str, np.ndarray]] = {}
+    genres: List[str] = []
+    _cache: 'OrderedDict[tuple, AttributeFilter]' = OrderedDict()
+    _cache_lock = threading.Lock()
+    _year_pattern = re.compile(r'\d{4}')
+
+    @staticmethod
+    def load(path: Optional[str] = None) -> Dict[str, int]:
+        path = path or MuseAttributes._attr_path
+        genre_path = f'{path}/genres.json'
+        if not os.path.exists(genre_path):
+            logging.info(f"No attribute arrays ({path}), attribute filter disabled")
+            return {}
+
+        with open(genre_path, 'r') as f:
+            MuseAttributes.genres = json.load(f)
+
+        arrays = {}
+        for key in MuseAttributes._keys:
+            try:
+                arrays[key] = {
+                    field: np.load(f'{path}/{key}.{field}.npy', mmap_mode='r')
+                    for field in MuseAttributes._fields
+                }
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logging.error(f"Failed to load {key} attributes: {e}")
+        MuseAttributes.arrays = arrays
+        with MuseAttributes._cache_lock:
+            MuseAttributes._cache.clear()
+
+        loaded = {key: len(fields['year']) for key, fields in arrays.items()}
+        logging.info(f"Attribute arrays loaded: {loaded}, genres={len(MuseAttributes.genres)}")
+        return loaded
+
+    @staticmethod
+    def parse_year(value) -> int:
+        match = MuseAttributes._year_pattern.search(str(value)) if value else None
+        return int(match.group()) if match else 0
+
+    @staticmethod
+    def year_range(year) -> Optional[tuple]:
+        """LLM year ([2025] / [1990, 1999]) → (시작, 끝)"""
+        years = [MuseAttributes.parse_year(y) for y in (year or [])]
+        years = [y for y in years if y]
+        if not years:
+            return None
+        return min(years), max(years)
+
+    @staticmethod
+    def genre_codes(categories) -> tuple:
+        """category('국내 힙합', '재즈', '국내' ...)의 모든 단어를 포함하는 장르 텍스트 코드"""
+        codes = set()
+        for category in categories or []:
+            tokens = str(category).split()
+            if not tokens:
+                continue
+            for code, genre in enumerate(MuseAttributes.genres):
+                if genre and all(token in genre for token in tokens):
+                    codes.add(code)
+        return tuple(sorted(codes))
+
+    @staticmethod
+    def _build_mask(key: str, year_range, genre_codes, playable: bool) -> np.ndarray:
+        fields = MuseAttributes.arrays[key]
+        mask = np.ones(len(fields['year']), dtype=bool)
+        if year_range:
+            year = fields['year']
+            mask &= (year >= year_range[0]) & (year <= year_range[1])
+        if genre_codes is not None:
+            mask &= np.isin(fields['genre'], genre_codes)
+        if playable:
+            mask &= fields['mp3'] > 0
+        return mask
+
+    @staticmethod
+    def get_filter(key: str, year=None, category=None, playable: bool = False) -> Optional[AttributeFilter]:
+        """필터 조건이 없거나 key 속성 배열이 없으면 None"""
+        if key not in MuseAttributes.arrays:
+            return None
+        year_range = MuseAttributes.year_range(year)
+        # category가 있는데 매칭되는 장르가 하나도 없으면 (LLM 오인식 등) 장르 조건은 적용하지 않음
+        genre_codes = MuseAttributes.genre_codes(category) or None
+        if not year_range and genre_codes is None and not playable:
+            return None
+
+        cache_key = (key, year_range, genre_codes, bool(playable))
+        with MuseAttributes._cache_lock:
+            attr_filter = MuseAttributes._cache.get(cache_key)
+            if attr_filter is not None:
+                MuseAttributes._cache.move_to_end(cache_key)
+                return attr_filter
+
+        attr_filter = AttributeFilter(MuseAttributes._build_mask(key, year_range, genre_codes, playable), MuseAttributes._selector_max_ids)
+        with MuseAttributes._cache_lock:
+            MuseAttributes._cache[cache_key] = attr_filter
+            while len(MuseAttributes._cache) > MuseAttributes._cache_size:
+                MuseAttributes._cache.popitem(last=False)
+        logging.info(f"Attribute filter [{key}] year={year_range}, genres={genre_codes}, playable={playable}: {attr_filter.count} ids ({attr_filter.ratio:.2%})")
+        return attr_filter
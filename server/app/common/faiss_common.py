@@ -1,108 +1,426 @@
 import faiss
 import numpy as np
+import json
 import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Tuple, Optional, List
 from config import INDEX_PATH
+from common.registry_common import MuseRegistry
+from common.tombstone_common import MuseTombstones
 
 class MuseFaiss:
-    # 인덱스를 클래스 변수로 미리 로드
+    # key -> 인덱스 파일명 (INDEX_PATH 기준, 실패 시 *_backup.index 사용), MuseRegistry의 index_file
+    _index_files = MuseRegistry.mapping('index_file')
+    # 사용 빈도가 낮은 인덱스는 첫 검색 시점에 로드 (MuseRegistry의 lazy)
+    _lazy_keys = {key for key, lazy in MuseRegistry.mapping('lazy').items() if lazy}
+    _load_workers = 4
+    # 이 거리를 넘는 결과는 무효 처리 (L2 기준, MuseRegistry의 threshold, 없는 key는 그대로)
+    _thresholds = MuseRegistry.mapping('threshold')
+
     indices: Dict[str, faiss.Index] = {}
-    
-    # 초기화 시 모든 인덱스 로드
-    try:
-        indices['artist'] = faiss.read_index(f'{INDEX_PATH}/muse_artist.index')
-        logging.info(f"Loaded artist index: {indices['artist'].ntotal} vectors")
-    except Exception as e:
-        logging.warning(f"Failed to load artist index, trying backup: {e}")
-        try:
-            indices['artist'] = faiss.read_index(f'{INDEX_PATH}/muse_artist_backup.index')
-        except Exception as e2:
-            logging.error(f"Failed to load artist backup index: {e2}")
-    
-    try:
-        indices['title'] = faiss.read_index(f'{INDEX_PATH}/muse_title.index')
-        logging.info(f"Loaded title index: {indices['title'].ntotal} vectors")
-    except Exception as e:
-        logging.warning(f"Failed to load title index, trying backup: {e}")
-        try:
-            indices['title'] = faiss.read_index(f'{INDEX_PATH}/muse_title_backup.index')
-        except Exception as e2:
-            logging.error(f"Failed to load title backup index: {e2}")
-    
-    try:
-        indices['vibe'] = faiss.read_index(f'{INDEX_PATH}/muse_vibe.index')
-        logging.info(f"Loaded vibe index: {indices['vibe'].ntotal} vectors")
-    except Exception as e:
-        logging.warning(f"Failed to load vibe index, trying backup: {e}")
+    _key_locks: Dict[str, threading.Lock] = {key: threading.Lock() for key in _index_files}
+    _failed_keys: Dict[str, str] = {}
+    _ready = threading.Event()
+    _loader: Optional[threading.Thread] = None
+
+    # key별 검색 파라미터 (batch tune_faiss 결과), 없으면 인덱스 파일에 저장된 nprobe 사용
+    _search_params_path = f'{INDEX_PATH}/muse_search_params.json'
+    _search_profiles: Dict[str, Dict] = {}
+    # include 검색(IDSelector)은 후보가 적어 k를 채우려면 더 많은 리스트를 봐야 함
+    _include_min_nprobe = 100
+
+    # key별 인덱스 메타 ({파일명}.meta.json, batch add_faiss --id_format song이 생성), 없으면 {} (id == MySQL idx - 1)
+    _index_meta: Dict[str, Dict] = {}
+
+    # key별 delta segment (batch add_daily_faiss --segment), {파일명}.segments.json에 있는 delta만 base와 함께 검색
+    deltas: Dict[str, List[faiss.Index]] = {}
+    # key별 로드한 delta 파일명 (deltas와 같은 순서), refresh_segments가 이미 로드한 파일을 다시 읽지 않도록 사용
+    _delta_files: Dict[str, List[str]] = {}
+    # key별 base에서 tombstone으로 지운 벡터 수 (manifest removed), 남은 id는 그대로라 id 범위는 ntotal보다 큼
+    _removed: Dict[str, int] = {}
+
+    @staticmethod
+    def index_meta(key: str) -> Dict:
+        """인덱스 메타 (첫 호출 시 파일에서 읽어 캐시)"""
+        meta = MuseFaiss._index_meta.get(key)
+        if meta is None:
+            meta = {}
+            path = f'{INDEX_PATH}/{MuseFaiss._index_files.get(key)}.meta.json'
+            try:
+                if os.path.exists(path):
+                    with open(path, 'r') as f:
+                        meta = json.load(f)
+            except Exception as e:
+                logging.error(f"Failed to load {key} index meta {path}: {e}")
+            MuseFaiss._index_meta[key] = meta
+        return meta
+
+    @staticmethod
+    def is_song_id(key: str) -> bool:
+        """FAISS id가 곡 식별자(MuseSongId)인 인덱스인지 (아니면 id == MySQL idx - 1)"""
+        return MuseFaiss.index_meta(key).get('id_format') == 'song'
+
+    @staticmethod
+    def _read_index(key: str) -> Optional[faiss.Index]:
+        """인덱스 파일 로드 (원본 실패 시 백업 파일 시도)"""
+        file_name = MuseFaiss._index_files[key]
         try:
-            indices['vibe'] = faiss.read_index(f'{INDEX_PATH}/muse_vibe_backup.index')
-        except Exception as e2:
-            logging.error(f"Failed to load vibe backup index: {e2}")
-
-    try:
-        indices['lyrics'] = faiss.read_index(f'{INDEX_PATH}/muse_lyrics.index')
-        logging.info(f"Loaded lyrics index: {indices['lyrics'].ntotal} vectors")
-    except Exception as e:
-        logging.warning(f"Failed to load lyrics index, trying backup: {e}")
+            index = faiss.read_index(f'{INDEX_PATH}/{file_name}.index')
+            logging.info(f"Loaded {key} index: {index.ntotal} vectors")
+            return index
+        except Exception as e:
+            logging.warning(f"Failed to load {key} index, trying backup: {e}")
+            try:
+                index = faiss.read_index(f'{INDEX_PATH}/{file_name}_backup.index')
+                logging.info(f"Loaded {key} backup index: {index.ntotal} vectors")
+                return index
+            except Exception as e2:
+                logging.error(f"Failed to load {key} backup index: {e2}")
+                return None
+
+    @staticmethod
+    def _read_manifest(key: str) -> Optional[Dict]:
+        """segment manifest({파일명}.segments.json), 없거나 읽지 못하면 None"""
+        path = f'{INDEX_PATH}/{MuseFaiss._index_files[key]}.segments.json'
+        if not os.path.exists(path):
+            return None
         try:
-            indices['lyrics'] = faiss.read_index(f'{INDEX_PATH}/muse_lyrics_backup.index')
-        except Exception as e2:
-            logging.error(f"Failed to load lyrics backup index: {e2}")
-
-    try:
-        indices['lyrics_3'] = faiss.read_index(f'{INDEX_PATH}/muse_lyrics_3.index')
-        logging.info(f"Loaded lyrics_3 index: {indices['lyrics_3'].ntotal} vectors")
-    except Exception as e:
-        logging.warning(f"Failed to load lyrics_3 index, trying backup: {e}")
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.error(f"Failed to load {key} segment manifest {path}: {e}")
+            return None
+
+    @staticmethod
+    def _read_deltas(key: str, base: faiss.Index, manifest: Optional[Dict], loaded: Optional[Dict[str, faiss.Index]] = None) -> Tuple[List[faiss.Index], List[str]]:
+        """
+        segment manifest의 delta 인덱스 로드 (manifest가 없으면 [], loaded에 있는 파일은 다시 읽지 않고 재사용)
+        idx id 인덱스에서 base가 이미 포함한 delta(first_id < base ntotal, compaction 이후 남은 manifest)는 건너뜀
+        delta별로 실패를 처리하므로 한 파일을 읽지 못해도 나머지 delta는 로드 (delta는 전체 id를 가지므로 빠진 delta의 곡만 검색되지 않음)
+
+        Returns:
+            (delta 인덱스 목록, 파일명 목록)
+        """
+        if manifest is None:
+            return [], []
+        loaded = loaded or {}
+        removed = int(manifest.get('removed', 0))
+        deltas, files = [], []
+        for delta in manifest.get('deltas', []):
+            if delta.get('first_id') is not None and delta['first_id'] < base.ntotal + removed:
+                logging.warning(f"Skip {key} delta {delta['file']}: already in base (first_id {delta['first_id']} < {base.ntotal + removed})")
+                continue
+            index = loaded.get(delta['file'])
+            if index is None:
+                try:
+                    index = faiss.read_index(f"{INDEX_PATH}/{delta['file']}")
+                except Exception as e:
+                    logging.error(f"Failed to load {key} delta {delta['file']}: {e}")
+                    continue
+                if index.d != base.d:
+                    logging.error(f"Skip {key} delta {delta['file']}: dimension {index.d} != {base.d}")
+                    continue
+            deltas.append(index)
+            files.append(delta['file'])
+        logging.info(f"Loaded {key} delta segments: {[index.ntotal for index in deltas]}")
+        return deltas, files
+
+    @staticmethod
+    def refresh_segments(key: str) -> Optional[List[int]]:
+        """
+        manifest를 다시 읽어 새 delta 파일만 로드한 뒤 deltas[key]를 교체 (재기동 없이 일일 delta 반영)
+
+        - 아직 로드되지 않은 key는 건너뜀 (load_index가 로드 시점의 manifest를 읽음)
+        - manifest의 base_ntotal이 로드한 base와 다르면(compaction으로 base 교체) 건너뜀, base 교체는 재기동 시 반영
+        - 검색 스레드는 deltas[key] 리스트를 한 번에 읽으므로 새 리스트로 교체 (검색 중인 리스트는 그대로 유지)
+
+        Returns:
+            교체한 delta별 벡터 수, 건너뛰면 None
+        """
+        index = MuseFaiss.indices.get(key)
+        if index is None or key not in MuseFaiss._key_locks:
+            return None
+
+        with MuseFaiss._key_locks[key]:
+            manifest = MuseFaiss._read_manifest(key)
+            if manifest is None:
+                return None
+            if manifest.get('base_ntotal', index.ntotal) != index.ntotal:
+                logging.warning(f"Skip {key} segment refresh: base changed ({index.ntotal} -> {manifest['base_ntotal']}), restart required")
+                return None
+
+            loaded = dict(zip(MuseFaiss._delta_files.get(key, []), MuseFaiss.deltas.get(key, [])))
+            deltas, files = MuseFaiss._read_deltas(key, index, manifest, loaded)
+            for file_name, delta in zip(files, deltas):
+                if file_name not in loaded:
+                    MuseFaiss._warm_index(key, delta)
+            MuseFaiss._removed[key] = int(manifest.get('removed', 0))
+            MuseFaiss._delta_files[key] = files
+            MuseFaiss.deltas[key] = deltas
+            logging.info(f"{key} segments refreshed: +{[name for name in files if name not in loaded]}, -{[name for name in loaded if name not in files]}")
+            return [delta.ntotal for delta in deltas]
+
+    @staticmethod
+    def ntotal(key: str) -> int:
+        """base + delta segment 전체 벡터 수"""
+        index = MuseFaiss.indices.get(key)
+        if index is None:
+            return 0
+        return index.ntotal + sum(delta.ntotal for delta in MuseFaiss.deltas.get(key, []))
+
+    @staticmethod
+    def id_end(key: str) -> int:
+        """idx id 인덱스의 FAISS id 범위 (compact_faiss --tombstone으로 지운 id 자리 포함)"""
+        return MuseFaiss.ntotal(key) + MuseFaiss._removed.get(key, 0)
+
+    @staticmethod
+    def _search_segments(key: str, index: faiss.Index, query_vector: np.ndarray, k: int, id_selector=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        base와 delta segment를 각각 검색한 뒤 거리 기준 top-k 병합 (delta가 없으면 base 검색 그대로)
+        segment별 SearchParameters는 검색이 끝날 때까지 참조 유지
+        tombstone(금지 / 삭제 곡)은 id_selector와 묶어 검색 단계에서 제외, nprobe는 id_selector(include / 속성 필터)가 있을 때만 늘림
+        """
+        selector = MuseTombstones.selector(key, id_selector)
+        results, params_refs = [], []
+        for segment in [index] + MuseFaiss.deltas.get(key, []):
+            if segment is not index and segment.ntotal == 0:
+                continue
+            params, quantizer_params = MuseFaiss._search_params(key, segment, id_selector=selector, include=id_selector is not None)
+            params_refs.append((params, quantizer_params))
+            results.append(segment.search(query_vector, k) if params is None else segment.search(query_vector, k, params=params))
+        if len(results) == 1:
+            return results[0]
+
+        D = np.concatenate([D for D, _ in results], axis=1)
+        I = np.concatenate([I for _, I in results], axis=1)
+        # 내적 인덱스는 클수록 유사, 빈 자리(-1)는 항상 뒤로
+        similarity = index.metric_type == faiss.METRIC_INNER_PRODUCT
+        sort_key = np.where(I >= 0, -D if similarity else D, np.inf)
+        order = np.argsort(sort_key, axis=1, kind='stable')[:, :k]
+        return np.take_along_axis(D, order, axis=1), np.take_along_axis(I, order, axis=1)
+
+    @staticmethod
+    def _apply_threshold(key: str, D: np.ndarray, I: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """registry threshold보다 먼 결과는 무효값(inf / -1)으로 처리 (L2 기반, 작을수록 유사)"""
+        threshold = MuseFaiss._thresholds.get(key)
+        if threshold is not None:
+            mask = D > threshold
+            D[mask] = np.inf
+            I[mask] = -1
+        return D, I
+
+    @staticmethod
+    def _warm_index(key: str, index: faiss.Index):
+        """더미 쿼리로 첫 검색 지연(스레드 풀 생성, 페이지 로드) 제거"""
         try:
-            indices['lyrics_3'] = faiss.read_index(f'{INDEX_PATH}/muse_lyrics_3_backup.index')
-        except Exception as e2:
-            logging.error(f"Failed to load lyrics_3 backup index: {e2}")
-
-    try:
-        indices['lyrics_summary'] = faiss.read_index(f'{INDEX_PATH}/muse_lyrics_summary.index')
-        logging.info(f"Loaded lyrics_summary index: {indices['lyrics_summary'].ntotal} vectors")
-    except Exception as e:
-        logging.warning(f"Failed to load lyrics_summary index, trying backup: {e}")
+            if index.ntotal > 0:
+                index.search(np.zeros((1, index.d), dtype='float32'), 1)
+        except Exception as e:
+            logging.warning(f"Failed to warm {key} index: {e}")
+
+    @staticmethod
+    def load_index(key: str) -> Optional[faiss.Index]:
+        """
+        단일 인덱스 로드 (이미 로드되어 있으면 그대로 반환)
+
+        key별 lock으로 백그라운드 로더와 요청 스레드가 같은 파일을 중복 로드하지 않도록 함
+        """
+        if key in MuseFaiss.indices:
+            return MuseFaiss.indices[key]
+        if key not in MuseFaiss._key_locks:
+            return None
+
+        with MuseFaiss._key_locks[key]:
+            if key in MuseFaiss.indices:
+                return MuseFaiss.indices[key]
+
+            start = time.time()
+            index = MuseFaiss._read_index(key)
+            if index is None:
+                MuseFaiss._failed_keys[key] = 'load failed'
+                return None
+
+            manifest = MuseFaiss._read_manifest(key)
+            deltas, files = MuseFaiss._read_deltas(key, index, manifest)
+            MuseFaiss._warm_index(key, index)
+            for delta in deltas:
+                MuseFaiss._warm_index(key, delta)
+            # 검색 스레드가 base만 보고 delta를 놓치지 않도록 delta를 먼저 등록
+            if manifest is not None:
+                MuseFaiss._removed[key] = int(manifest.get('removed', 0))
+            MuseFaiss._delta_files[key] = files
+            MuseFaiss.deltas[key] = deltas
+            MuseFaiss.indices[key] = index
+            MuseFaiss._failed_keys.pop(key, None)
+            logging.info(f"{key} index ready: {time.time() - start:.2f}s")
+            return index
+
+    @staticmethod
+    def get_index(key: str) -> Optional[faiss.Index]:
+        """검색용 인덱스 반환 (lazy 인덱스 또는 아직 로드 중인 인덱스는 로드 완료까지 대기)"""
+        index = MuseFaiss.indices.get(key)
+        if index is None:
+            index = MuseFaiss.load_index(key)
+        return index
+
+    @staticmethod
+    def load_search_profiles(path: Optional[str] = None) -> Dict[str, Dict]:
+        """
+        tune_faiss가 생성한 key별 nprobe / efSearch 프로파일 로드
+        MuseRegistry의 search에 직접 선언한 값이 있으면 튜닝 결과보다 우선
+        """
+        path = path or MuseFaiss._search_params_path
+        profiles = {}
         try:
-            indices['lyrics_summary'] = faiss.read_index(f'{INDEX_PATH}/muse_lyrics_summary_backup.index')
-        except Exception as e2:
-            logging.error(f"Failed to load lyrics_summary backup index: {e2}")
-
-    try:
-        indices['album_name'] = faiss.read_index(f'{INDEX_PATH}/muse_album_name.index')
-        logging.info(f"Loaded album name index: {indices['album_name'].ntotal} vectors")
-    except Exception as e:
-        logging.warning(f"Failed to load album name index, trying backup: {e}")
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    profiles = json.load(f)
+        except Exception as e:
+            logging.error(f"Failed to load search profiles {path}: {e}")
+
+        for key, search in MuseRegistry.mapping('search').items():
+            if search:
+                profiles[key] = {**profiles.get(key, {}), **search}
+        MuseFaiss._search_profiles = {
+            key: {name: profile[name] for name in ('nprobe', 'efSearch', 'include_nprobe') if name in profile}
+            for key, profile in profiles.items()
+        }
+        if MuseFaiss._search_profiles:
+            logging.info(f"Loaded search profiles: {MuseFaiss._search_profiles}")
+        return MuseFaiss._search_profiles
+
+    @staticmethod
+    def _ivf(index: faiss.Index):
+        """IVF 인덱스 (pre-transform 안쪽 포함), IVF가 아니면 None"""
         try:
-            indices['album_name'] = faiss.read_index(f'{INDEX_PATH}/muse_album_name_backup.index')
-        except Exception as e2:
-            logging.error(f"Failed to load album name backup index: {e2}")
+            return faiss.extract_index_ivf(index)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _search_params(key: str, index: faiss.Index, id_selector=None, include: Optional[bool] = None) -> Tuple[Optional[faiss.SearchParameters], Optional[faiss.SearchParameters]]:
+        """
+        key 프로파일을 적용한 SearchParameters 생성
+        include가 False면 id_selector는 제외용(tombstone)이라 nprobe를 늘리지 않음 (None이면 id_selector 유무)
+
+        Returns:
+            (params, quantizer_params) - quantizer_params는 SWIG 객체 수명 유지를 위해 검색이 끝날 때까지 참조를 들고 있어야 함
+        """
+        profile = MuseFaiss._search_profiles.get(key, {})
+        # OPQ / PCA pre-transform 인덱스도 IVF 파라미터는 안쪽 IVF로 그대로 전달됨
+        ivf = MuseFaiss._ivf(index)
+
+        if ivf is None:
+            if id_selector is None:
+                return None, None
+            params = faiss.SearchParameters()
+            params.sel = id_selector
+            return params, None
+
+        if not profile and id_selector is None:
+            # 프로파일이 없으면 인덱스에 저장된 설정 그대로 사용
+            return None, None
+
+        params = faiss.SearchParametersIVF()
+        nprobe = profile.get('nprobe', ivf.nprobe)
+        if id_selector is not None:
+            params.sel = id_selector
+        if id_selector is not None and include is not False:
+            nprobe = profile.get('include_nprobe', max(nprobe, MuseFaiss._include_min_nprobe))
+        params.nprobe = min(int(nprobe), ivf.nlist)
+
+        quantizer_params = None
+        if 'efSearch' in profile:
+            quantizer_params = faiss.SearchParametersHNSW()
+            quantizer_params.efSearch = int(profile['efSearch'])
+            params.quantizer_params = quantizer_params
+        return params, quantizer_params
+
+    @staticmethod
+    def configure(index_files: Dict[str, str], lazy_keys: Optional[set] = None):
+        """로드 대상 인덱스 재설정 (search-node 모드에서 자기 shard 파일만 로드할 때 사용)"""
+        MuseFaiss._index_files = dict(index_files)
+        MuseFaiss._lazy_keys = set(lazy_keys or set()) & set(index_files)
+        MuseFaiss._key_locks = {key: threading.Lock() for key in index_files}
+
+    @staticmethod
+    def exclude_keys(keys: List[str]):
+        """원격 shard가 담당하는 key는 로컬에서 로드하지 않음"""
+        for key in keys:
+            MuseFaiss._index_files.pop(key, None)
+            MuseFaiss._key_locks.pop(key, None)
+        MuseFaiss._lazy_keys -= set(keys)
+
+    @staticmethod
+    def required_keys() -> List[str]:
+        return [key for key in MuseFaiss._index_files if key not in MuseFaiss._lazy_keys]
 
     @staticmethod
-    def search(key: str, query_vector: np.ndarray, k: int = 100) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
-        """특정 인덱스에서 검색 수행"""
-        if key not in MuseFaiss.indices:
+    def load_all(include_lazy: bool = False) -> bool:
+        """필수 인덱스를 병렬 스레드로 로드 + warm-up 후 ready 상태로 전환"""
+        keys = list(MuseFaiss._index_files) if include_lazy else MuseFaiss.required_keys()
+        start = time.time()
+        MuseFaiss.load_search_profiles()
+
+        # faiss.read_index는 GIL을 해제하므로 스레드 병렬 로드가 유효함
+        with ThreadPoolExecutor(max_workers=MuseFaiss._load_workers) as executor:
+            list(executor.map(MuseFaiss.load_index, keys))
+
+        missing = [key for key in MuseFaiss.required_keys() if key not in MuseFaiss.indices]
+        if missing:
+            logging.error(f"Required FAISS indices not loaded: {missing}")
+            return False
+
+        MuseFaiss._ready.set()
+        logging.info(f"FAISS indices ready ({time.time() - start:.2f}s): {MuseFaiss.get_all_info()}")
+        return True
+
+    @staticmethod
+    def start_background_load(include_lazy: bool = False) -> threading.Thread:
+        """서버 기동을 막지 않도록 백그라운드 스레드에서 load_all 실행"""
+        if MuseFaiss._loader is None or not MuseFaiss._loader.is_alive():
+            MuseFaiss._loader = threading.Thread(
+                target=MuseFaiss.load_all,
+                kwargs={'include_lazy': include_lazy},
+                name='faiss-loader',
+                daemon=True
+            )
+            MuseFaiss._loader.start()
+        return MuseFaiss._loader
+
+    @staticmethod
+    def is_ready() -> bool:
+        return MuseFaiss._ready.is_set()
+
+    @staticmethod
+    def get_status() -> Dict:
+        """readiness 확인용 인덱스 로드 상태"""
+        return {
+            'ready': MuseFaiss.is_ready(),
+            'loaded': sorted(MuseFaiss.indices.keys()),
+            'pending': [key for key in MuseFaiss.required_keys() if key not in MuseFaiss.indices],
+            'lazy': sorted(key for key in MuseFaiss._lazy_keys if key not in MuseFaiss.indices),
+            'failed': dict(MuseFaiss._failed_keys)
+        }
+
+    @staticmethod
+    def search(key: str, query_vector: np.ndarray, k: int = 100, id_selector=None) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """특정 인덱스에서 검색 수행 (id_selector: 속성 필터 등으로 검색 대상 id 제한)"""
+        index = MuseFaiss.get_index(key)
+        if index is None:
             logging.error(f"Index type '{key}' not found. Available: {list(MuseFaiss.indices.keys())}")
             return None, None
         
         try:
-            index = MuseFaiss.indices[key]
             # 쿼리 벡터가 1차원이면 2차원으로 변환
             if query_vector.ndim == 1:
                 query_vector = query_vector.reshape(1, -1)
             
-            D, I = index.search(query_vector.astype('float32'), k)                        
-            if key in ['artist', 'lyrics', 'title']:
-                # logging.info(f'''threshold 적용 {key}''')
-                threshold = 0.9  # 예시 (L2 distance일 경우)
-
-                # L2 기반일 때 (작을수록 유사)
-                mask = D > threshold
-                D[mask] = np.inf   # 무효값으로 처리
-                I[mask] = -1       # 유효하지 않은 인덱스는 -1로
-
-            return D, I
+            D, I = MuseFaiss._search_segments(key, index, query_vector.astype('float32'), k, id_selector=id_selector)
+            return MuseFaiss._apply_threshold(key, D, I)
         except Exception as e:
             logging.error(f"Search error in {key} index: {e}")
             return None, None
@@ -127,7 +445,8 @@ class MuseFaiss:
             - IVFPQ, IVF 계열 인덱스에서만 작동 (Flat 인덱스는 fallback 사용)
             - 4000만개 인덱스에서 10만개 include_ids 검색 시 비트맵 메모리: ~5MB
         """
-        if key not in MuseFaiss.indices:
+        index = MuseFaiss.get_index(key)
+        if index is None:
             logging.error(f"Index type '{key}' not found. Available: {list(MuseFaiss.indices.keys())}")
             return None, None
 
@@ -136,15 +455,17 @@ class MuseFaiss:
             return None, None
 
         try:
-            index = MuseFaiss.indices[key]
-            n_total = index.ntotal
+            n_total = MuseFaiss.id_end(key)
 
             # 쿼리 벡터가 1차원이면 2차원으로 변환
             if query_vector.ndim == 1:
                 query_vector = query_vector.reshape(1, -1)
 
-            # include_ids 범위 검증 및 필터링
-            valid_include_ids = [id for id in include_ids if 0 <= id < n_total]
+            # include_ids 범위 검증 및 필터링 (song id 인덱스는 id가 곡 식별자이므로 음수만 제외)
+            if MuseFaiss.is_song_id(key):
+                valid_include_ids = [id for id in include_ids if id >= 0]
+            else:
+                valid_include_ids = [id for id in include_ids if 0 <= id < n_total]
             if len(valid_include_ids) < len(include_ids):
                 logging.warning(f"Filtered out {len(include_ids) - len(valid_include_ids)} invalid IDs (out of range 0-{n_total})")
 
@@ -152,26 +473,12 @@ class MuseFaiss:
                 logging.error("No valid include_ids after range check")
                 return None, None
 
-            # 인덱스 구조 확인
-            index_name = index.__class__.__name__
-
             # IDSelectorBatch 사용 (IDSelectorBitmap은 FAISS 1.11.0에서 버그가 있음)
             include_ids_array = np.array(valid_include_ids, dtype=np.int64)
             id_selector = faiss.IDSelectorBatch(len(include_ids_array), faiss.swig_ptr(include_ids_array))
 
-            # 인덱스 타입에 맞는 SearchParameters 설정
-            if 'IVF' in index_name or hasattr(index, 'nprobe'):
-                # IVF 계열 인덱스
-                params = faiss.SearchParametersIVF()
-                params.sel = id_selector
-                params.nprobe = max(getattr(index, 'nprobe', 100), 100)
-            else:
-                # Flat 등 다른 인덱스
-                params = faiss.SearchParameters()
-                params.sel = id_selector
-
-            # 검색 실행
-            D, I = index.search(query_vector.astype('float32'), k, params=params)
+            # 검색 실행 (segment별로 인덱스 타입에 맞는 SearchParameters 적용, IVF 계열은 key 프로파일의 include_nprobe / efSearch)
+            D, I = MuseFaiss._search_segments(key, index, query_vector.astype('float32'), k, id_selector=id_selector)
 
             # logging.info(f"[DEBUG] Search completed. D shape: {D.shape}, I shape: {I.shape}")
             # logging.info(f"[DEBUG] D values: {D[0]}")
@@ -179,13 +486,7 @@ class MuseFaiss:
             # logging.info(f"search_with_include [{key}]: {len(valid_include_ids)} include_ids, returned {I} results")            
 
             # 기존 search와 동일한 threshold 필터링 적용
-            if key in ['artist', 'lyrics', 'title']:
-                threshold = 0.9
-                mask = D > threshold
-                D[mask] = np.inf
-                I[mask] = -1
-
-            return D, I
+            return MuseFaiss._apply_threshold(key, D, I)
 
         except Exception as e:
             logging.error(f"Error in search_with_include for {key}: {e}")
@@ -194,11 +495,11 @@ class MuseFaiss:
             # Fallback: 전체 검색 후 필터링
             try:
                 include_set = set(include_ids)
-                search_k = min(k * 10, index.ntotal)
-                D, I = index.search(query_vector.astype('float32'), search_k)
+                search_k = min(k * 10, MuseFaiss.ntotal(key))
+                D, I = MuseFaiss._search_segments(key, index, query_vector.astype('float32'), search_k)
 
                 # 결과 필터링
-                mask = np.isin(I[0], list(include_set))
+                mask = np.isin(I[0], list(include_set)) & MuseTombstones.keep_mask(key, I[0])
                 filtered_D = D[0][mask][:k]
                 filtered_I = I[0][mask][:k]
 
@@ -221,12 +522,20 @@ class MuseFaiss:
 
         try:
             index = MuseFaiss.indices[index_type]
+            ivf = MuseFaiss._ivf(index)
+            meta = MuseFaiss.index_meta(index_type)
             return {
                 'type': index_type,
-                'ntotal': index.ntotal,
+                'ntotal': MuseFaiss.ntotal(index_type),
+                'delta_ntotal': [delta.ntotal for delta in MuseFaiss.deltas.get(index_type, [])],
+                'removed': MuseFaiss._removed.get(index_type, 0),
+                'tombstones': len(MuseTombstones.tombstones.get(index_type, {}).get('ids', [])),
                 'd': index.d,
                 'is_trained': getattr(index, 'is_trained', True),
-                'nlist': getattr(index, 'nlist', None)
+                'nlist': ivf.nlist if ivf is not None else None,
+                'factory': meta.get('factory'),
+                'id_format': meta.get('id_format', 'idx'),
+                'search_profile': MuseFaiss._search_profiles.get(index_type)
             }
         except Exception as e:
             logging.error(f"Error getting info for {index_type}: {e}")
@@ -0,0 +1,104 @@
+from operator import attrgetter
+from typing import Dict, List
+
+class SongHit:
+    """
+    검색 파이프라인(_process_batch → _faiss_search → 병합 → 중복 제거)을 지나는 곡 한 건
+
+    - Oracle 메타 row(dict)는 복사하지 않고 참조만 유지, 점수 / 병합 상태만 slot으로 보관
+    - 응답으로 나가는 곡만 to_dict()로 기존 결과 dict 형식으로 변환
+    """
+    __slots__ = ('meta', 'dis', 'count', 'index_name', 'index_names', 'main_mood', 'bpm', 'energy_level')
+
+    def __init__(self, meta: dict, dis: float, index_name: str):
+        self.meta = meta
+        self.dis = dis
+        self.count = 1
+        self.index_name = index_name
+        # 병합 후 포함된 index 이름 집합 (병합 전에는 None)
+        self.index_names = None
+        # mood / bpm은 조회한 경우에만 (None이면 응답 dict에 넣지 않음)
+        self.main_mood = None
+        self.bpm = None
+        self.energy_level = None
+
+    def copy(self) -> 'SongHit':
+        hit = SongHit(self.meta, self.dis, self.index_name)
+        hit.count = self.count
+        hit.main_mood, hit.bpm, hit.energy_level = self.main_mood, self.bpm, self.energy_level
+        return hit
+
+    def set_mood(self, fields: dict):
+        self.main_mood = fields['main_mood']
+        self.bpm = fields['bpm']
+        self.energy_level = fields['energy_level']
+
+    def to_dict(self) -> dict:
+        song = dict(self.meta)
+        song['count'] = self.count
+        song['dis'] = self.dis
+        song['index_name'] = self.index_name
+        if self.main_mood is not None:
+            song['main_mood'] = self.main_mood
+            song['bpm'] = self.bpm
+            song['energy_level'] = self.energy_level
+        song['index_name_set'] = set(self.index_names) if self.index_names is not None else {self.index_name}
+        return song
+
+
+class MuseHits:
+    """search_text의 index별 결과 병합 / 순위 / 중복 제거 (SongHit 기준)"""
+
+    @staticmethod
+    def merge(results_list: list, task_keys: list) -> Dict[str, SongHit]:
+        """(query_key, {song_key: SongHit}) 목록 병합, 여러 index에 나온 곡은 거리를 곱해 앞으로"""
+        title_vibe = 'title' in task_keys and 'artist' not in task_keys
+        merged = {}
+        for (query_key, group) in results_list:
+            vibe_boost = query_key == 'vibe' and title_vibe
+            for key, hit in group.items():
+                current = merged.get(key)
+                if current is None:
+                    # 처음 등장하는 곡이면 복사
+                    current = merged[key] = hit.copy()
+                    current.index_names = {hit.index_name}
+                    if vibe_boost:
+                        current.dis = 0.05 * current.dis
+                else:
+                    current.count += 1
+                    if vibe_boost:
+                        current.dis = 0.1 * current.dis
+                    if hit.index_name in current.index_names:
+                        current.dis = min(current.dis / 2, hit.dis / 2)
+                    else:
+                        current.dis *= hit.dis
+                        current.index_names.add(hit.index_name)
+        return merged
+
+    @staticmethod
+    def rank(merged: Dict[str, SongHit], task_keys: list) -> List[SongHit]:
+        """title + vibe 질의면 hit_year 곡을 올린 뒤 거리 순 정렬"""
+        hits = list(merged.values())
+        if 'vibe' in task_keys and 'title' in task_keys:
+            for hit in hits:
+                if hit.meta['hit_year']:
+                    hit.dis *= 0.001
+        hits.sort(key=attrgetter('dis'))
+        return hits
+
+    @staticmethod
+    def dedup(hits: List[SongHit], limit: int) -> List[SongHit]:
+        """같은 아티스트 + 곡명은 하나만 (hit_year가 있는 곡 우선), 최대 limit곡"""
+        total = {}
+        for hit in hits:
+            if len(total) >= limit:
+                break
+            artist = hit.meta['artist']
+            title = hit.meta['song_name']
+            song_key = f'''{artist.lower().replace(' ','').strip() if artist else ''}_{title.lower().replace(' ','').strip() if title else ''} '''
+            current = total.get(song_key)
+            if current is None:
+                total[song_key] = hit
+            elif not current.meta['hit_year'] and hit.meta['hit_year']:
+                total[song_key] = hit
+        return list(total.values())
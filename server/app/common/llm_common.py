@@ -2,6 +2,7 @@ import requests
 import copy
 import logging
 import json
+from common.metrics_common import MuseMetrics
 
 class MuseLLM:
     _gemma_url = "http://ai-int.mbc.co.kr:8000/v1/chat/completions" 
@@ -173,10 +174,12 @@ class MuseLLM:
         try:            
             if llm_type == 'gemma':
                 MuseLLM._gemma_payload['messages'][1]['content'] = f'''쿼리: {text}, 무드: {mood}'''
-                response = requests.post(MuseLLM._gemma_url, json= MuseLLM._gemma_payload)                
+                with MuseMetrics.timer('muse_llm_parse_seconds', llm=llm_type):
+                    response = requests.post(MuseLLM._gemma_url, json= MuseLLM._gemma_payload)                
             elif llm_type == 'oss':
                 MuseLLM._oss_payload['messages'][1]['content'] = f'''쿼리: {text}, 무드: {mood}'''
-                response = requests.post(MuseLLM._oss_url, json= MuseLLM._oss_payload)                      
+                with MuseMetrics.timer('muse_llm_parse_seconds', llm=llm_type):
+                    response = requests.post(MuseLLM._oss_url, json= MuseLLM._oss_payload)                      
             
             # 응답 파싱
             if response.status_code == 200:
@@ -192,6 +195,7 @@ class MuseLLM:
             return None
 
     @staticmethod
+    @MuseMetrics.timed('muse_llm_reason_seconds')
     def get_reason(text, llm_result, song_info):
         response = requests.post(MuseLLM._oss_url, json= MuseLLM.make_system_reason_payload(prompt=MuseLLM.make_system_reason_prompt(text=text, llm_result=llm_result, song_info=song_info)))        
         # 응답 파싱
@@ -1,15 +1,131 @@
+import atexit
+import json
 import logging
 import os
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+from common.trace_common import MuseTrace
+
+class TraceIdFilter(logging.Filter):
+    """로그 레코드에 현재 요청의 trace id 추가 (요청 밖이면 '-')"""
+    def filter(self, record):
+        record.trace_id = MuseTrace.current_id() or '-'
+        return True
+
+class SamplingFilter(logging.Filter):
+    """logger 이름(상위 이름 포함)별 비율로 레코드 샘플링, WARNING 이상은 항상 기록"""
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        name = record.name
+        while name:
+            if name in self.rates:
+                return random.random() < self.rates[name]
+            name = name.rpartition('.')[0]
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON 레코드 (traceback은 message에 포함, data는 QueueHandler에서 직렬화된 문자열을 그대로 삽입)"""
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%d %H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'trace_id': getattr(record, 'trace_id', '-'),
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        line = json.dumps(entry, ensure_ascii=False)
+        data_json = getattr(record, 'data_json', None)
+        if data_json is not None:
+            line = f'{line[:-1]}, "data": {data_json}}}'
+        return line
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    호출 스레드(이벤트 루프 / worker 스레드)에서는 메시지 조합과 크기 제한만 하고 큐에 넣음
+    큐가 가득 차면 기다리지 않고 버림 (버린 개수는 Logger.dropped)
+    """
+    def __init__(self, log_queue, max_chars):
+        super().__init__(log_queue)
+        self.max_chars = max_chars
+
+    def _cap(self, text):
+        if len(text) > self.max_chars:
+            return f'{text[:self.max_chars]}...(+{len(text) - self.max_chars} chars)'
+        return text
+
+    def prepare(self, record):
+        record = super().prepare(record)
+        record.msg = self._cap(record.msg)
+        # extra={'data': {...}} 구조화 필드는 호출 시점 값으로 직렬화 (이후 dict 변경과 무관하게)
+        data = record.__dict__.pop('data', None)
+        if data is not None:
+            data_json = json.dumps(data, ensure_ascii=False, default=str)
+            record.data_json = data_json if len(data_json) <= self.max_chars else json.dumps(self._cap(data_json), ensure_ascii=False)
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            Logger.dropped += 1
 
 class Logger:
+    _queue_size = 10000
+    _max_message_chars = 4000
+    # logger 이름별 샘플링 비율 (0 ~ 1), 지정하지 않은 logger는 전부 기록
+    _sample_rates = {
+        'muse.payload': 0.1
+    }
+    _listener = None
+    dropped = 0
+
     @staticmethod
     def _remove_logger():
+        Logger._stop_listener()
         for handler in logging.root.handlers[:]:
             logging.root.removeHandler(handler)
-    
+            handler.close()
+
+    @staticmethod
+    def _stop_listener():
+        if Logger._listener is not None:
+            Logger._listener.stop()
+            for handler in Logger._listener.handlers:
+                handler.close()
+            Logger._listener = None
+
     @staticmethod
     def set_logger(log_path, file_name):
         if not os.path.exists(log_path):
-            os.makedirs(log_path)   
-        Logger._remove_logger()             
-        logging.basicConfig(filename=f'''{log_path}/{file_name}''', format = '%(asctime)s:%(levelname)s:%(message)s', level=logging.INFO)
\ No newline at end of file
+            os.makedirs(log_path)
+        Logger._remove_logger()
+
+        # 파일 쓰기는 listener 스레드에서만 수행
+        file_handler = logging.FileHandler(f'''{log_path}/{file_name}''', encoding='utf-8')
+        file_handler.setFormatter(JsonFormatter())
+
+        log_queue = queue.Queue(maxsize=Logger._queue_size)
+        queue_handler = NonBlockingQueueHandler(log_queue, max_chars=Logger._max_message_chars)
+        queue_handler.addFilter(SamplingFilter(Logger._sample_rates))
+        # contextvars 기반이므로 호출 스레드에서 trace id를 붙여야 함
+        queue_handler.addFilter(TraceIdFilter())
+
+        logging.root.addHandler(queue_handler)
+        logging.root.setLevel(logging.INFO)
+
+        Logger._listener = QueueListener(log_queue, file_handler)
+        Logger._listener.start()
+
+    @staticmethod
+    def payload(name: str, message: str, data):
+        """요청마다 남기는 큰 dict 로그 (muse.payload.* logger, 샘플링 / 크기 제한 대상)"""
+        logging.getLogger(f'muse.payload.{name}').info(message, extra={'data': data})
+
+atexit.register(Logger._stop_listener)
@@ -0,0 +1,164 @@
+import json
+import logging
+import math
+import os
+import re
+import zlib
+import numpy as np
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from config import INDEX_PATH
+
+class LyricsIndex:
+    """
+    곡 단위 가사 trigram 역색인 (배열은 모두 mmap)
+
+        grams            int64  정렬된 trigram 코드 (bucket 순 → 코드 순)
+        bucket_offsets   int64  bucket(코드 % bucket 수)별 grams 시작 위치
+        posting_offsets  int64  trigram별 postings 시작 바이트 (trigram 수 + 1)
+        postings         uint8  곡 번호 간격(gap)의 varint 인코딩
+        text_offsets     int64  곡별 texts 시작 바이트 (곡 수 + 1)
+        texts            uint8  곡별 정규화 가사 zlib 압축 (phrase 포함 여부 확인용)
+        {key}.ids        int32  곡 번호 → key 인덱스의 FAISS id (첫 window, 없으면 -1)
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], ids: Dict[str, np.ndarray]):
+        self.grams = arrays['grams']
+        self.bucket_offsets = arrays['bucket_offsets']
+        self.posting_offsets = arrays['posting_offsets']
+        self.postings = arrays['postings']
+        self.text_offsets = arrays['text_offsets']
+        self.texts = arrays['texts']
+        self.ids = ids
+        self.buckets = len(self.bucket_offsets) - 1
+
+    @staticmethod
+    def decode(data: np.ndarray) -> np.ndarray:
+        """varint gap 목록 → 곡 번호 (오름차순)"""
+        if len(data) == 0:
+            return np.empty(0, dtype='int64')
+        data = np.asarray(data)
+        ends = np.flatnonzero(data < 128)
+        starts = np.empty_like(ends)
+        starts[0] = 0
+        starts[1:] = ends[:-1] + 1
+        group = np.repeat(np.arange(len(ends)), ends - starts + 1)
+        shift = 7 * (np.arange(len(data)) - starts[group])
+        gaps = np.bincount(group, weights=(data & 0x7f).astype('int64') << shift, minlength=len(ends))
+        return np.cumsum(gaps.astype('int64'))
+
+    def posting(self, code: int) -> np.ndarray:
+        bucket = code % self.buckets
+        start, end = int(self.bucket_offsets[bucket]), int(self.bucket_offsets[bucket + 1])
+        position = start + int(np.searchsorted(self.grams[start:end], code))
+        if position >= end or self.grams[position] != code:
+            return np.empty(0, dtype='int64')
+        return LyricsIndex.decode(self.postings[self.posting_offsets[position]:self.posting_offsets[position + 1]])
+
+    def text(self, doc: int) -> str:
+        return zlib.decompress(self.texts[self.text_offsets[doc]:self.text_offsets[doc + 1]].tobytes()).decode('utf-8')
+
+    def match(self, query: str, min_overlap: float, max_docs: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        query trigram을 min_overlap 이상 포함하는 곡 (곡 번호, overlap)
+        모든 trigram을 포함하고 가사에 query가 그대로 있으면 overlap 1.0 (완전 일치), 아니면 1.0 미만
+        """
+        codes = set(MuseLyricsIndex.trigrams(query))
+        postings = [self.posting(code) for code in codes]
+        postings = [posting for posting in postings if len(posting)]
+        if not postings:
+            return np.empty(0, dtype='int64'), np.empty(0, dtype='float32')
+
+        docs, counts = np.unique(np.concatenate(postings), return_counts=True)
+        keep = counts >= math.ceil(len(codes) * min_overlap)
+        docs, counts = docs[keep], counts[keep]
+        order = np.lexsort((docs, -counts))[:max_docs]
+        docs, counts = docs[order], counts[order]
+
+        overlap = counts / len(codes)
+        for i in np.flatnonzero(counts == len(codes)).tolist():
+            # trigram이 모두 있어도 순서가 다를 수 있으므로 실제 포함 여부 확인
+            if query not in self.text(int(docs[i])):
+                overlap[i] = (len(codes) - 1) / len(codes)
+        return docs, overlap.astype('float32')
+
+
+class MuseLyricsIndex:
+    """
+    case 9(가사 검색)용 exact / near-exact phrase 역색인 (build_lyrics_index.py로 생성)
+
+        {INDEX_PATH}/lyrics/*.npy, texts.bin   LyricsIndex 배열
+        {INDEX_PATH}/lyrics/manifest.json      생성 정보 (마지막에 기록)
+
+    가사 원문 그대로의 질의는 역색인에서 바로 찾고, 완전 일치가 있으면 lyrics / lyrics_3 벡터 검색 k를 줄임
+    완전 일치가 없는 의역 질의는 기존 k로 벡터 검색
+    """
+    _lyrics_path = f'{INDEX_PATH}/lyrics'
+    _keys = ['lyrics', 'lyrics_3']
+    _fields = ('grams', 'bucket_offsets', 'posting_offsets', 'postings', 'text_offsets')
+    _normalize_pattern = re.compile(r'[\W_]+')
+    _min_query_chars = 3
+    # near-exact: 질의 trigram 중 이 비율 이상을 포함하는 곡
+    _min_overlap = 0.8
+    _max_docs = 1000
+    # 완전 일치 0.0, near-exact 0.05 ~ 0.1 (overlap이 낮을수록 큼)
+    _near_distance = 0.05
+
+    index: Optional[LyricsIndex] = None
+
+    @staticmethod
+    def normalize(text) -> str:
+        """소문자, 공백 / 문장부호 제거 (띄어쓰기 / 줄바꿈 차이 무시)"""
+        return MuseLyricsIndex._normalize_pattern.sub('', str(text or '').lower())
+
+    @staticmethod
+    def trigrams(text: str):
+        return [ord(text[i]) << 42 | ord(text[i + 1]) << 21 | ord(text[i + 2]) for i in range(len(text) - 2)]
+
+    @staticmethod
+    def load(path: Optional[str] = None) -> Dict[str, int]:
+        path = path or MuseLyricsIndex._lyrics_path
+        manifest_path = f'{path}/manifest.json'
+        if not os.path.exists(manifest_path):
+            logging.info(f"No lyrics index ({path}), phrase match disabled")
+            return {}
+
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            arrays = {field: np.load(f'{path}/{field}.npy', mmap_mode='r') for field in MuseLyricsIndex._fields}
+            arrays['texts'] = np.memmap(f'{path}/texts.bin', dtype='uint8', mode='r')
+            ids = {key: np.load(f'{path}/{key}.ids.npy', mmap_mode='r') for key in MuseLyricsIndex._keys if key in manifest['keys']}
+            MuseLyricsIndex.index = LyricsIndex(arrays, ids)
+        except Exception as e:
+            logging.error(f"Failed to load lyrics index: {e}")
+            return {}
+        MuseLyricsIndex._match.cache_clear()
+
+        logging.info(f"Lyrics index loaded: {manifest}")
+        return {key: manifest['docs'] for key in ids}
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _match(query: str) -> Tuple[np.ndarray, np.ndarray]:
+        # lyrics / lyrics_3 가 같은 질의로 동시에 조회하므로 곡 매칭 결과를 공유
+        return MuseLyricsIndex.index.match(query, MuseLyricsIndex._min_overlap, MuseLyricsIndex._max_docs)
+
+    @staticmethod
+    def lookup(key: str, text) -> Optional[Tuple[np.ndarray, np.ndarray, bool]]:
+        """(FAISS id, 거리, 완전 일치 여부), 역색인을 쓸 수 없으면 None (기존 k로 벡터 검색)"""
+        index = MuseLyricsIndex.index
+        if index is None or key not in index.ids:
+            return None
+        query = MuseLyricsIndex.normalize(text)
+        if len(query) < MuseLyricsIndex._min_query_chars:
+            return None
+        try:
+            docs, overlap = MuseLyricsIndex._match(query)
+            ids = np.asarray(index.ids[key][docs], dtype='int64')
+            distance = np.where(overlap >= 1.0, 0.0, MuseLyricsIndex._near_distance * (1 + (1 - overlap) * 5)).astype('float32')
+            valid = ids >= 0
+            return ids[valid], distance[valid], bool((overlap[valid] >= 1.0).any())
+        except Exception as e:
+            logging.error(f"Lyrics index lookup failed [{key}] {query}: {e}")
+            return None
@@ -0,0 +1,156 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Tuple
+from common.trace_common import MuseTrace
+
+class MuseMetrics:
+    """
+    프로세스 내 Prometheus 텍스트 포맷 메트릭 (histogram / counter / gauge)
+
+    - 외부 패키지 없이 lock 하나로 집계, /metrics 에서 render() 결과를 그대로 반환
+    - gunicorn 멀티 워커 환경에서는 워커별 값이므로 워커마다 scrape 하거나 pid label로 구분
+    - 요청 처리 중 기록된 값은 MuseTrace의 해당 요청 timing tree에도 span으로 남음
+    """
+    # latency bucket 상한 (초): FAISS 수 ms ~ LLM 수 초까지 한 세트로 사용
+    _buckets = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    _help = {
+        'muse_request_seconds': 'HTTP request latency by route',
+        'muse_requests_in_flight': 'HTTP requests currently being processed',
+        'muse_llm_parse_seconds': 'LLM query parse latency',
+        'muse_llm_reason_seconds': 'LLM recommendation reason latency',
+        'muse_embedding_seconds': 'Embedding server latency',
+        'muse_faiss_search_seconds': 'FAISS search latency by index key',
+        'muse_lexical_seconds': 'Name / lyrics phrase inverted index lookup latency by index key',
+        'muse_refine_seconds': 'Exact float16 re-ranking latency of IVFPQ candidates by index key',
+        'muse_batch_process_seconds': 'Per-batch DB metadata fetch and dict build latency',
+        'muse_dao_seconds': 'SearchDAO query latency by method',
+        'muse_merge_seconds': 'Multi-index result merge latency',
+        'muse_dedup_seconds': 'Duplicate song removal latency',
+        'muse_stage_errors_total': 'Exceptions raised inside a timed stage',
+        'muse_executor_queue_depth': 'Pending tasks in a thread pool queue',
+        'muse_executor_threads': 'Started threads of a thread pool',
+        'muse_log_dropped': 'Log records dropped because the log queue was full'
+    }
+
+    _lock = threading.Lock()
+    # (name, labels) -> [bucket별 count..., +Inf count, sum]
+    _histograms: Dict[Tuple[str, tuple], list] = {}
+    _counters: Dict[Tuple[str, tuple], float] = {}
+    _gauges: Dict[Tuple[str, tuple], float] = {}
+    # scrape 시점에 값을 읽는 gauge (executor 큐 길이 등)
+    _gauge_callbacks: Dict[Tuple[str, tuple], Callable[[], float]] = {}
+
+    @staticmethod
+    def _labels(labels: dict) -> tuple:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    @staticmethod
+    def observe(name: str, value: float, **labels):
+        series = (name, MuseMetrics._labels(labels))
+        position = bisect.bisect_left(MuseMetrics._buckets, value)
+        with MuseMetrics._lock:
+            histogram = MuseMetrics._histograms.get(series)
+            if histogram is None:
+                histogram = MuseMetrics._histograms[series] = [0] * (len(MuseMetrics._buckets) + 1) + [0.0]
+            histogram[position] += 1
+            histogram[-1] += value
+        # muse_faiss_search_seconds -> faiss_search
+        MuseTrace.record(name[len('muse_'):].replace('_seconds', ''), value, **labels)
+
+    @staticmethod
+    def inc(name: str, value: float = 1, **labels):
+        series = (name, MuseMetrics._labels(labels))
+        with MuseMetrics._lock:
+            MuseMetrics._counters[series] = MuseMetrics._counters.get(series, 0) + value
+
+    @staticmethod
+    def add_gauge(name: str, value: float, **labels):
+        series = (name, MuseMetrics._labels(labels))
+        with MuseMetrics._lock:
+            MuseMetrics._gauges[series] = MuseMetrics._gauges.get(series, 0) + value
+
+    @staticmethod
+    def register_gauge(name: str, callback: Callable[[], float], **labels):
+        MuseMetrics._gauge_callbacks[(name, MuseMetrics._labels(labels))] = callback
+
+    @staticmethod
+    def register_executor(pool: str, executor):
+        """ThreadPoolExecutor 대기 큐 길이 / 스레드 수 gauge 등록"""
+        MuseMetrics.register_gauge('muse_executor_queue_depth', lambda: executor._work_queue.qsize(), pool=pool)
+        MuseMetrics.register_gauge('muse_executor_threads', lambda: len(executor._threads), pool=pool)
+
+    @staticmethod
+    @contextmanager
+    def timer(name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            MuseMetrics.inc('muse_stage_errors_total', stage=name)
+            raise
+        finally:
+            MuseMetrics.observe(name, time.perf_counter() - start, **labels)
+
+    @staticmethod
+    def timed(name: str, **labels):
+        """함수 전체 실행 시간을 histogram으로 기록하는 decorator"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with MuseMetrics.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+        pairs = labels + extra
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+    @staticmethod
+    def render() -> str:
+        lines = []
+        with MuseMetrics._lock:
+            histograms = {series: list(values) for series, values in MuseMetrics._histograms.items()}
+            counters = dict(MuseMetrics._counters)
+            gauges = dict(MuseMetrics._gauges)
+        for series, callback in list(MuseMetrics._gauge_callbacks.items()):
+            try:
+                gauges[series] = callback()
+            except Exception:
+                continue
+
+        written = set()
+
+        def _header(name, metric_type):
+            if name not in written:
+                written.add(name)
+                lines.append(f'# HELP {name} {MuseMetrics._help.get(name, name)}')
+                lines.append(f'# TYPE {name} {metric_type}')
+
+        for (name, labels), values in sorted(histograms.items()):
+            _header(name, 'histogram')
+            cumulative = 0
+            for bound, count in zip(MuseMetrics._buckets, values):
+                cumulative += count
+                lines.append(f'{name}_bucket{MuseMetrics._format_labels(labels, (("le", str(bound)),))} {cumulative}')
+            cumulative += values[len(MuseMetrics._buckets)]
+            lines.append(f'{name}_bucket{MuseMetrics._format_labels(labels, (("le", "+Inf"),))} {cumulative}')
+            lines.append(f'{name}_sum{MuseMetrics._format_labels(labels)} {values[-1]:.6f}')
+            lines.append(f'{name}_count{MuseMetrics._format_labels(labels)} {cumulative}')
+
+        for (name, labels), value in sorted(counters.items()):
+            _header(name, 'counter')
+            lines.append(f'{name}{MuseMetrics._format_labels(labels)} {value}')
+
+        for (name, labels), value in sorted(gauges.items()):
+            _header(name, 'gauge')
+            lines.append(f'{name}{MuseMetrics._format_labels(labels)} {value}')
+
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,138 @@
+import json
+import logging
+import os
+import numpy as np
+from typing import Dict, Optional
+from config import INDEX_PATH
+
+class NameIndex:
+    """
+    key 하나의 이름 bigram 역색인 (배열은 모두 mmap)
+
+        names         uint8  정규화된 이름 utf-8 연결
+        name_offsets  int64  이름별 names 바이트 시작 위치 (이름 수 + 1)
+        id_offsets    int64  이름별 ids 시작 위치 (이름 수 + 1)
+        ids           int32  이름별 FAISS id (= MySQL idx - 1)
+        grams         int64  정렬된 bigram 코드 (ord(앞) << 21 | ord(뒤))
+        gram_offsets  int64  bigram별 gram_names 시작 위치 (bigram 수 + 1)
+        gram_names    int32  bigram을 포함하는 이름 번호 (오름차순)
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.names = arrays['names']
+        self.name_offsets = arrays['name_offsets']
+        self.id_offsets = arrays['id_offsets']
+        self.ids = arrays['ids']
+        self.grams = arrays['grams']
+        self.gram_offsets = arrays['gram_offsets']
+        self.gram_names = arrays['gram_names']
+
+    def name(self, ordinal: int) -> str:
+        return self.names[self.name_offsets[ordinal]:self.name_offsets[ordinal + 1]].tobytes().decode('utf-8')
+
+    def _posting(self, code: int) -> np.ndarray:
+        position = int(np.searchsorted(self.grams, code))
+        if position >= len(self.grams) or self.grams[position] != code:
+            return self.gram_names[:0]
+        return self.gram_names[self.gram_offsets[position]:self.gram_offsets[position + 1]]
+
+    def match(self, query: str, max_ids: int) -> np.ndarray:
+        """query를 포함하는 이름의 id (완전 일치 → 앞부분 일치 → 짧은 이름 순, 최대 max_ids개)"""
+        postings = sorted((self._posting(code) for code in set(MuseNameIndex.bigrams(query))), key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+
+        # bigram이 모두 있어도 순서가 다를 수 있으므로 3글자 이상은 실제 포함 여부 확인
+        matched = []
+        for ordinal in candidates.tolist():
+            name = self.name(ordinal)
+            if len(query) <= 2 or query in name:
+                matched.append((0 if name == query else 1 if name.startswith(query) else 2, len(name), ordinal))
+        matched.sort()
+
+        ids = []
+        total = 0
+        for _, _, ordinal in matched:
+            name_ids = self.ids[self.id_offsets[ordinal]:self.id_offsets[ordinal + 1]]
+            ids.append(name_ids)
+            total += len(name_ids)
+            if total >= max_ids:
+                break
+        if not ids:
+            return np.empty(0, dtype='int64')
+        return np.concatenate(ids)[:max_ids].astype('int64')
+
+
+class MuseNameIndex:
+    """
+    artist / title / album_name 이름 문자열 역색인 (build_name_index.py로 생성)
+
+        {INDEX_PATH}/names/{key}.{field}.npy   NameIndex 배열
+        {INDEX_PATH}/names/manifest.json       생성된 key 목록 (마지막에 기록)
+
+    _process_batch의 이름 포함 가산점(artist 0.00001 / album 0.02 / title 0.05)을 받을 곡을
+    벡터 검색 결과에 기대지 않고 직접 찾아서, 해당 key는 더 작은 k로 벡터 검색함
+    """
+    _name_path = f'{INDEX_PATH}/names'
+    _keys = ['artist', 'title', 'album_name']
+    _fields = ('names', 'name_offsets', 'id_offsets', 'ids', 'grams', 'gram_offsets', 'gram_names')
+    # bigram이 하나도 없는 1글자 질의는 역색인을 쓰지 않음
+    _min_query_chars = 2
+    _max_ids = 5000
+
+    indices: Dict[str, NameIndex] = {}
+
+    @staticmethod
+    def normalize(text) -> str:
+        """_process_batch 포함 비교와 같은 정규화 (소문자, 공백 제거)"""
+        return str(text or '').lower().replace(' ', '').replace('\x00', '').strip()
+
+    @staticmethod
+    def bigrams(text: str):
+        return [ord(text[i]) << 21 | ord(text[i + 1]) for i in range(len(text) - 1)]
+
+    @staticmethod
+    def load(path: Optional[str] = None) -> Dict[str, int]:
+        path = path or MuseNameIndex._name_path
+        manifest_path = f'{path}/manifest.json'
+        if not os.path.exists(manifest_path):
+            logging.info(f"No name index ({path}), lexical match disabled")
+            return {}
+
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+
+        indices = {}
+        for key in MuseNameIndex._keys:
+            if key not in manifest:
+                continue
+            try:
+                indices[key] = NameIndex({
+                    field: np.load(f'{path}/{key}.{field}.npy', mmap_mode='r')
+                    for field in MuseNameIndex._fields
+                })
+            except Exception as e:
+                logging.error(f"Failed to load {key} name index: {e}")
+        MuseNameIndex.indices = indices
+
+        loaded = {key: len(index.name_offsets) - 1 for key, index in indices.items()}
+        logging.info(f"Name index loaded: {loaded}")
+        return loaded
+
+    @staticmethod
+    def lookup(key: str, text) -> Optional[np.ndarray]:
+        """이름에 text가 포함된 FAISS id, 역색인을 쓸 수 없으면 None (기존 k로 벡터 검색)"""
+        index = MuseNameIndex.indices.get(key)
+        if index is None:
+            return None
+        query = MuseNameIndex.normalize(text)
+        if len(query) < MuseNameIndex._min_query_chars:
+            return None
+        try:
+            return index.match(query, MuseNameIndex._max_ids)
+        except Exception as e:
+            logging.error(f"Name index lookup failed [{key}] {query}: {e}")
+            return None
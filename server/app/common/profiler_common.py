@@ -0,0 +1,96 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+class MuseProfiler:
+    """
+    현재 워커 프로세스의 모든 스레드(이벤트 루프, search/query/shard executor 포함)를
+    일정 간격으로 sys._current_frames()로 샘플링하는 통계적 프로파일러
+
+    - 요청이 있을 때만 샘플링 스레드를 띄우므로 비활성 시 오버헤드 없음
+    - 결과는 flamegraph.pl / speedscope에서 바로 읽을 수 있는 collapsed stack 형식
+      (스레드;함수1;함수2 ... 샘플수)
+    - 한 번에 하나의 프로파일만 실행
+    """
+    _max_seconds = 60
+    _min_interval_ms = 1
+    _lock = threading.Lock()
+    # ThreadPoolExecutor-0_3 → ThreadPoolExecutor-0 (같은 풀의 스레드를 하나로 합침)
+    _thread_suffix = re.compile(r'_\d+$')
+    # 작업 대기 중인 스레드의 최상단 프레임 (include_idle=False 일 때 제외)
+    _idle_leaves = {
+        ('wait', 'threading.py'),
+        ('_worker', 'thread.py'),
+        ('select', 'selectors.py'),
+        ('serve_forever', 'socketserver.py')
+    }
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+    @staticmethod
+    def _sample(stacks: Counter, thread_names: Dict[int, str], skip_ident: int, include_idle: bool):
+        for ident, frame in sys._current_frames().items():
+            if ident == skip_ident:
+                continue
+            if not include_idle and (frame.f_code.co_name, os.path.basename(frame.f_code.co_filename)) in MuseProfiler._idle_leaves:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(MuseProfiler._frame_label(frame))
+                frame = frame.f_back
+            thread_name = MuseProfiler._thread_suffix.sub('', thread_names.get(ident, f'thread-{ident}'))
+            labels.append(thread_name)
+            stacks[';'.join(reversed(labels))] += 1
+
+    @staticmethod
+    def profile(seconds: float, interval_ms: float = 5, include_idle: bool = False) -> Optional[dict]:
+        """seconds 동안 interval_ms 간격으로 샘플링 (다른 프로파일이 실행 중이면 None)"""
+        if not MuseProfiler._lock.acquire(blocking=False):
+            return None
+        try:
+            seconds = min(max(seconds, 0.1), MuseProfiler._max_seconds)
+            interval = max(interval_ms, MuseProfiler._min_interval_ms) / 1000
+            stacks = Counter()
+            skip_ident = threading.get_ident()
+            samples = 0
+
+            start = time.perf_counter()
+            deadline = start + seconds
+            while time.perf_counter() < deadline:
+                thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+                MuseProfiler._sample(stacks, thread_names, skip_ident, include_idle)
+                samples += 1
+                time.sleep(interval)
+
+            return {
+                'pid': os.getpid(),
+                'seconds': round(time.perf_counter() - start, 3),
+                'interval_ms': interval * 1000,
+                'samples': samples,
+                'stacks': stacks
+            }
+        finally:
+            MuseProfiler._lock.release()
+
+    @staticmethod
+    def collapsed(result: dict) -> str:
+        return '\n'.join(f'{stack} {count}' for stack, count in result['stacks'].most_common()) + '\n'
+
+    @staticmethod
+    def top_functions(result: dict, limit: int = 30) -> list:
+        """self 샘플(스택 최상단) 기준 상위 함수"""
+        self_counts = Counter()
+        for stack, count in result['stacks'].items():
+            self_counts[stack.rsplit(';', 1)[-1]] += count
+        total = sum(self_counts.values()) or 1
+        return [
+            {'function': function, 'samples': count, 'ratio': round(count / total, 4)}
+            for function, count in self_counts.most_common(limit)
+        ]
@@ -65,6 +65,27 @@ class RedisClient:
             logging.error(f"Error getting playlist include_ids from Redis: {e}")
             return None
 
+    @staticmethod
+    def get_playlist_song_ids(playlist_id: str) -> Optional[List[int]]:
+        """
+        playlist 곡의 song id(MuseSongId, chunk 0) 조회 - song id 인덱스의 include 검색용 (batch cache_playlist가 저장)
+
+        Redis key: playlist_song:{playlist_id}
+        """
+        try:
+            client = RedisClient.get_client()
+            redis_key = f"playlist_song:{playlist_id}"
+            value = client.get(redis_key)
+            if value is None:
+                logging.info(f"Cache MISS: {redis_key}")
+                return None
+            song_ids = json.loads(value)
+            logging.info(f"Cache HIT: {redis_key} ({len(song_ids)} song ids)")
+            return song_ids
+        except Exception as e:
+            logging.error(f"Error getting playlist song ids from Redis: {e}")
+            return None
+
     @staticmethod
     def set_playlist_include_ids(key: str, playlist_id: str, include_ids: List[int], ttl: int = 3600):
         """
@@ -152,3 +173,29 @@ class RedisClient:
             client.set(redis_key, timestamp)
         except Exception as e:
             logging.error(f"Error setting last update time: {e}")
+
+    @staticmethod
+    def set_search_result(result_id: str, result: dict, ttl: int = 600) -> bool:
+        """
+        /search/text 페이지 조회용 순위 결과 저장 (다른 워커에서도 다음 페이지를 읽을 수 있도록 Redis에 보관)
+
+        Redis key: search_result:{result_id}
+        """
+        try:
+            client = RedisClient.get_client()
+            client.setex(f"search_result:{result_id}", ttl, json.dumps(result, ensure_ascii=False, default=str))
+            return True
+        except Exception as e:
+            logging.error(f"Error setting search result to Redis: {e}")
+            return False
+
+    @staticmethod
+    def get_search_result(result_id: str) -> Optional[dict]:
+        """저장된 순위 결과 조회 (만료 / 없으면 None)"""
+        try:
+            client = RedisClient.get_client()
+            value = client.get(f"search_result:{result_id}")
+            return json.loads(value) if value is not None else None
+        except Exception as e:
+            logging.error(f"Error getting search result from Redis: {e}")
+            return None
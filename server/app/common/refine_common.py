@@ -0,0 +1,87 @@
+import json
+import logging
+import os
+import numpy as np
+from typing import Dict, Optional, Tuple
+from config import INDEX_PATH
+from common.faiss_common import MuseFaiss
+
+class MuseRefine:
+    """
+    IVFPQ 후보를 원본 벡터의 float16 사본으로 exact L2 재정렬 (batch build_vector_store로 생성)
+
+    - {INDEX_PATH}/{인덱스 파일명}.f16: FAISS id 순서의 float16 row, {파일명}.f16.json: {"d", "rows"}
+    - mmap으로 로드되어 워커 간 메모리 공유, 후보 row만 읽음
+    - 사본이 없는 key는 기존 IVFPQ 거리 그대로 사용
+    """
+    _store_path = INDEX_PATH
+    # 최종 k의 몇 배를 IVFPQ 후보로 가져올지
+    _candidate_factor = 2
+
+    stores: Dict[str, np.ndarray] = {}
+
+    @staticmethod
+    def load(path: Optional[str] = None) -> Dict[str, int]:
+        path = path or MuseRefine._store_path
+        stores = {}
+        for key, file_name in MuseFaiss._index_files.items():
+            meta_path = f'{path}/{file_name}.f16.json'
+            if not os.path.exists(meta_path):
+                continue
+            try:
+                with open(meta_path, 'r') as f:
+                    meta = json.load(f)
+                d, rows = int(meta['d']), int(meta['rows'])
+                store_path = f'{path}/{file_name}.f16'
+                if os.path.getsize(store_path) < rows * d * 2:
+                    logging.error(f"Vector store {store_path} is smaller than meta (rows={rows}, d={d})")
+                    continue
+                stores[key] = np.memmap(store_path, dtype='float16', mode='r', shape=(rows, d))
+            except Exception as e:
+                logging.error(f"Failed to load {key} vector store: {e}")
+        MuseRefine.stores = stores
+
+        loaded = {key: len(store) for key, store in stores.items()}
+        if loaded:
+            logging.info(f"Vector stores loaded: {loaded}")
+        else:
+            logging.info(f"No vector stores ({path}), refine disabled")
+        return loaded
+
+    @staticmethod
+    def available(key: str) -> bool:
+        return key in MuseRefine.stores
+
+    @staticmethod
+    def candidate_k(k: int) -> int:
+        return k * MuseRefine._candidate_factor
+
+    @staticmethod
+    def rerank(key: str, query_vector: np.ndarray, D: Optional[np.ndarray], I: Optional[np.ndarray], k: int) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        후보(D, I)를 exact L2 거리로 다시 정렬해 상위 k개 반환
+        사본 생성 이후 추가된 id(row 수 이상)는 IVFPQ 거리를 그대로 사용
+        """
+        store = MuseRefine.stores.get(key)
+        if store is None or D is None or I is None:
+            return D, I
+        try:
+            I_flat = I.reshape(-1).astype('int64')
+            D_flat = D.reshape(-1).astype('float32')
+            valid = I_flat >= 0
+            I_flat, D_flat = I_flat[valid], D_flat[valid]
+
+            exact = I_flat < len(store)
+            # mmap 접근을 순차에 가깝게 하기 위해 id 순으로 읽은 뒤 원래 위치에 기록
+            order = np.argsort(I_flat[exact], kind='stable')
+            ids = I_flat[exact][order]
+            diff = store[ids].astype('float32') - query_vector.reshape(-1).astype('float32')
+            distances = np.empty(len(ids), dtype='float32')
+            distances[order] = np.einsum('ij,ij->i', diff, diff)
+            D_flat[exact] = distances
+
+            top = np.argsort(D_flat, kind='stable')[:k]
+            return D_flat[top].reshape(1, -1), I_flat[top].reshape(1, -1)
+        except Exception as e:
+            logging.error(f"Error in refine rerank for {key}: {e}")
+            return D, I
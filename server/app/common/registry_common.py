@@ -0,0 +1,81 @@
+import json
+import logging
+import os
+from copy import deepcopy
+from typing import Any, Dict, Optional
+from config import INDEX_PATH
+
+class MuseRegistry:
+    """
+    key별 인덱스 선언 (batch common/registry_common.py와 동일한 구성)
+
+    테이블 / 인덱스 파일 / 임베딩 모델 / k / 이름 일치 거리 / 검색 파라미터를 key 하나에 모아 두고
+    SearchService, SearchDAO, EmbeddingService, MuseFaiss의 key별 매핑을 여기서 만듦
+
+    - 기본값은 muse_index_registry.defaults.json(_defaults_path), {INDEX_PATH}/muse_index_registry.json이 있으면 key 단위로 덮어씀
+      (batch가 같은 파일을 index 디렉토리에서 관리하고 add_daily_faiss.sh가 서버로 복사)
+    - 파일 예시:
+        {
+            "database": "muse",
+            "keys": {
+                "album_name": {"factory": "IVF{nlist},Flat", "k": 1000},
+                "lyrics_3": null
+            }
+        }
+      값이 null인 key는 제외, 새 key는 _required 필드를 모두 지정해야 함
+    - 서버 import 시점에 한 번 읽으므로 변경은 재기동 후 반영
+    """
+    _registry_path = f'{INDEX_PATH}/muse_index_registry.json'
+    _required = ('model', 'type', 'dimension', 'table', 'vector_column', 'index_file', 'k')
+    # 기본 선언은 batch / 서버가 함께 읽는 저장소 루트의 muse_index_registry.defaults.json (두 쪽이 따로 바뀌지 않도록 한 파일로 관리)
+    _defaults_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'muse_index_registry.defaults.json')
+
+    _registry: Optional[Dict] = None
+
+    @staticmethod
+    def merge(registry: Dict, override: Dict) -> Dict:
+        """기본 registry에 파일 내용을 key 단위로 덮어씀 (필수 필드가 빠진 새 key는 제외)"""
+        merged = deepcopy(registry)
+        merged['database'] = override.get('database', merged['database'])
+        for key, entry in (override.get('keys') or {}).items():
+            if entry is None:
+                merged['keys'].pop(key, None)
+                continue
+            candidate = {**merged['keys'].get(key, {'id_columns': ['disccommseq', 'trackno'], 'lazy': False, 'search': {}}), **entry}
+            missing = [field for field in MuseRegistry._required if candidate.get(field) is None]
+            if missing:
+                logging.error(f"Index registry key {key} is missing {missing}, skipped")
+                continue
+            merged['keys'][key] = candidate
+        return merged
+
+    @staticmethod
+    def load(path: Optional[str] = None) -> Dict:
+        path = path or MuseRegistry._registry_path
+        # 기본 선언이 없으면 key 매핑을 만들 수 없으므로 예외를 그대로 올림
+        with open(MuseRegistry._defaults_path, 'r') as f:
+            registry = json.load(f)
+        try:
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    registry = MuseRegistry.merge(registry, json.load(f))
+                logging.info(f"Index registry loaded: {path} ({list(registry['keys'])})")
+        except Exception as e:
+            logging.error(f"Failed to load index registry {path}: {e}")
+        MuseRegistry._registry = registry
+        return registry
+
+    @staticmethod
+    def entries() -> Dict[str, Dict]:
+        if MuseRegistry._registry is None:
+            MuseRegistry.load()
+        return MuseRegistry._registry['keys']
+
+    @staticmethod
+    def get(key: str) -> Optional[Dict]:
+        return MuseRegistry.entries().get(key)
+
+    @staticmethod
+    def mapping(field: str) -> Dict[str, Any]:
+        """key -> field 값 (값이 없는 key는 제외)"""
+        return {key: entry[field] for key, entry in MuseRegistry.entries().items() if entry.get(field) is not None}
@@ -0,0 +1,128 @@
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+from config import INDEX_PATH
+from common.attribute_common import MuseAttributes
+from common.faiss_common import MuseFaiss
+from common.lyrics_index_common import MuseLyricsIndex
+from common.name_index_common import MuseNameIndex
+from common.refine_common import MuseRefine
+from common.registry_common import MuseRegistry
+from common.snapshot_common import MuseSnapshot
+from common.tombstone_common import MuseTombstones
+
+class MuseReloader:
+    """
+    batch add_daily_faiss.sh / 서버 build_*.py가 index 디렉토리에 쓴 파일을 재기동 없이 반영 (워커마다 감시 스레드 하나)
+
+    - delta segment: {파일명}.segments.json → MuseFaiss.refresh_segments (새 delta 파일만 로드)
+    - tombstone: {파일명}.tombstone.json → MuseTombstones.load
+    - float16 사본: {파일명}.f16.json → MuseRefine.load
+    - 임베딩 스냅샷: snapshot/{model}_{type}/manifest.json → MuseSnapshot.load
+    - 속성 배열: attrs/genres.json → MuseAttributes.load
+    - 이름 / 가사 역색인: names/manifest.json → MuseNameIndex.load, lyrics/manifest.json → MuseLyricsIndex.load
+    - 배치 / build 스크립트는 데이터 파일 → 메타 / manifest 순서로 교체하므로 마지막에 바뀌는 파일의 mtime만 확인
+    - registry, compaction으로 바뀐 base는 재기동 시 반영
+    """
+    # mtime 확인 주기 (초)
+    _interval = 60
+
+    # 파일 경로 → 마지막으로 반영한 mtime (없는 파일은 None)
+    _mtimes: Dict[str, Optional[float]] = {}
+    _lock = threading.Lock()
+    _stop = threading.Event()
+    _watcher: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _segment_paths() -> Dict[str, str]:
+        return {key: f'{INDEX_PATH}/{file_name}.segments.json' for key, file_name in MuseFaiss._index_files.items()}
+
+    @staticmethod
+    def _watch_paths() -> Dict[str, List[str]]:
+        file_names = list(MuseFaiss._index_files.values())
+        return {
+            'tombstones': [f'{INDEX_PATH}/{file_name}.tombstone.json' for file_name in file_names],
+            'refine': [f'{INDEX_PATH}/{file_name}.f16.json' for file_name in file_names],
+            'snapshot': [f"{MuseSnapshot._snapshot_path}/{entry['model']}_{entry['type']}/manifest.json" for entry in MuseRegistry.entries().values()],
+            'attributes': [f'{MuseAttributes._attr_path}/genres.json'],
+            'names': [f'{MuseNameIndex._name_path}/manifest.json'],
+            'lyrics': [f'{MuseLyricsIndex._lyrics_path}/manifest.json']
+        }
+
+    @staticmethod
+    def _mtime(path: str) -> Optional[float]:
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _changed(paths: List[str]) -> bool:
+        """paths 중 마지막 확인 이후 mtime이 바뀐 파일이 있는지 (확인한 mtime은 기록)"""
+        changed = False
+        for path in paths:
+            mtime = MuseReloader._mtime(path)
+            if MuseReloader._mtimes.get(path) != mtime:
+                MuseReloader._mtimes[path] = mtime
+                changed = True
+        return changed
+
+    @staticmethod
+    def reload(force: bool = False) -> Dict[str, Dict]:
+        """
+        바뀐 파일만 다시 로드 (force면 mtime과 관계없이 전체)
+
+        Returns:
+            {'segments': {key: delta별 벡터 수}, 그 외 항목: load 결과} 중 다시 로드한 항목
+        """
+        reloaded = {}
+        with MuseReloader._lock:
+            segments = {}
+            for key, path in MuseReloader._segment_paths().items():
+                if MuseReloader._changed([path]) or force:
+                    ntotals = MuseFaiss.refresh_segments(key)
+                    if ntotals is not None:
+                        segments[key] = ntotals
+            if segments:
+                reloaded['segments'] = segments
+
+            loaders = {
+                'tombstones': MuseTombstones.load,
+                'refine': MuseRefine.load,
+                'snapshot': MuseSnapshot.load,
+                'attributes': MuseAttributes.load,
+                'names': MuseNameIndex.load,
+                'lyrics': MuseLyricsIndex.load
+            }
+            for name, paths in MuseReloader._watch_paths().items():
+                if MuseReloader._changed(paths) or force:
+                    reloaded[name] = loaders[name]()
+        if reloaded:
+            logging.info(f"Reloaded index files: {reloaded}")
+        return reloaded
+
+    @staticmethod
+    def _watch():
+        while not MuseReloader._stop.wait(MuseReloader._interval):
+            try:
+                MuseReloader.reload()
+            except Exception as e:
+                logging.error(f"Failed to reload index files: {e}")
+
+    @staticmethod
+    def start() -> threading.Thread:
+        """현재 파일 mtime을 기준으로 기록한 뒤 감시 스레드 시작 (기동 시 로드한 파일은 다시 읽지 않음)"""
+        if MuseReloader._watcher is None or not MuseReloader._watcher.is_alive():
+            with MuseReloader._lock:
+                MuseReloader._changed(list(MuseReloader._segment_paths().values()))
+                for paths in MuseReloader._watch_paths().values():
+                    MuseReloader._changed(paths)
+            MuseReloader._stop.clear()
+            MuseReloader._watcher = threading.Thread(target=MuseReloader._watch, name='index-reloader', daemon=True)
+            MuseReloader._watcher.start()
+        return MuseReloader._watcher
+
+    @staticmethod
+    def stop():
+        MuseReloader._stop.set()
@@ -1,5 +1,20 @@
-from fastapi.responses import JSONResponse
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
 from fastapi.encoders import jsonable_encoder
+from datetime import date, datetime
+from decimal import Decimal
+import json
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 def success_response(data=None, message="Success"):
     return JSONResponse(content=jsonable_encoder({
@@ -11,3 +26,38 @@ def error_response(message="Error", status_code=400):
         "status": "error",
         "message": message
     }, status_code=status_code)
+
+def _default(value):
+    """orjson / msgpack / json이 직접 처리하지 못하는 값 (set, numpy, Decimal, 날짜)"""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    raise TypeError(f'{type(value).__name__} is not serializable')
+
+class MuseJSONResponse(JSONResponse):
+    """jsonable_encoder를 거치지 않고 orjson(없으면 json)으로 바로 직렬화"""
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(content, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+class MsgpackResponse(Response):
+    media_type = 'application/x-msgpack'
+
+    def render(self, content) -> bytes:
+        return msgpack.packb(content, default=_default, use_bin_type=True)
+
+def fast_response(request: Request, content, status_code: int = 200) -> Response:
+    """Accept: application/x-msgpack 이고 msgpack이 설치되어 있으면 msgpack, 아니면 MuseJSONResponse"""
+    if msgpack is not None and MsgpackResponse.media_type in request.headers.get('accept', ''):
+        return MsgpackResponse(content=content, status_code=status_code)
+    return MuseJSONResponse(content=content, status_code=status_code)
@@ -0,0 +1,86 @@
+from typing import Dict, Iterable, List, Optional, TypedDict
+
+class CompactSong(TypedDict, total=False):
+    """compact=true 응답의 곡 한 건 (Oracle 원본 row 대신 화면에 필요한 값만 평탄화)"""
+    disccommseq: int
+    trackno: str
+    artist: str
+    player: str
+    band_name: str
+    song_name: str
+    disc_name: str
+    play_time: str
+    hit_year: str
+    mastering_year: str
+    genre: str
+    jpg_file_name: str
+    mp3_path: str
+    playable: bool
+    dis: float
+    count: int
+    index_names: List[str]
+    main_mood: List[str]
+    bpm: Optional[float]
+    energy_level: float
+
+
+def _bpm(song: dict) -> Optional[float]:
+    # get_song_bpm_value 결과는 {'bpm': 값}, 없으면 0
+    bpm = song.get('bpm')
+    if isinstance(bpm, dict):
+        bpm = bpm.get('bpm')
+    return float(bpm) if bpm else None
+
+
+class MuseResult:
+    """
+    search_text / get_page 결과 곡 dict → CompactSong 변환 (필드 선택 가능)
+
+    - index_name_set(set)은 정렬된 list, bpm은 숫자, MP3_PATH_FLAG는 bool로 변환
+    - 중복 값(index_name, mp3_path_flag)과 내부 값은 제외
+    """
+    # compact 필드 → 변환 함수 (CompactSong 순서)
+    _fields = {
+        'disccommseq': lambda song: int(song['disc_comm_seq']),
+        'trackno': lambda song: str(song['track_no']),
+        'artist': lambda song: song.get('artist'),
+        'player': lambda song: song.get('player'),
+        'band_name': lambda song: song.get('band_name'),
+        'song_name': lambda song: song.get('song_name'),
+        'disc_name': lambda song: song.get('disc_name'),
+        'play_time': lambda song: song.get('play_time'),
+        'hit_year': lambda song: song.get('hit_year'),
+        'mastering_year': lambda song: song.get('mastering_year'),
+        'genre': lambda song: song.get('disc_genre_txt'),
+        'jpg_file_name': lambda song: song.get('jpg_file_name'),
+        'mp3_path': lambda song: song.get('mp3_path'),
+        'playable': lambda song: bool(song.get('mp3_path_flag')),
+        'dis': lambda song: round(float(song.get('dis', 0.0)), 6),
+        'count': lambda song: int(song.get('count', 1)),
+        'index_names': lambda song: sorted(song.get('index_name_set') or [song.get('index_name')]),
+        'main_mood': lambda song: song.get('main_mood', []),
+        'bpm': _bpm,
+        'energy_level': lambda song: round(float(song.get('energy_level', 50.0)), 2)
+    }
+    # fields를 지정해도 항상 포함 (곡 식별자)
+    _required = ('disccommseq', 'trackno')
+
+    @staticmethod
+    def projection(fields: Optional[Iterable[str]]) -> List[str]:
+        """요청 fields 중 유효한 필드 (없으면 전체), 알 수 없는 필드는 무시"""
+        if not fields:
+            return list(MuseResult._fields)
+        selected = set(fields) | set(MuseResult._required)
+        return [field for field in MuseResult._fields if field in selected]
+
+    @staticmethod
+    def compact(songs: List[dict], fields: Optional[Iterable[str]] = None) -> List[CompactSong]:
+        converters = [(field, MuseResult._fields[field]) for field in MuseResult.projection(fields)]
+        return [{field: convert(song) for field, convert in converters} for song in songs]
+
+    @staticmethod
+    def compact_response(result: Dict, fields: Optional[Iterable[str]] = None) -> Dict:
+        """search_text 응답의 results만 compact로 교체 (나머지 키는 그대로)"""
+        if isinstance(result, dict) and isinstance(result.get('results'), list):
+            result['results'] = MuseResult.compact(result['results'], fields)
+        return result
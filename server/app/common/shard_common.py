@@ -0,0 +1,152 @@
+import json
+import logging
+import os
+import requests
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+from config import INDEX_PATH
+from common.metrics_common import MuseMetrics
+from common.trace_common import MuseTrace
+
+class MuseShard:
+    """
+    search-node 모드용 scatter-gather 클라이언트
+
+    shard 설정 파일(muse_shards.json)이 있으면 해당 key의 검색을 각 node로 분산하고
+    거리 기준으로 top-k를 병합함. 파일이 없으면 기존처럼 로컬 MuseFaiss만 사용.
+
+    설정 예시:
+        {
+            "timeout": 2.0,
+            "nodes": [
+                {"url": "http://127.0.0.1:13381",
+                 "shards": {"vibe": {"file": "muse_vibe_0", "id_offset": 0},
+                            "artist": {"file": "muse_artist"}}},
+                {"url": "http://127.0.0.1:13382",
+                 "shards": {"vibe": {"file": "muse_vibe_1", "id_offset": 20000000}}}
+            ]
+        }
+
+    - key 단위 분할: key를 하나의 node에만 둠
+    - id 범위 분할: 같은 key를 여러 node에 두고, 각 shard의 FAISS id 시작값을 id_offset으로 지정
+    """
+    _config_path = f'{INDEX_PATH}/muse_shards.json'
+    _default_timeout = 2.0
+    _executor = ThreadPoolExecutor(max_workers=16)
+    MuseMetrics.register_executor('shard', _executor)
+
+    _config: Optional[Dict] = None
+    _routes: Dict[str, List[Dict]] = {}
+
+    @staticmethod
+    def load_config(path: Optional[str] = None) -> Dict:
+        """shard 설정 로드 (파일이 없으면 빈 설정 → 로컬 검색)"""
+        path = path or MuseShard._config_path
+        config = {'timeout': MuseShard._default_timeout, 'nodes': []}
+        try:
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    config.update(json.load(f))
+                logging.info(f"Shard config loaded: {path} ({len(config['nodes'])} nodes)")
+        except Exception as e:
+            logging.error(f"Failed to load shard config {path}: {e}")
+
+        routes = {}
+        for node_no, node in enumerate(config['nodes']):
+            for key, shard in node.get('shards', {}).items():
+                routes.setdefault(key, []).append({
+                    'node': node_no,
+                    'url': node['url'].rstrip('/'),
+                    'id_offset': shard.get('id_offset', 0),
+                    'timeout': shard.get('timeout', node.get('timeout', config['timeout']))
+                })
+
+        MuseShard._config = config
+        MuseShard._routes = routes
+        return config
+
+    @staticmethod
+    def get_config() -> Dict:
+        if MuseShard._config is None:
+            MuseShard.load_config()
+        return MuseShard._config
+
+    @staticmethod
+    def sharded_keys() -> List[str]:
+        MuseShard.get_config()
+        return list(MuseShard._routes.keys())
+
+    @staticmethod
+    def is_sharded(key: str) -> bool:
+        MuseShard.get_config()
+        return key in MuseShard._routes
+
+    @staticmethod
+    def _search_node(route: Dict, key: str, query_vector: np.ndarray, k: int, playlist_id: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+        body = {
+            'key': key,
+            'vector': query_vector.reshape(-1).astype('float32').tolist(),
+            'k': k,
+            'playlist_id': playlist_id
+        }
+        headers = {'X-Trace-Id': MuseTrace.current_id()} if MuseTrace.current_id() else None
+        with MuseTrace.span('shard_node', node=route['node']):
+            res = requests.post(f"{route['url']}/node/search", json=body, headers=headers, timeout=route['timeout'])
+        res.raise_for_status()
+        data = res.json()
+        return np.array(data['D'], dtype='float32'), np.array(data['I'], dtype='int64')
+
+    @staticmethod
+    def merge_topk(results: List[Tuple[np.ndarray, np.ndarray]], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """shard별 (D, I)를 거리 오름차순(L2)으로 병합하여 top-k 반환"""
+        D = np.concatenate([d for d, _ in results]) if results else np.empty(0, dtype='float32')
+        I = np.concatenate([i for _, i in results]) if results else np.empty(0, dtype='int64')
+
+        valid = I >= 0
+        D, I = D[valid], I[valid]
+
+        if len(D) > k:
+            top = np.argpartition(D, k - 1)[:k]
+            D, I = D[top], I[top]
+        order = np.argsort(D, kind='stable')
+        return D[order].reshape(1, -1), I[order].reshape(1, -1)
+
+    @staticmethod
+    def search(key: str, query_vector: np.ndarray, k: int, playlist_id: Optional[str] = None) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        key를 담당하는 모든 shard에 동시에 검색 요청 후 top-k 병합
+
+        shard별 timeout을 넘기거나 실패한 shard는 제외하고 나머지 결과로 응답함
+        반환 I는 전역 FAISS id (node가 id_offset을 더해서 반환)
+        playlist_id가 있으면 각 node가 Redis에서 include_ids를 직접 조회하여 자기 shard 범위만 검색
+        """
+        routes = MuseShard._routes.get(key, [])
+        if not routes:
+            logging.error(f"No shard route for '{key}'")
+            return None, None
+
+        futures = {
+            MuseShard._executor.submit(MuseTrace.bind(MuseShard._search_node), route, key, query_vector, k, playlist_id): route
+            for route in routes
+        }
+        # 개별 요청 timeout 외에 전체 대기 시간도 가장 긴 shard timeout으로 제한
+        done, not_done = wait(futures, timeout=max(route['timeout'] for route in routes))
+
+        results = []
+        for future in done:
+            route = futures[future]
+            try:
+                D, I = future.result()
+                results.append((D.reshape(-1), I.reshape(-1)))
+            except Exception as e:
+                logging.warning(f"Shard search failed [{key}] node {route['node']} ({route['url']}): {e}")
+        for future in not_done:
+            route = futures[future]
+            logging.warning(f"Shard search timeout [{key}] node {route['node']} ({route['url']})")
+
+        if not results:
+            logging.error(f"All shards failed for '{key}'")
+            return None, None
+
+        return MuseShard.merge_topk(results, k)
@@ -0,0 +1,82 @@
+import json
+import logging
+import os
+import numpy as np
+from typing import Dict, List, Optional
+from config import INDEX_PATH
+from common.registry_common import MuseRegistry
+from common.song_id_common import MuseSongId
+
+class MuseSnapshot:
+    """
+    batch export_snapshot으로 만든 임베딩 로컬 스냅샷 (읽기 전용, 배치 common/snapshot_common.py 참고)
+
+    - {INDEX_PATH}/snapshot/{model}_{type}/: manifest.json, shard_*.npy(float32 벡터), song_sorted.npy / song_order.npy
+    - mmap으로 로드되어 워커 간 메모리 공유, 유사곡 검색의 기준 곡 벡터를 MySQL 대신 조회
+    - 스냅샷이 없거나 스냅샷 이후 추가된 곡은 None → 기존 SearchDAO 조회
+    """
+    _snapshot_path = f'{INDEX_PATH}/snapshot'
+
+    snapshots: Dict[str, Dict] = {}
+
+    @staticmethod
+    def load(path: Optional[str] = None) -> Dict[str, int]:
+        path = path or MuseSnapshot._snapshot_path
+        snapshots = {}
+        for key, entry in MuseRegistry.entries().items():
+            snapshot_path = f"{path}/{entry['model']}_{entry['type']}"
+            manifest_path = f'{snapshot_path}/manifest.json'
+            if not os.path.exists(manifest_path):
+                continue
+            try:
+                with open(manifest_path, 'r') as f:
+                    manifest = json.load(f)
+                if manifest['d'] != entry['dimension']:
+                    logging.error(f"Snapshot {snapshot_path} dimension {manifest['d']} != registry {entry['dimension']}")
+                    continue
+                if manifest.get('song_rows') != manifest['rows']:
+                    logging.error(f"Snapshot {snapshot_path} song order is incomplete ({manifest.get('song_rows')} / {manifest['rows']})")
+                    continue
+                shards = [np.load(f"{snapshot_path}/{shard['name']}.npy", mmap_mode='r') for shard in manifest['shards']]
+                snapshots[key] = {
+                    'shards': shards,
+                    'offsets': np.cumsum([0] + [len(shard) for shard in shards]),
+                    'song_sorted': np.load(f'{snapshot_path}/song_sorted.npy', mmap_mode='r'),
+                    'song_order': np.load(f'{snapshot_path}/song_order.npy', mmap_mode='r'),
+                    'last_idx': manifest['last_idx']
+                }
+            except Exception as e:
+                logging.error(f"Failed to load {key} snapshot: {e}")
+        MuseSnapshot.snapshots = snapshots
+
+        loaded = {key: int(snapshot['offsets'][-1]) for key, snapshot in snapshots.items()}
+        if loaded:
+            logging.info(f"Embedding snapshots loaded: {loaded}")
+        else:
+            logging.info(f"No embedding snapshots ({path}), similar song vectors from MySQL")
+        return loaded
+
+    @staticmethod
+    def available(key: str) -> bool:
+        return key in MuseSnapshot.snapshots
+
+    @staticmethod
+    def vectors(key: str, disccommseq, trackno) -> Optional[List[np.ndarray]]:
+        """곡의 벡터 목록 (가사 window 등 여러 row면 DB idx 순서), 스냅샷에 없으면 None"""
+        snapshot = MuseSnapshot.snapshots.get(key)
+        song_id = MuseSongId.pack(disccommseq, trackno)
+        if snapshot is None or song_id is None:
+            return None
+        try:
+            lo, hi = np.searchsorted(snapshot['song_sorted'], [song_id, song_id + 1])
+            if lo == hi:
+                return None
+            offsets = snapshot['offsets']
+            vectors = []
+            for row in np.sort(snapshot['song_order'][lo:hi]):
+                shard_no = int(np.searchsorted(offsets, row, side='right')) - 1
+                vectors.append(np.array(snapshot['shards'][shard_no][row - offsets[shard_no]], dtype='float32'))
+            return vectors
+        except Exception as e:
+            logging.error(f"MuseSnapshot.vectors({key}, {disccommseq}, {trackno}): {e}")
+            return None
@@ -0,0 +1,78 @@
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class MuseSongId:
+    """
+    곡 식별자를 그대로 담은 64bit FAISS id (add_with_ids용, 배치 common/song_id_common.py와 동일한 구성)
+
+    [0][disccommseq 36bit][trackno 12bit][chunk 15bit]
+    - trackno: (숫자 값 << 2 | 자릿수-1) + 1 ('01'과 '1'을 구분해 Oracle TRACK_NO 문자열 그대로 복원, 0은 trackno 없음)
+    - chunk: 같은 곡의 가사 window 번호 (곡 단위 테이블은 0)
+    - album_name 테이블은 trackno 없이 disccommseq만 (trackno 필드 0)
+    """
+    _chunk_bits = 15
+    _track_bits = 12
+    _disc_bits = 36
+    _track_value_max = 1000
+    _track_width_max = 4
+
+    @staticmethod
+    def pack(disccommseq, trackno=None, chunk: int = 0) -> Optional[int]:
+        """표현할 수 없는 값(숫자가 아닌 trackno, 범위 초과)이면 None"""
+        try:
+            disc = int(disccommseq)
+        except (TypeError, ValueError):
+            return None
+        if not 0 <= disc < (1 << MuseSongId._disc_bits) or not 0 <= chunk < (1 << MuseSongId._chunk_bits):
+            return None
+        track = 0
+        if trackno is not None:
+            text = str(trackno).strip()
+            if not text.isdigit() or len(text) > MuseSongId._track_width_max or int(text) > MuseSongId._track_value_max:
+                return None
+            track = ((int(text) << 2) | (len(text) - 1)) + 1
+        return (((disc << MuseSongId._track_bits) | track) << MuseSongId._chunk_bits) | chunk
+
+    @staticmethod
+    def unpack(song_id: int) -> Tuple[int, Optional[str], int]:
+        """id → (disccommseq, trackno 문자열 또는 None, chunk)"""
+        chunk = song_id & ((1 << MuseSongId._chunk_bits) - 1)
+        track = (song_id >> MuseSongId._chunk_bits) & ((1 << MuseSongId._track_bits) - 1)
+        disc = song_id >> (MuseSongId._chunk_bits + MuseSongId._track_bits)
+        trackno = str((track - 1) >> 2).zfill(((track - 1) & 3) + 1) if track else None
+        return disc, trackno, chunk
+
+    @staticmethod
+    def song_info(ids: Iterable[int]) -> Dict[int, List[Dict]]:
+        """FAISS 결과 id → SearchDAO.get_song_batch_info와 같은 형식 (DB 조회 없이 디코딩)"""
+        batch_info = {}
+        for song_id in ids:
+            if song_id < 0:
+                continue
+            disccommseq, trackno, _ = MuseSongId.unpack(song_id)
+            batch_info[song_id] = [{'disccommseq': disccommseq, 'trackno': trackno}]
+        return batch_info
+
+    @staticmethod
+    def album_info(ids: Iterable[int]) -> Dict[int, Dict]:
+        """album_name 결과 id → SearchDAO.get_album_batch_info와 같은 형식 ({disccommseq: {'idx': id}})"""
+        batch_info = {}
+        for song_id in ids:
+            if song_id < 0:
+                continue
+            disccommseq, _, _ = MuseSongId.unpack(song_id)
+            batch_info[disccommseq] = {'idx': song_id}
+        return batch_info
+
+    @staticmethod
+    def expand(song_ids: Iterable[int], album: bool = False, max_chunk: int = 0) -> np.ndarray:
+        """
+        playlist song id(chunk 0) → 검색 대상 FAISS id
+        album_name은 trackno를 지운 앨범 id, 가사 window 인덱스는 chunk 0 ~ max_chunk까지 확장
+        """
+        ids = np.asarray(list(song_ids), dtype='int64')
+        if album:
+            ids = np.unique(ids >> (MuseSongId._chunk_bits + MuseSongId._track_bits) << (MuseSongId._chunk_bits + MuseSongId._track_bits))
+        if max_chunk > 0:
+            ids = (ids[:, None] + np.arange(max_chunk + 1, dtype='int64')[None, :]).reshape(-1)
+        return ids
@@ -0,0 +1,102 @@
+import json
+import logging
+import os
+import faiss
+import numpy as np
+from typing import Dict, Optional
+from config import INDEX_PATH
+from common.registry_common import MuseRegistry
+
+class MuseTombstones:
+    """
+    key별 검색 제외 FAISS id (batch build_tombstones로 생성, 배치 common/tombstone_common.py 참고)
+
+        {INDEX_PATH}/{파일명}.tombstone.npy   idx id 인덱스: FAISS id 비트맵 (packbits little), song id 인덱스: 제외 곡 song id(chunk 0)
+        {INDEX_PATH}/{파일명}.tombstone.json  {"id_format", "ntotal", "max_chunk", "count", ...}
+
+    - 금지(tb_playlist_song_pool_m.is_banned) / 카탈로그에서 삭제된 곡이 k 자리와 메타데이터 조회를 차지하지 않도록
+      MuseFaiss 검색에 IDSelectorNot(IDSelectorBatch)으로 붙여 검색 단계에서 제외
+    - search-node shard 결과(id_offset이 적용된 전체 id)는 post_filter로 제외
+    - 금지는 해제될 수 있으므로 검색 시 제외만 함, 인덱스에서 실제로 지우는 것은 삭제된 row뿐 (batch compact_faiss --tombstone의 remove_ids)
+    """
+    _index_files = MuseRegistry.mapping('index_file')
+
+    # key → {'ids': 정렬된 제외 FAISS id int64, 'selector': IDSelectorNot}
+    tombstones: Dict[str, Dict] = {}
+
+    @staticmethod
+    def _read(file_name: str) -> Optional[np.ndarray]:
+        meta_path = f'{INDEX_PATH}/{file_name}.tombstone.json'
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        array = np.load(f'{INDEX_PATH}/{file_name}.tombstone.npy')
+        if meta['id_format'] == 'song':
+            # 가사 window 인덱스는 같은 곡의 chunk 0 ~ max_chunk id를 모두 제외
+            max_chunk = int(meta.get('max_chunk', 0))
+            return np.sort((array[:, None] + np.arange(max_chunk + 1, dtype='int64')[None, :]).reshape(-1))
+        return np.flatnonzero(np.unpackbits(array, count=meta['ntotal'], bitorder='little')).astype('int64')
+
+    @staticmethod
+    def load() -> Dict[str, int]:
+        tombstones = {}
+        for key, file_name in MuseTombstones._index_files.items():
+            try:
+                ids = MuseTombstones._read(file_name)
+            except Exception as e:
+                logging.error(f"Failed to load {key} tombstone: {e}")
+                continue
+            if ids is None or len(ids) == 0:
+                continue
+            # selector가 ids 배열을 참조하므로 함께 유지, Not 안쪽 Batch도 참조를 들고 있어야 함
+            batch = faiss.IDSelectorBatch(len(ids), faiss.swig_ptr(ids))
+            tombstones[key] = {'ids': ids, 'batch': batch, 'selector': faiss.IDSelectorNot(batch)}
+        MuseTombstones.tombstones = tombstones
+
+        loaded = {key: len(tombstone['ids']) for key, tombstone in tombstones.items()}
+        if loaded:
+            logging.info(f"Tombstones loaded: {loaded}")
+        else:
+            logging.info(f"No tombstones ({INDEX_PATH}), banned / removed songs are not excluded")
+        return loaded
+
+    @staticmethod
+    def selector(key: str, id_selector=None):
+        """
+        검색용 IDSelector (tombstone이 없으면 id_selector 그대로)
+        id_selector가 있으면 IDSelectorAnd로 묶음 - 반환 객체의 referenced_objects로 안쪽 selector 수명 유지
+        """
+        tombstone = MuseTombstones.tombstones.get(key)
+        if tombstone is None:
+            return id_selector
+        if id_selector is None:
+            return tombstone['selector']
+        combined = faiss.IDSelectorAnd(id_selector, tombstone['selector'])
+        combined.referenced_objects = [id_selector, tombstone['selector']]
+        return combined
+
+    @staticmethod
+    def keep_mask(key: str, ids: np.ndarray) -> np.ndarray:
+        """ids 중 tombstone이 아닌 것 (음수 id는 그대로 True)"""
+        tombstone = MuseTombstones.tombstones.get(key)
+        ids = np.asarray(ids, dtype='int64')
+        if tombstone is None:
+            return np.ones(ids.shape, dtype=bool)
+        return ~np.isin(ids, tombstone['ids'])
+
+    @staticmethod
+    def post_filter(key: str, D: np.ndarray, I: np.ndarray):
+        """검색 결과에서 tombstone id를 빼고 뒤를 -1 / inf로 채움 (k 유지)"""
+        if key not in MuseTombstones.tombstones or D is None or I is None:
+            return D, I
+        keep = MuseTombstones.keep_mask(key, I.reshape(-1))
+        if keep.all():
+            return D, I
+        k = I.shape[1]
+        D_out = np.full(k, np.inf, dtype=D.dtype)
+        I_out = np.full(k, -1, dtype='int64')
+        D_kept, I_kept = D.reshape(-1)[keep], I.reshape(-1)[keep]
+        D_out[:len(D_kept)] = D_kept
+        I_out[:len(I_kept)] = I_kept
+        return D_out.reshape(1, -1), I_out.reshape(1, -1)
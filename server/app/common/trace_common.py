@@ -0,0 +1,169 @@
+import contextvars
+import itertools
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Optional
+
+class _Trace:
+    def __init__(self, trace_id: str, debug: bool):
+        self.trace_id = trace_id
+        self.debug = debug
+        self.start = time.perf_counter()
+        self.attrs = {}
+        self.spans = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def add(self, span: dict):
+        with self._lock:
+            self.spans.append(span)
+
+
+class MuseTrace:
+    """
+    요청 단위 trace id / 구간별 timing tree
+
+    - contextvars로 전파하므로 executor에서 실행할 함수는 MuseTrace.bind()로 감싸서 제출
+    - X-Trace-Id 요청 헤더가 있으면 그대로 사용 (search-node 호출 시에도 전달)
+    - X-Muse-Debug: 1 헤더가 있으면 응답 JSON의 'trace' 필드로 breakdown 반환
+    - _slow_threshold 초를 넘긴 요청은 breakdown 전체를 한 줄 JSON 로그로 남김
+    """
+    _slow_threshold = 3.0
+    _max_spans = 2000
+
+    _trace: contextvars.ContextVar = contextvars.ContextVar('muse_trace', default=None)
+    _span: contextvars.ContextVar = contextvars.ContextVar('muse_span', default=0)
+
+    @staticmethod
+    def start(trace_id: Optional[str] = None, debug: bool = False):
+        trace = _Trace(trace_id or uuid.uuid4().hex[:16], debug)
+        return MuseTrace._trace.set(trace)
+
+    @staticmethod
+    def finish(token) -> Optional[dict]:
+        report = MuseTrace.report()
+        MuseTrace._trace.reset(token)
+        return report
+
+    @staticmethod
+    def current_id() -> Optional[str]:
+        trace = MuseTrace._trace.get()
+        return trace.trace_id if trace else None
+
+    @staticmethod
+    def annotate(**attrs):
+        trace = MuseTrace._trace.get()
+        if trace:
+            trace.attrs.update(attrs)
+
+    @staticmethod
+    def _add(trace, span_id, parent, name, start, end, labels):
+        if len(trace.spans) >= MuseTrace._max_spans:
+            return
+        trace.add({
+            'id': span_id,
+            'parent': parent,
+            'name': name,
+            'labels': labels,
+            'start_ms': round((start - trace.start) * 1000, 2),
+            'duration_ms': round((end - start) * 1000, 2),
+            'thread': threading.current_thread().name
+        })
+
+    @staticmethod
+    @contextmanager
+    def span(name: str, **labels):
+        trace = MuseTrace._trace.get()
+        if trace is None:
+            yield
+            return
+        span_id = trace.next_id()
+        parent = MuseTrace._span.get()
+        token = MuseTrace._span.set(span_id)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            MuseTrace._span.reset(token)
+            MuseTrace._add(trace, span_id, parent, name, start, time.perf_counter(), labels)
+
+    @staticmethod
+    def record(name: str, seconds: float, **labels):
+        """이미 측정이 끝난 구간을 현재 span의 자식으로 기록"""
+        trace = MuseTrace._trace.get()
+        if trace is None:
+            return
+        end = time.perf_counter()
+        MuseTrace._add(trace, trace.next_id(), MuseTrace._span.get(), name, end - seconds, end, labels)
+
+    @staticmethod
+    def bind(func, span: Optional[str] = None, **labels):
+        """
+        현재 context(trace, 부모 span)를 캡처하여 다른 스레드에서 실행할 수 있도록 감쌈
+        span을 지정하면 executor 대기 시간(queue_wait)과 함수 실행 구간을 함께 기록
+        """
+        context = contextvars.copy_context()
+        if span is None:
+            return lambda *args, **kwargs: context.run(func, *args, **kwargs)
+
+        submitted = time.perf_counter()
+
+        def _run(*args, **kwargs):
+            with MuseTrace.span(span, **labels):
+                MuseTrace.record('queue_wait', time.perf_counter() - submitted)
+                return func(*args, **kwargs)
+        return lambda *args, **kwargs: context.run(_run, *args, **kwargs)
+
+    @staticmethod
+    def _tree(spans):
+        children = {}
+        for span in sorted(spans, key=lambda s: s['start_ms']):
+            children.setdefault(span['parent'], []).append(span)
+
+        def _build(parent):
+            nodes = []
+            for span in children.get(parent, []):
+                node = {k: v for k, v in span.items() if k not in ('id', 'parent')}
+                sub = _build(span['id'])
+                if sub:
+                    node['children'] = sub
+                nodes.append(node)
+            return nodes
+        return _build(0)
+
+    @staticmethod
+    def report() -> Optional[dict]:
+        trace = MuseTrace._trace.get()
+        if trace is None:
+            return None
+        with trace._lock:
+            spans = list(trace.spans)
+
+        stages = {}
+        for span in spans:
+            stage = stages.setdefault(span['name'], {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            stage['count'] += 1
+            stage['total_ms'] = round(stage['total_ms'] + span['duration_ms'], 2)
+            stage['max_ms'] = max(stage['max_ms'], span['duration_ms'])
+
+        return {
+            'trace_id': trace.trace_id,
+            'total_ms': round((time.perf_counter() - trace.start) * 1000, 2),
+            'attrs': trace.attrs,
+            'stages': stages,
+            'spans': MuseTrace._tree(spans)
+        }
+
+    @staticmethod
+    def attach(result):
+        """X-Muse-Debug 요청이면 응답 dict에 timing breakdown 추가"""
+        trace = MuseTrace._trace.get()
+        if trace and trace.debug and isinstance(result, dict):
+            result['trace'] = MuseTrace.report()
+        return result
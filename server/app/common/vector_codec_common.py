@@ -0,0 +1,57 @@
+import io
+import numpy as np
+
+class MuseVectorCodec:
+    """
+    MySQL 임베딩 blob 인코딩 / 디코딩 (batch common/vector_codec_common.py와 동일한 구성)
+
+    - raw: header 없는 little-endian float32(d * 4 byte) 또는 float16(d * 2 byte), np.frombuffer로 복사 없이 읽음
+    - npy: 기존 np.save 직렬화 (b'\\x93NUMPY' magic), header만 파싱하고 데이터는 np.frombuffer로 읽음 (pickle 사용 안 함)
+    - 두 형식은 magic으로 구분, raw의 float32 / float16은 길이와 차원(d)으로 구분 (d를 모르면 float32)
+    """
+    _npy_magic = b'\x93NUMPY'
+    _dtypes = {'float32': '<f4', 'float16': '<f2'}
+
+    @staticmethod
+    def is_npy(blob) -> bool:
+        return bytes(blob[:6]) == MuseVectorCodec._npy_magic
+
+    @staticmethod
+    def encode(vector, dtype='float32') -> bytes:
+        return np.ascontiguousarray(np.asarray(vector).reshape(-1), dtype=MuseVectorCodec._dtypes[dtype]).tobytes()
+
+    @staticmethod
+    def _decode_npy(blob) -> np.ndarray:
+        stream = io.BytesIO(blob)
+        version = np.lib.format.read_magic(stream)
+        if version not in ((1, 0), (2, 0)):
+            return np.atleast_2d(np.load(io.BytesIO(blob), allow_pickle=False))[0]
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(stream)
+        if dtype.hasobject:
+            raise ValueError('object array blob is not supported')
+        vector = np.frombuffer(blob, dtype=dtype, count=int(np.prod(shape)), offset=stream.tell())
+        if len(shape) > 1 and fortran_order:
+            vector = vector.reshape(shape[::-1]).T
+        # 기존 blob은 (1, d) 배열 → 첫 row
+        return vector.reshape(shape)[0] if len(shape) > 1 else vector
+
+    @staticmethod
+    def decode(blob, d=None) -> np.ndarray:
+        """blob → 1차원 벡터 (raw float32는 blob 메모리를 그대로 참조하는 읽기 전용 배열)"""
+        if MuseVectorCodec.is_npy(blob):
+            vector = MuseVectorCodec._decode_npy(blob)
+        elif d and len(blob) == d * 2:
+            vector = np.frombuffer(blob, dtype='<f2')
+        else:
+            vector = np.frombuffer(blob, dtype='<f4')
+        return vector if vector.dtype == np.float32 else vector.astype('float32')
+
+    @staticmethod
+    def decode_many(blobs, d=None) -> np.ndarray:
+        """blob 목록 → float32 (n, d) 배열 (모두 raw float32면 한 번의 복사로 생성)"""
+        if not blobs:
+            return np.empty((0, d or 0), dtype='float32')
+        if d and all(len(blob) == d * 4 and not MuseVectorCodec.is_npy(blob) for blob in blobs):
+            return np.frombuffer(b''.join(blobs), dtype='<f4').reshape(len(blobs), d)
+        return np.stack([MuseVectorCodec.decode(blob, d) for blob in blobs]).astype('float32', copy=False)
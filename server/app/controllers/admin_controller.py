@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Header
+from fastapi.responses import PlainTextResponse
+from common.profiler_common import MuseProfiler
+from common.reload_common import MuseReloader
+from common.response_common import error_response
+from typing import Optional
+import asyncio
+import hmac
+import logging
+import os
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+)
+
+# 관리자 토큰이 설정되지 않으면 admin API 전체 비활성화
+_admin_token = os.environ.get('MUSE_ADMIN_TOKEN')
+
+def _authorized(token: Optional[str]) -> bool:
+    return bool(_admin_token) and token is not None and hmac.compare_digest(token, _admin_token)
+
+@router.get("/profile")
+async def profile(seconds: float = 10, interval_ms: float = 5, format: str = 'collapsed', include_idle: bool = False,
+                  x_admin_token: Optional[str] = Header(default=None)):
+    if not _authorized(x_admin_token):
+        return error_response(message="forbidden", status_code=403)
+
+    logging.info(f'''PROFILE START: {seconds}s, interval {interval_ms}ms''')
+    # 샘플링은 별도 스레드에서 실행 (이벤트 루프 스레드도 샘플링 대상)
+    loop = asyncio.get_event_loop()
+    result = await loop.run_in_executor(None, MuseProfiler.profile, seconds, interval_ms, include_idle)
+    if result is None:
+        return error_response(message="another profile is running", status_code=409)
+    logging.info(f'''PROFILE COMPLETE: {result['samples']} samples, {len(result['stacks'])} stacks''')
+
+    if format == 'json':
+        return {
+            'pid': result['pid'],
+            'seconds': result['seconds'],
+            'interval_ms': result['interval_ms'],
+            'samples': result['samples'],
+            'top_functions': MuseProfiler.top_functions(result),
+            'collapsed': MuseProfiler.collapsed(result)
+        }
+    return PlainTextResponse(content=MuseProfiler.collapsed(result), headers={'X-Profile-Pid': str(result['pid'])})
+
+@router.post("/reload")
+async def reload(x_admin_token: Optional[str] = Header(default=None)):
+    if not _authorized(x_admin_token):
+        return error_response(message="forbidden", status_code=403)
+
+    # 요청을 받은 워커만 즉시 다시 로드 (다른 워커는 MuseReloader 감시 스레드가 _interval 안에 반영)
+    loop = asyncio.get_event_loop()
+    reloaded = await loop.run_in_executor(None, MuseReloader.reload, True)
+    return {'pid': os.getpid(), 'reloaded': reloaded}
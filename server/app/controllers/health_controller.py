@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from common.faiss_common import MuseFaiss
+from common.oracle_common import OracleDB
+
+router = APIRouter(
+    prefix="/health",
+    tags=["health"],
+)
+
+@router.get("/live")
+async def live():
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def ready():
+    # 필수 FAISS 인덱스 로드/warm-up 및 Oracle 풀 초기화가 끝나야 ready
+    status = MuseFaiss.get_status()
+    status['oracle'] = OracleDB.is_pool_initialized()
+    is_ready = status['ready'] and status['oracle']
+    return JSONResponse(content=status, status_code=200 if is_ready else 503)
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from common.metrics_common import MuseMetrics
+
+router = APIRouter(
+    tags=["metrics"],
+)
+
+@router.get("/metrics")
+async def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(content=MuseMetrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,75 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from common.faiss_common import MuseFaiss
+from common.redis_common import RedisClient
+from common.song_id_common import MuseSongId
+from common.response_common import error_response
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+import numpy as np
+import logging
+
+router = APIRouter(
+    prefix="/node",
+    tags=["node"],
+)
+
+# node.py에서 기동 시 자기 node의 shard 설정으로 채움 { key: {'file': ..., 'id_offset': ...} }
+shards: Dict[str, Dict] = {}
+
+class NodeSearchRequest(BaseModel):
+    key: str
+    vector: List[float]
+    k: int
+    playlist_id: Optional[str] = None
+
+@router.post("/search")
+def node_search(input_data: NodeSearchRequest):
+    # sync 핸들러 → FastAPI 스레드 풀에서 실행 (FAISS 검색이 이벤트 루프를 막지 않음)
+    key = input_data.key
+    if key not in shards:
+        return error_response(message=f"shard '{key}' is not served by this node", status_code=404)
+
+    # song id 인덱스는 id 자체가 전역 곡 식별자이므로 offset 변환 없음
+    song_id = MuseFaiss.is_song_id(key)
+    id_offset = 0 if song_id else shards[key].get('id_offset', 0)
+    query_vector = np.array(input_data.vector, dtype='float32')
+
+    if input_data.playlist_id:
+        if song_id:
+            song_ids = RedisClient.get_playlist_song_ids(playlist_id=input_data.playlist_id)
+            max_chunk = int(MuseFaiss.index_meta(key).get('max_chunk', 0))
+            include_ids = MuseSongId.expand(song_ids, album=key == 'album_name', max_chunk=max_chunk).tolist() if song_ids else None
+        else:
+            include_ids = RedisClient.get_playlist_include_ids(key=key, playlist_id=input_data.playlist_id)
+        index = MuseFaiss.get_index(key)
+        if not include_ids or index is None:
+            return {'D': [], 'I': []}
+
+        # 전역 id → shard 내부 id
+        if song_id:
+            local_ids = include_ids
+        else:
+            local_ids = [idx - id_offset for idx in include_ids if id_offset <= idx < id_offset + MuseFaiss.id_end(key)]
+        if not local_ids:
+            return {'D': [], 'I': []}
+        D, I = MuseFaiss.search_with_include(key=key, query_vector=query_vector, k=input_data.k, include_ids=local_ids)
+    else:
+        D, I = MuseFaiss.search(key=key, query_vector=query_vector, k=input_data.k)
+
+    if D is None or I is None:
+        logging.error(f"Node search failed: {key}")
+        return error_response(message=f"search failed: {key}", status_code=500)
+
+    # threshold로 무효화된 결과(-1, inf)는 제외하고 shard 내부 id → 전역 id
+    valid = I[0] >= 0
+    return {
+        'D': D[0][valid].tolist(),
+        'I': (I[0][valid] + id_offset).tolist()
+    }
+
+@router.get("/ready")
+async def node_ready():
+    status = MuseFaiss.get_status()
+    status['shards'] = shards
+    return JSONResponse(content=status, status_code=200 if status['ready'] else 503)
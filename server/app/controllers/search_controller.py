@@ -1,9 +1,11 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from services.faiss_service import FaissService
 from services.search_service import SearchService
-from common.response_common import success_response, error_response
+from common.response_common import success_response, error_response, fast_response
+from common.result_common import MuseResult
+from common.trace_common import MuseTrace
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 import time
 import logging
 
@@ -16,12 +18,28 @@ class TextRequest(BaseModel):
     text: str
     mood: list
     vibe_only: bool = False
+    playable_only: bool = False
+    # 지정하면 첫 페이지와 next_cursor만 반환 (다음 페이지는 /search/text/page)
+    page_size: Optional[int] = None
+    # true면 results를 CompactSong 형식으로, fields로 필드 선택 (disccommseq / trackno는 항상 포함)
+    compact: bool = False
+    fields: Optional[List[str]] = None
 
 class TextRequestPlaylist(BaseModel):
     text: str
     mood: list
     playlist_id: str
     vibe_only: bool = False
+    playable_only: bool = False
+    page_size: Optional[int] = None
+    compact: bool = False
+    fields: Optional[List[str]] = None
+
+class PageRequest(BaseModel):
+    cursor: str
+    page_size: int = 50
+    compact: bool = False
+    fields: Optional[List[str]] = None
 
 class SimilarRequest(BaseModel):
     disccommseq: int
@@ -39,19 +57,21 @@ class AnalyzeRequest(BaseModel):
     trackno: str
 
 @router.post("/text")
-async def search_song(input_data: TextRequest):    
+async def search_song(input_data: TextRequest, request: Request):    
     text = input_data.text    
     mood = input_data.mood
     vibe_only = input_data.vibe_only
 
     start = time.time()
     logging.info(f'''User Query: {text}''')
-    result = await SearchService.search_text(text=text, mood=mood, vibe_only=vibe_only)
+    result = await SearchService.search_text(text=text, mood=mood, vibe_only=vibe_only, playable_only=input_data.playable_only, page_size=input_data.page_size)
     logging.info(f'''소요시간: {time.time()-start}''')
-    return result
+    if input_data.compact:
+        result = MuseResult.compact_response(result, input_data.fields)
+    return fast_response(request, MuseTrace.attach(result))
 
 @router.post("/text_playlist")
-async def search_playlist_song(input_data: TextRequestPlaylist):
+async def search_playlist_song(input_data: TextRequestPlaylist, request: Request):
     text = input_data.text    
     mood = input_data.mood
     vibe_only = input_data.vibe_only
@@ -59,9 +79,23 @@ async def search_playlist_song(input_data: TextRequestPlaylist):
 
     start = time.time()
     logging.info(f'''User Query: {text}''')
-    result = await SearchService.search_text(text=text, mood=mood, vibe_only=vibe_only, playlist_id=playlist_id)
+    result = await SearchService.search_text(text=text, mood=mood, vibe_only=vibe_only, playlist_id=playlist_id, playable_only=input_data.playable_only, page_size=input_data.page_size)
+    logging.info(f'''소요시간: {time.time()-start}''')
+    if input_data.compact:
+        result = MuseResult.compact_response(result, input_data.fields)
+    return fast_response(request, MuseTrace.attach(result))
+
+@router.post("/text/page")
+async def search_text_page(input_data: PageRequest, request: Request):
+    start = time.time()
+    logging.info(f'''Search Page: {input_data.cursor} ({input_data.page_size})''')
+    result = await SearchService.get_page(cursor=input_data.cursor, page_size=input_data.page_size)
     logging.info(f'''소요시간: {time.time()-start}''')
-    return result
+    if result is None:
+        return error_response(message="cursor expired or invalid", status_code=404)
+    if input_data.compact:
+        result = MuseResult.compact_response(result, input_data.fields)
+    return fast_response(request, MuseTrace.attach(result))
 
 @router.post("/similar")
 async def search_similar_song(input_data: SimilarRequest):
@@ -71,7 +105,7 @@ async def search_similar_song(input_data: SimilarRequest):
     logging.info(f'''Find Similar song vibe: {disccommseq}_{trackno} ''')
     result = await SearchService.search_similar_song(key='vibe', disccommseq=disccommseq, trackno=trackno)
     logging.info(f'''소요시간: {time.time()-start}''')
-    return result
+    return MuseTrace.attach(result)
 
 @router.post("/similar_in_playlist")
 async def search_similar_song(input_data: SimilarRequestPlaylist):
@@ -83,7 +117,7 @@ async def search_similar_song(input_data: SimilarRequestPlaylist):
     logging.info(f'''Find Similar song vibe in playlist: {disccommseq}_{trackno} ''')
     result = await SearchService.search_similar_song(key='vibe', disccommseq=disccommseq, trackno=trackno, playlist_id=playlist_id)
     logging.info(f'''소요시간: {time.time()-start}''')
-    return result
+    return MuseTrace.attach(result)
 
 @router.post("/similar_lyric")
 async def search_similar_song_lyric(input_data: SimilarRequest):
@@ -93,7 +127,7 @@ async def search_similar_song_lyric(input_data: SimilarRequest):
     logging.info(f'''Find Similar song lyric: {disccommseq}_{trackno} ''')
     result = await SearchService.search_similar_song(key='lyrics_summary', disccommseq=disccommseq, trackno=trackno)
     logging.info(f'''소요시간: {time.time()-start}''')
-    return result
+    return MuseTrace.attach(result)
 
 @router.post("/similar_lyric_in_playlist")
 async def search_similar_song_lyric(input_data: SimilarRequestPlaylist):
@@ -105,7 +139,7 @@ async def search_similar_song_lyric(input_data: SimilarRequestPlaylist):
     logging.info(f'''Find Similar song lyric: {disccommseq}_{trackno} ''')
     result = await SearchService.search_similar_song(key='lyrics_summary', disccommseq=disccommseq, trackno=trackno, playlist_id=playlist_id)
     logging.info(f'''소요시간: {time.time()-start}''')
-    return result
+    return MuseTrace.attach(result)
 
 @router.post("/analyze")
 async def analyze_result(input_data: AnalyzeRequest):
@@ -114,5 +148,5 @@ async def analyze_result(input_data: AnalyzeRequest):
     disccommseq = input_data.disccommseq
     trackno = input_data.trackno    
     result = await SearchService.search_analyze_result(text=text, llm_result=llm_result, disccommseq=disccommseq, trackno=trackno)
-    return result
+    return MuseTrace.attach(result)
 
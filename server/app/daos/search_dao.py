@@ -1,31 +1,18 @@
 from common.mysql_common import Database
 from common.oracle_common import OracleDB
+from common.metrics_common import MuseMetrics
+from common.registry_common import MuseRegistry
 from typing import List, Dict
 import logging
 import time
 
 class SearchDAO:
-    _table_mapping ={
-        'artist': 'tb_embedding_bgem3_artist_h',
-        'album_name': 'tb_embedding_bgem3_album_name_h',
-        'title': 'tb_embedding_bgem3_song_name_h',
-        'vibe' : 'tb_embedding_clap_h',
-        'lyrics': 'tb_embedding_bgem3_lyrics_slide_h',
-        'lyrics_3': 'tb_embedding_bgem3_lyrics_3_slide_h',
-        'lyrics_summary': 'tb_embedding_clap_lyrics_summary_h'
-    }
-
-    _column_mapping = {
-        'artist': ['disccommseq','trackno'],        
-        'album_name': ['disccommseq'],
-        'title': ['disccommseq','trackno'],
-        'vibe' : ['disccommseq','trackno'],
-        'lyrics': ['disccommseq','trackno'],
-        'lyrics_3': ['disccommseq','trackno'],
-        'lyrics_summary': ['disccommseq','trackno']
-    }
+    # key별 임베딩 테이블 / 곡 식별 컬럼 (MuseRegistry)
+    _table_mapping = MuseRegistry.mapping('table')
+    _column_mapping = MuseRegistry.mapping('id_columns')
     
     @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_song_batch_info')
     def get_song_batch_info(key: str, idx_list: List):
         batch_info = {}        
         # logging.info(f'''{key}, {idx_list}''')
@@ -43,6 +30,7 @@ class SearchDAO:
         return batch_info
     
     @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_song_by_album_info')
     def get_song_by_album_info(album_info_dict):
         batch_info = {}
         conditions = []
@@ -72,6 +60,7 @@ class SearchDAO:
         return batch_info
 
     @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_album_batch_info')
     def get_album_batch_info(key: str, idx_list: List):
         batch_info = {}   
         # logging.info(f'''{key}, {idx_list}''')
@@ -91,6 +80,7 @@ class SearchDAO:
         return batch_info 
 
     @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_song_info')
     def get_song_info(key: str, idx: int) -> Dict:
         result, code = Database.execute_query(f"""
             SELECT disccommseq, trackno
@@ -106,6 +96,7 @@ class SearchDAO:
             return {}
         
     @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_song_clap_embedding')
     def get_song_clap_embedding(key, disccommseq, trackno):        
         results, code = Database.execute_query(f"""
             SELECT disccommseq, trackno, chunk_num, embedding_result
@@ -118,6 +109,7 @@ class SearchDAO:
             return []
         
     @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_song_clap_lyric_summary')
     def get_song_clap_lyric_summary(key, disccommseq, trackno):
         results, code = Database.execute_query(f"""
             SELECT disccommseq, trackno, summary_num, embedding_result
@@ -130,6 +122,7 @@ class SearchDAO:
             return []
         
     @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_song_bgem3_song_name')
     def get_song_bgem3_song_name(key, disccommseq, trackno):
         results, code = Database.execute_query(f"""
             SELECT disccommseq, trackno, song_name, song_name_embedding
@@ -142,6 +135,7 @@ class SearchDAO:
             return []
 
     @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_song_batch_meta')
     def get_song_batch_meta(disc_track_pairs: List[tuple]):
         if not disc_track_pairs:
             return {}
@@ -183,6 +177,7 @@ class SearchDAO:
         return song_meta_dict
 
     @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_song_meta')
     def get_song_meta(disccommseq: int, trackno: str) -> Dict:
         result = OracleDB.execute_query(f"""
             SELECT A.ARTIST, A.PLAYER, A.BAND_NAME, A.SONG_NAME, A.PLAY_TIME, B.DISC_NAME, A.DISC_COMM_SEQ, A.TRACK_NO, MASTERING_YEAR, HIT_YEAR, B.DISC_GENRE_TXT,
@@ -202,6 +197,7 @@ class SearchDAO:
             return result[0]
     
     @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_mood_dict')
     def get_mood_dict():
         results, code = Database.execute_query(f"""
             SELECT eng_mood, kor_mood
@@ -214,6 +210,7 @@ class SearchDAO:
             return {}
 
     @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_song_mood_value')
     def get_song_mood_value(disc_track_pairs: List[tuple]):
         if not disc_track_pairs:
             return {}
@@ -244,6 +241,7 @@ class SearchDAO:
             return {}
     
     @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_song_bpm_value')
     def get_song_bpm_value(disc_track_pairs: List[tuple]):
         if not disc_track_pairs:
             return {}
@@ -270,6 +268,7 @@ class SearchDAO:
             return {}
         
     @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_song_category')
     def get_song_category():       
         
         results, code = Database.execute_query(f"""
@@ -289,6 +288,7 @@ class SearchDAO:
             return {}
         
     @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_song_genre')
     def get_song_genre():
         results, code = Database.execute_query(f"""
             SELECT genre
@@ -306,6 +306,7 @@ class SearchDAO:
         
 
     @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_playlist_idx')
     def get_playlist_idx(key: str, disc_track_pairs: List[tuple]) -> List[int]:
         """
         disc_track_pairs로부터 FAISS용 idx 리스트를 조회
@@ -354,3 +355,79 @@ class SearchDAO:
             return [result[0] - 1 for result in results]
         else:
             return []
+
+    @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_max_idx')
+    def get_max_idx(key: str) -> int:
+        results, code = Database.execute_query(f"""
+            SELECT MAX(idx)
+            FROM {SearchDAO._table_mapping[key]}
+        """, fetchone=True)
+        if code == 200 and results and results[0]:
+            return int(results[0])
+        return 0
+
+    @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_song_rows')
+    def get_song_rows(key: str, start_idx: int, end_idx: int) -> List[tuple]:
+        """idx 범위(start_idx 이상 end_idx 미만)의 (idx, disccommseq, trackno)"""
+        results, code = Database.execute_query(f"""
+            SELECT idx, disccommseq, trackno
+            FROM {SearchDAO._table_mapping[key]}
+            WHERE idx >= %s AND idx < %s
+        """, params=[start_idx, end_idx], fetchall=True)
+        if code == 200:
+            return list(results)
+        return []
+
+    @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_album_rows')
+    def get_album_rows(key: str, start_idx: int, end_idx: int) -> List[tuple]:
+        """idx 범위(start_idx 이상 end_idx 미만)의 (idx, disccommseq) - 앨범 단위 테이블"""
+        results, code = Database.execute_query(f"""
+            SELECT idx, disccommseq
+            FROM {SearchDAO._table_mapping[key]}
+            WHERE idx >= %s AND idx < %s
+        """, params=[start_idx, end_idx], fetchall=True)
+        if code == 200:
+            return list(results)
+        return []
+
+    @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_disc_seq_range')
+    def get_disc_seq_range():
+        results = OracleDB.execute_query("""
+            SELECT MIN(DISC_COMM_SEQ) AS MIN_SEQ, MAX(DISC_COMM_SEQ) AS MAX_SEQ
+            FROM MIBIS.MI_SONG_INFO
+        """)
+        if results and results[0]['min_seq'] is not None:
+            return int(results[0]['min_seq']), int(results[0]['max_seq'])
+        return None, None
+
+    @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_song_attributes')
+    def get_song_attributes(start_seq: int, end_seq: int) -> List[Dict]:
+        """DISC_COMM_SEQ 범위(start_seq 이상 end_seq 미만) 곡의 연도 / 장르 / MP3 여부"""
+        return OracleDB.execute_query(f"""
+            SELECT A.DISC_COMM_SEQ, A.TRACK_NO, MASTERING_YEAR, HIT_YEAR, B.DISC_GENRE_TXT,
+            CASE 
+                WHEN A.MP3_PATH IS NULL THEN 0 
+                ELSE 1 
+            END AS MP3_PATH_FLAG
+            FROM MIBIS.MI_SONG_INFO A 
+            JOIN MIBIS.MI_DISC_INFO B 
+            ON A.DISC_COMM_SEQ = B.DISC_COMM_SEQ
+            WHERE A.DISC_COMM_SEQ >= {int(start_seq)} AND A.DISC_COMM_SEQ < {int(end_seq)}
+        """) or []
+
+    @staticmethod
+    @MuseMetrics.timed('muse_dao_seconds', method='get_song_names')
+    def get_song_names(start_seq: int, end_seq: int) -> List[Dict]:
+        """DISC_COMM_SEQ 범위(start_seq 이상 end_seq 미만) 곡의 아티스트 / 곡명 / 앨범명"""
+        return OracleDB.execute_query(f"""
+            SELECT A.DISC_COMM_SEQ, A.TRACK_NO, A.ARTIST, A.SONG_NAME, B.DISC_NAME
+            FROM MIBIS.MI_SONG_INFO A 
+            JOIN MIBIS.MI_DISC_INFO B 
+            ON A.DISC_COMM_SEQ = B.DISC_COMM_SEQ
+            WHERE A.DISC_COMM_SEQ >= {int(start_seq)} AND A.DISC_COMM_SEQ < {int(end_seq)}
+        """) or []
@@ -1,22 +1,51 @@
 from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
-from controllers import search_controller
+from controllers import search_controller, health_controller, metrics_controller, admin_controller
 from common.oracle_common import OracleDB
 from common.faiss_common import MuseFaiss
+from common.shard_common import MuseShard
+from common.attribute_common import MuseAttributes
+from common.name_index_common import MuseNameIndex
+from common.lyrics_index_common import MuseLyricsIndex
+from common.refine_common import MuseRefine
+from common.snapshot_common import MuseSnapshot
+from common.tombstone_common import MuseTombstones
+from common.reload_common import MuseReloader
+from common.metrics_common import MuseMetrics
+from common.trace_common import MuseTrace
 from config import API_NAME, BASE_LOG_PATH
 from common.logger_common import Logger
+import json
 import logging
+import time
 
 Logger.set_logger(log_path=BASE_LOG_PATH, file_name='service.log')
+MuseMetrics.register_gauge('muse_log_dropped', lambda: Logger.dropped)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):  # noqa: ARG001
     # Startup
     try:
         logging.info("Server Start")
-        logging.info(MuseFaiss.get_all_info())
-        # if code == 200:
-        #     logging.info(f"FAISS ON: {ivfpq_info['ntotal']}")
+        # search-node가 담당하는 key는 로컬에서 로드하지 않음
+        MuseFaiss.exclude_keys(MuseShard.sharded_keys())
+        # 인덱스 로드는 백그라운드에서 진행, 완료 여부는 /health/ready 로 확인
+        MuseFaiss.start_background_load()
+        # 연도 / 장르 / MP3 속성 배열 (mmap, 없으면 필터 비활성)
+        MuseAttributes.load()
+        # artist / title / album_name 이름 역색인 (mmap, 없으면 벡터 검색만 사용)
+        MuseNameIndex.load()
+        # case 9 가사 phrase 역색인 (mmap, 없으면 벡터 검색만 사용)
+        MuseLyricsIndex.load()
+        # IVFPQ 후보 exact 재정렬용 float16 벡터 사본 (mmap, 없으면 IVFPQ 거리 그대로 사용)
+        MuseRefine.load()
+        # 유사곡 기준 곡 벡터용 임베딩 스냅샷 (mmap, 없으면 MySQL 조회)
+        MuseSnapshot.load()
+        # 금지 / 삭제 곡 tombstone (없으면 제외하지 않음)
+        MuseTombstones.load()
+        # 일일 배치가 복사한 delta / tombstone / float16 사본 / 스냅샷을 재기동 없이 반영 (파일 mtime 감시)
+        MuseReloader.start()
         OracleDB.initialize_pool()
     except Exception as e:
         logging.error(e)
@@ -26,6 +55,7 @@ async def lifespan(app: FastAPI):  # noqa: ARG001
     # Shutdown
     try:
         logging.info("Server Close")
+        MuseReloader.stop()
         OracleDB.close_pool()
     except Exception as e:
         logging.error(e)
@@ -33,4 +63,38 @@ async def lifespan(app: FastAPI):  # noqa: ARG001
 app = FastAPI(title=f'''{API_NAME} API''', lifespan=lifespan)
 
 # 컨트롤러 라우터 등록
-app.include_router(search_controller.router)
\ No newline at end of file
+app.include_router(search_controller.router)
+app.include_router(health_controller.router)
+app.include_router(metrics_controller.router)
+app.include_router(admin_controller.router)
+
+# Accept-Encoding: gzip 요청에 대해 1KB 이상 응답 압축 (vibe_only 5000곡 응답 등)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    MuseMetrics.add_gauge('muse_requests_in_flight', 1)
+    # 요청 헤더의 trace id를 이어받거나 새로 발급, X-Muse-Debug: 1 이면 응답에 timing breakdown 포함
+    trace_token = MuseTrace.start(
+        trace_id=request.headers.get('X-Trace-Id'),
+        debug=request.headers.get('X-Muse-Debug', '').lower() in ('1', 'true')
+    )
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers['X-Trace-Id'] = MuseTrace.current_id()
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        trace = MuseTrace.finish(trace_token)
+        MuseMetrics.add_gauge('muse_requests_in_flight', -1)
+        # label 폭증 방지를 위해 실제 URL 대신 라우트 경로 사용
+        route = request.scope.get('route')
+        route_path = route.path if route else 'unmatched'
+        MuseMetrics.observe('muse_request_seconds', elapsed, route=route_path, status=status)
+        if elapsed > MuseTrace._slow_threshold:
+            trace['route'] = route_path
+            trace['status'] = status
+            logging.warning(f'''SLOW REQUEST {json.dumps(trace, ensure_ascii=False, default=str)}''')
@@ -0,0 +1,53 @@
+from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from controllers import node_controller
+from common.faiss_common import MuseFaiss
+from common.shard_common import MuseShard
+from common.trace_common import MuseTrace
+from config import API_NAME, BASE_LOG_PATH
+from common.logger_common import Logger
+from urllib.parse import urlparse
+import argparse
+import logging
+import uvicorn
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):  # noqa: ARG001
+    logging.info(f"Search Node Start: {node_controller.shards}")
+    MuseFaiss.start_background_load()
+    yield
+    logging.info("Search Node Close")
+
+app = FastAPI(title=f'''{API_NAME} Search Node''', lifespan=lifespan)
+app.include_router(node_controller.router)
+
+@app.middleware("http")
+async def trace_middleware(request: Request, call_next):
+    # 메인 서버가 전달한 X-Trace-Id를 node 로그에도 남김
+    trace_token = MuseTrace.start(trace_id=request.headers.get('X-Trace-Id'))
+    try:
+        return await call_next(request)
+    finally:
+        MuseTrace.finish(trace_token)
+
+if __name__ == "__main__":
+    # 사용 예) python node.py --node 0
+    #   muse_shards.json의 nodes[0]에 정의된 shard 인덱스만 로드하여 /node/search 로 서비스
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--node', type=int, required=True, help='node number in shard config')
+    parser.add_argument('--config', type=str, default=None, help='shard config path (default: INDEX_PATH/muse_shards.json)')
+    parser.add_argument('--host', type=str, default=None, help='bind host (default: host of node url)')
+    parser.add_argument('--port', type=int, default=None, help='bind port (default: port of node url)')
+    args = parser.parse_args()
+
+    Logger.set_logger(log_path=BASE_LOG_PATH, file_name=f'''node_{args.node}.log''')
+
+    config = MuseShard.load_config(args.config)
+    node = config['nodes'][args.node]
+    node_controller.shards.update(node['shards'])
+
+    # 이 node가 담당하는 shard 파일만 로드 (lazy 로드 없이 전부 필수)
+    MuseFaiss.configure({key: shard.get('file', MuseFaiss._index_files.get(key)) for key, shard in node['shards'].items()})
+
+    url = urlparse(node['url'])
+    uvicorn.run(app, host=args.host or url.hostname, port=args.port or url.port)
@@ -2,6 +2,8 @@ import requests
 import numpy as np
 import json
 import logging
+from common.metrics_common import MuseMetrics
+from common.registry_common import MuseRegistry
 
 class EmbeddingService:
     embedding_requests_info = {
@@ -15,36 +17,16 @@ class EmbeddingService:
         }
     }
 
-    embedding_info = {
-        'artist': {
-            'embedding_model': 'bgem3'
-        },
-        'album_name':{
-            'embedding_model': 'bgem3'
-        },
-        'title': {
-            'embedding_model': 'bgem3'
-        },
-        'lyrics': {
-            'embedding_model': 'bgem3'
-        },
-        'lyrics_3': {
-            'embedding_model': 'bgem3'
-        },
-        'vibe': {
-            'embedding_model': 'clap'
-        },
-        'lyrics_summary':{
-            'embedding_model': 'clap'
-        }
-    }
+    # key별 임베딩 모델 (MuseRegistry의 model)
+    embedding_info = {key: {'embedding_model': model} for key, model in MuseRegistry.mapping('model').items()}
 
     @staticmethod
     def get_vector(key: str, text: str) -> np.ndarray:        
         embedding_url = EmbeddingService.embedding_requests_info[EmbeddingService.embedding_info[key]['embedding_model']]['url']
         embedding_body = EmbeddingService.embedding_requests_info[EmbeddingService.embedding_info[key]['embedding_model']]['body'].copy()
         embedding_body['text'] = text.strip() 
-        res = requests.post(url=embedding_url, json=embedding_body)
+        with MuseMetrics.timer('muse_embedding_seconds', model=EmbeddingService.embedding_info[key]['embedding_model']):
+            res = requests.post(url=embedding_url, json=embedding_body)
         res = json.loads(res.text)        
         vector = np.array([res['results']], dtype='float32')
         # print(len(vector[0]), embedding_url, text)
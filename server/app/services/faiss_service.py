@@ -1,7 +1,12 @@
 from common.faiss_common import MuseFaiss
+from common.shard_common import MuseShard
+from common.attribute_common import MuseAttributes
+from common.tombstone_common import MuseTombstones
 from common.oracle_common import OracleDB
 from common.mysql_common import Database
 from common.redis_common import RedisClient
+from common.metrics_common import MuseMetrics
+from common.song_id_common import MuseSongId
 from daos.search_dao import SearchDAO
 from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
@@ -9,29 +14,125 @@ import logging
 
 class FaissService:
     @staticmethod
-    def search(key: str, query_vector: np.ndarray, k: int = 100) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    def playlist_include_ids(key: str, playlist_id: str) -> Optional[List[int]]:
+        """
+        플레이리스트 검색 대상 FAISS id
+        song id 인덱스는 곡 식별자(playlist_song)를 바로 id로 변환, 그 외는 key별 MySQL idx 목록(playlist_idx)
+        """
+        if MuseFaiss.is_song_id(key):
+            song_ids = RedisClient.get_playlist_song_ids(playlist_id=playlist_id)
+            if not song_ids:
+                return None
+            max_chunk = int(MuseFaiss.index_meta(key).get('max_chunk', 0))
+            return MuseSongId.expand(song_ids, album=key == 'album_name', max_chunk=max_chunk).tolist()
+        return RedisClient.get_playlist_include_ids(key=key, playlist_id=playlist_id)
+
+    @staticmethod
+    def _attr_filter(key: str, filters: Optional[Dict]):
+        """속성 필터 (속성 배열은 FAISS id == MySQL idx - 1 기준이므로 song id 인덱스는 적용하지 않음)"""
+        if not filters or MuseFaiss.is_song_id(key):
+            return None
+        return MuseAttributes.get_filter(key, **filters)
+
+    @staticmethod
+    def search(key: str, query_vector: np.ndarray, k: int = 100, filters: Optional[Dict] = None) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        filters: {'year': [...], 'category': [...], 'playable': bool}
+        속성 배열이 있으면 조건에 맞지 않는 곡은 검색 단계에서 제외 (MuseAttributes)
+        """
         try:
-            D, I = MuseFaiss.search(key= key, query_vector=query_vector, k=k)
+            attr_filter = FaissService._attr_filter(key, filters)
+
+            # search-node 결과에는 tombstone selector가 적용되지 않으므로 전체 id 기준으로 후처리
+            if MuseShard.is_sharded(key):
+                with MuseMetrics.timer('muse_faiss_search_seconds', key=key, mode='shard'):
+                    if attr_filter is None:
+                        return MuseTombstones.post_filter(key, *MuseShard.search(key=key, query_vector=query_vector, k=k))
+                    D, I = MuseShard.search(key=key, query_vector=query_vector, k=attr_filter.search_k(k, MuseAttributes._max_oversample))
+                    return MuseTombstones.post_filter(key, *attr_filter.post_filter(D, I, k)) if D is not None else (None, None)
+
+            with MuseMetrics.timer('muse_faiss_search_seconds', key=key, mode='local' if attr_filter is None else 'filter'):
+                if attr_filter is None:
+                    D, I = MuseFaiss.search(key= key, query_vector=query_vector, k=k)
+                elif attr_filter.selector is not None:
+                    D, I = MuseFaiss.search(key=key, query_vector=query_vector, k=k, id_selector=attr_filter.selector)
+                else:
+                    D, I = MuseFaiss.search(key=key, query_vector=query_vector, k=attr_filter.search_k(k, MuseAttributes._max_oversample))
+                    if D is not None:
+                        D, I = attr_filter.post_filter(D, I, k)
             return D, I
         except Exception as e:
             logging.error(e)
             return None, None
-        
+
     @staticmethod
-    def search_with_include(key: str, query_vector: np.ndarray, k: int, playlist_id: str) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    def search_with_include(key: str, query_vector: np.ndarray, k: int, playlist_id: str, filters: Optional[Dict] = None) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
         try:
+            attr_filter = FaissService._attr_filter(key, filters)
+
+            # search-node 모드: 각 node가 자기 shard 범위의 include_ids를 Redis에서 직접 조회
+            if MuseShard.is_sharded(key):
+                with MuseMetrics.timer('muse_faiss_search_seconds', key=key, mode='shard_include'):
+                    if attr_filter is None:
+                        return MuseTombstones.post_filter(key, *MuseShard.search(key=key, query_vector=query_vector, k=k, playlist_id=playlist_id))
+                    D, I = MuseShard.search(key=key, query_vector=query_vector, k=attr_filter.search_k(k, MuseAttributes._max_oversample), playlist_id=playlist_id)
+                    return MuseTombstones.post_filter(key, *attr_filter.post_filter(D, I, k)) if D is not None else (None, None)
 
             ### REDIS 에서 불러오는 과정
-            include_ids = RedisClient.get_playlist_include_ids(key=key, playlist_id=playlist_id)            
+            include_ids = FaissService.playlist_include_ids(key=key, playlist_id=playlist_id)
 
             if not include_ids:
                 logging.warning("No include_ids found")
                 return None, None
 
+            # 속성 필터는 include_ids를 줄이는 방식으로 적용
+            if attr_filter is not None:
+                include_ids = attr_filter.restrict(include_ids)
+                if not include_ids:
+                    return None, None
+
             # FAISS 검색 (include_ids 내에서만)
-            D, I = MuseFaiss.search_with_include(key=key, query_vector=query_vector, k=k, include_ids=include_ids)
-            
+            with MuseMetrics.timer('muse_faiss_search_seconds', key=key, mode='include'):
+                D, I = MuseFaiss.search_with_include(key=key, query_vector=query_vector, k=k, include_ids=include_ids)
+
             return D, I
         except Exception as e:
             logging.error(f"Error in search_with_include: {e}")
             return None, None
+
+    @staticmethod
+    def fuse_lexical(key: str, lexical_ids: np.ndarray, distance, D: Optional[np.ndarray], I: Optional[np.ndarray], playlist_id: str = None, filters: Optional[Dict] = None, vibe_exist: bool = False) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        역색인 결과(MuseNameIndex / MuseLyricsIndex)를 벡터 검색 결과 앞에 합침
+        distance는 고정값 또는 id별 배열, 벡터 결과의 중복 id는 제거, 속성 필터 / 플레이리스트 조건 / tombstone은 벡터 검색과 동일하게 적용
+        """
+        if vibe_exist:
+            # vibe와 함께 검색하면 _process_batch가 실제 벡터 거리로 순위를 매기므로 고정 거리의 역색인 결과를 앞에 넣지 않음
+            return D, I
+        try:
+            ids = np.asarray(lexical_ids, dtype='int64')
+            distances = np.broadcast_to(np.asarray(distance, dtype='float32'), ids.shape)
+            keep = (ids >= 0) & MuseTombstones.keep_mask(key, ids)
+            if keep.any() and filters:
+                attr_filter = MuseAttributes.get_filter(key, **filters)
+                if attr_filter is not None:
+                    keep &= attr_filter.passes(ids)
+            if keep.any() and playlist_id:
+                include_ids = FaissService.playlist_include_ids(key=key, playlist_id=playlist_id)
+                keep &= np.isin(ids, include_ids) if include_ids else False
+            ids, distances = ids[keep], distances[keep]
+            if len(ids) == 0:
+                return D, I
+
+            # 거리 순으로 정렬 (고정값이면 역색인 순서 유지)
+            order = np.argsort(distances, kind='stable')
+            D_fused, I_fused = distances[order], ids[order]
+            if D is not None and I is not None:
+                I_vector = I.reshape(-1)
+                vector_keep = (I_vector >= 0) & ~np.isin(I_vector, ids)
+                D_fused = np.concatenate([D_fused, D.reshape(-1)[vector_keep].astype('float32')])
+                I_fused = np.concatenate([I_fused, I_vector[vector_keep].astype('int64')])
+            return D_fused.reshape(1, -1), I_fused.reshape(1, -1)
+        except Exception as e:
+            logging.error(f"Error in fuse_lexical: {e}")
+            return D, I
@@ -6,55 +6,57 @@ from services.embedding_service import EmbeddingService
 from concurrent.futures import ThreadPoolExecutor
 from common.llm_common import MuseLLM
 from common.faiss_common import MuseFaiss
+from common.name_index_common import MuseNameIndex
+from common.lyrics_index_common import MuseLyricsIndex
+from common.refine_common import MuseRefine
+from common.registry_common import MuseRegistry
+from common.vector_codec_common import MuseVectorCodec
+from common.snapshot_common import MuseSnapshot
+from common.song_id_common import MuseSongId
 from services.faiss_service import FaissService
 from daos.search_dao import SearchDAO
-from collections import defaultdict
+from common.metrics_common import MuseMetrics
+from common.trace_common import MuseTrace
+from common.logger_common import Logger
+from common.redis_common import RedisClient
+from common.hit_common import SongHit, MuseHits
 from rapidfuzz import fuzz
 from copy import deepcopy
 import re
 import time
 import json
 import math
-import io
+import uuid
 
 class SearchService:
     # 스레드 풀 설정 (동시 사용자 대응)
     _executor = ThreadPoolExecutor(max_workers=16)  # CPU 코어 * 2
     _query_executor = ThreadPoolExecutor(max_workers=8)  # CPU 코어 * 2
-    _index_mapping = {
-        "artist": "muse_artist",
-        "album_name": "muse_album_name",
-        "title": "muse_title",             
-        "vibe": "muse_vibe",
-        "lyrics": "muse_lyrics",
-        "lyrics_3": "muse_lyrics_3",
-        "lyrics_summary": "muse_lyrics_summary"        
-    }
+    MuseMetrics.register_executor('search', _executor)
+    MuseMetrics.register_executor('query', _query_executor)
+    # key별 인덱스 파일 / k / 이름 일치 거리는 MuseRegistry(muse_index_registry.json)에서 선언
+    _index_mapping = MuseRegistry.mapping('index_file')
     _rank_num = 5
-    _k_mapping = {
-        "title" : 5000,
-        "album_name": 1000,
-        "artist": 5000,
-        "vibe": 10000,
-        "lyrics": 5000,
-        "lyrics_3": 5000,
-        "lyrics_summary": 5000
-    }
+    _k_mapping = MuseRegistry.mapping('k')
+    # 이름 역색인(MuseNameIndex)을 쓸 수 있을 때의 k: 이름이 포함된 곡은 역색인으로 찾으므로 벡터 검색은 유사 표기만 담당
+    _lexical_k_mapping = MuseRegistry.mapping('lexical_k')
+    # 질의가 이름(match_field 메타 컬럼)에 포함된 곡의 거리 (_process_batch 가산점, 역색인 결과 거리)
+    _match_field = MuseRegistry.mapping('match_field')
+    _lexical_distance = MuseRegistry.mapping('match_distance')
+    # 가사 phrase 역색인(MuseLyricsIndex)에 완전 일치가 있을 때의 k: 의역 질의 대비용으로만 벡터 검색
+    _phrase_k_mapping = MuseRegistry.mapping('phrase_k')
+    # float16 벡터 사본(MuseRefine)이 있을 때의 k: IVFPQ 후보 k * _candidate_factor개를 exact 거리로 재정렬 후 k개만 사용
+    _refine_k_mapping = MuseRegistry.mapping('refine_k')
     _batch_size = 1000
-    _priority = { 
-        "vibe": 0,       
-        "title": 0,
-        "album_name": 0,
-        "artist": 1,
-        # "vibe": 2,        
-        "lyrics_summary": 2,
-        "lyrics_3": 3,          
-        "lyrics":4,                 
-    }
+    # /search/text 페이지 조회: 한 페이지 최대 곡 수, 순위 결과 보관 시간 (초)
+    _max_page_size = 500
+    _result_ttl = 600
+    _priority = MuseRegistry.mapping('priority')
     
     @staticmethod
-    async def _process_batch(key: str, query_text: str, batch_idx_list: list, batch_dist_list: list, vibe_exist: bool) -> dict:
-        """배치 단위로 곡 정보를 처리하는 비동기 메서드"""
+    async def _process_batch(key: str, query_text: str, batch_idx_list: list, batch_dist_list: list, vibe_exist: bool, with_mood: bool = True) -> dict:
+        """배치 단위로 곡 정보를 처리하는 비동기 메서드 (with_mood=False면 mood / bpm은 페이지 조회 시점에 채움)"""
+        batch_start = time.perf_counter()
         batched_dict = {
             batch_idx_list[j]: batch_dist_list[j]
             for j in range(len(batch_idx_list))
@@ -62,26 +64,33 @@ class SearchService:
         
         # 동기 함수를 비동기로 실행
         loop = asyncio.get_event_loop()
+        # song id 인덱스는 FAISS id에서 곡 / 앨범 번호를 바로 디코딩 (MySQL 조회 없음)
+        song_id = MuseFaiss.is_song_id(key)
         if key == 'album_name':
             # album_info_dict: { '앨범 번호': '인덱스' }            
-            album_info_dict = await loop.run_in_executor(
-                SearchService._query_executor,
-                SearchDAO.get_album_batch_info,
-                key,
-                batch_idx_list
-            )                        
+            if song_id:
+                album_info_dict = MuseSongId.album_info(batch_idx_list)
+            else:
+                album_info_dict = await loop.run_in_executor(
+                    SearchService._query_executor,
+                    MuseTrace.bind(SearchDAO.get_album_batch_info),
+                    key,
+                    batch_idx_list
+                )                        
             # song_info_dict: { '인덱스': [{'disccomsseq' : '', 'trackno': ''}] }
             song_info_dict = await loop.run_in_executor(
                 SearchService._query_executor,
-                SearchDAO.get_song_by_album_info,                
+                MuseTrace.bind(SearchDAO.get_song_by_album_info),                
                 album_info_dict
             )       
 
+        elif song_id:
+            song_info_dict = MuseSongId.song_info(batch_idx_list)
         else:
             # song_info_dict: { '인덱스': {'disccomsseq' : '', 'trackno': ''} }
             song_info_dict = await loop.run_in_executor(
                 SearchService._query_executor,
-                SearchDAO.get_song_batch_info,
+                MuseTrace.bind(SearchDAO.get_song_batch_info),
                 key,
                 batch_idx_list
             )
@@ -109,66 +118,72 @@ class SearchService:
         # 병렬로 메타데이터와 mood 정보 가져오기
         song_meta_dict_task = loop.run_in_executor(
             SearchService._query_executor,
-            SearchDAO.get_song_batch_meta,
-            disc_track_pairs
-        )
-
-        mood_value_dict_task = loop.run_in_executor(
-            SearchService._query_executor,
-            SearchDAO.get_song_mood_value,
+            MuseTrace.bind(SearchDAO.get_song_batch_meta),
             disc_track_pairs
         )
-
-        mood_dict_task = loop.run_in_executor(
-            SearchService._query_executor,
-            SearchDAO.get_mood_dict
-        )
-
-        bpm_value_dict_task = loop.run_in_executor(
-            SearchService._query_executor,
-            SearchDAO.get_song_bpm_value,
-            disc_track_pairs
-        )
-        
-        song_meta_dict, mood_value_dict, mood_dict, bpm_value_dict = await asyncio.gather(
-            song_meta_dict_task,
-            mood_value_dict_task,
-            mood_dict_task,
-            bpm_value_dict_task
-        )
+        if with_mood:
+            song_meta_dict, (mood_value_dict, mood_dict, bpm_value_dict) = await asyncio.gather(
+                song_meta_dict_task,
+                SearchService._fetch_mood(disc_track_pairs)
+            )
+        else:
+            song_meta_dict = await song_meta_dict_task
         
         batch_results = {}
         for song_key, song_meta in song_meta_dict.items():
             idx_list = song_info_idx[song_key]
-            song_meta['count'] = 1
             if vibe_exist:
-                song_meta['dis'] = min([float(batched_dict[idx]) for idx in idx_list])
+                dis = min([float(batched_dict[idx]) for idx in idx_list])
             else:
-                song_meta['dis'] = (
-                    0.00001 if key == 'artist' and song_meta.get('artist') and 
+                match_field = SearchService._match_field.get(key)
+                dis = (
+                    SearchService._lexical_distance[key] if match_field and song_meta.get(match_field) and 
                     query_text.lower().replace(' ','').strip() in 
-                    song_meta['artist'].lower().replace(' ','').strip()
-                    else 0.02 if key == 'album_name' and song_meta.get('disc_name') and 
-                    query_text.lower().replace(' ','').strip() in 
-                    song_meta['disc_name'].lower().replace(' ','').strip()
-                    else 0.05 if key == 'title' and song_meta.get('song_name') and 
-                    query_text.lower().replace(' ','').strip() in 
-                    song_meta['song_name'].lower().replace(' ','').strip()
+                    song_meta[match_field].lower().replace(' ','').strip()
                     else min([float(batched_dict[idx]) for idx in idx_list])
                 )            
-            song_meta['index_name'] = key
-            song_meta['main_mood'] = (
+            hit = SongHit(song_meta, dis, key)
+            if with_mood:
+                hit.set_mood(SearchService._mood_fields(song_key, mood_value_dict, mood_dict, bpm_value_dict))
+            batch_results[song_key] = hit            
+        MuseMetrics.observe('muse_batch_process_seconds', time.perf_counter() - batch_start, key=key)
+        return batch_results
+
+    @staticmethod
+    async def _fetch_mood(disc_track_pairs: list) -> tuple:
+        """(mood_value_dict, mood_dict, bpm_value_dict) 병렬 조회"""
+        loop = asyncio.get_event_loop()
+        return await asyncio.gather(
+            loop.run_in_executor(
+                SearchService._query_executor,
+                MuseTrace.bind(SearchDAO.get_song_mood_value),
+                disc_track_pairs
+            ),
+            loop.run_in_executor(
+                SearchService._query_executor,
+                MuseTrace.bind(SearchDAO.get_mood_dict)
+            ),
+            loop.run_in_executor(
+                SearchService._query_executor,
+                MuseTrace.bind(SearchDAO.get_song_bpm_value),
+                disc_track_pairs
+            )
+        )
+
+    @staticmethod
+    def _mood_fields(song_key: str, mood_value_dict: dict, mood_dict: dict, bpm_value_dict: dict) -> dict:
+        return {
+            'main_mood': (
                 [mood_dict[mood] for mood in json.loads(mood_value_dict[song_key]['mood_list'])]
                 if song_key in mood_value_dict else []
-            )
-            song_meta['bpm'] = bpm_value_dict[song_key] if song_key in bpm_value_dict else 0
-            song_meta['energy_level'] = (
+            ),
+            'bpm': bpm_value_dict[song_key] if song_key in bpm_value_dict else 0,
+            'energy_level': (
                 ((mood_value_dict[song_key]['arousal']-1)/16 + 
                  (mood_value_dict[song_key]['valence']-1)/16)*100
                 if song_key in mood_value_dict else 50.0
             )
-            batch_results[song_key] = song_meta            
-        return batch_results
+        }
 
     @staticmethod
     def priority_score(index_name_set):
@@ -182,7 +197,7 @@ class SearchService:
     def filter_category(region, genre):
                 
         genre_set, category_dict = SearchDAO.get_song_genre(), SearchDAO.get_song_category()
-        logging.info(f'''{category_dict}, {genre_set}''')
+        Logger.payload('category', 'category', {'category': category_dict, 'genre': genre_set})
         if region not in category_dict:
             # 해외 ... 전세계 ...
             if genre in genre_set:
@@ -205,7 +220,7 @@ class SearchService:
                 return True, region
 
     @staticmethod
-    async def search_text(text: str, mood: list, vibe_only: bool, timeout: float = 30.0, playlist_id = None) -> Dict[str, List]:        
+    async def search_text(text: str, mood: list, vibe_only: bool, timeout: float = 30.0, playlist_id = None, playable_only: bool = False, page_size: Optional[int] = None) -> Dict[str, List]:        
 
         t1 = time.time()
 
@@ -215,6 +230,7 @@ class SearchService:
             llm_results = MuseLLM.get_request(text=text, mood=mood, llm_type='oss')                    
         t2 = time.time()
         logging.info(f'''LLM검색 완료({text}: {t2 - t1}''')        
+        MuseTrace.annotate(text=text, case=llm_results.get('case'), llm_model=llm_results.get('llm_model'))
         
         if 'artist' not in llm_results:
             llm_results['artist'] = []        
@@ -251,7 +267,14 @@ class SearchService:
         except Exception as e:
             logging.error(e)                
 
-        logging.info(llm_results)
+        Logger.payload('llm_results', 'LLM 결과', llm_results)
+
+        # 연도 / 장르 / 재생 가능 여부는 FAISS 검색 단계에서 id 필터로 적용 (속성 배열이 있는 key만)
+        filters = {
+            'year': llm_results.get('year'),
+            'category': llm_results.get('category'),
+            'playable': playable_only
+        }
 
         search_coroutines = []
         task_keys = []
@@ -260,7 +283,7 @@ class SearchService:
                
             if values and key in SearchService._index_mapping:                         
                 for value in values:
-                    job = SearchService._search_single_index(key=key, query_text=value, index_file_name=SearchService._index_mapping[key], vibe_exist=('vibe' in llm_results and llm_results['vibe']), playlist_id=playlist_id)
+                    job = SearchService._search_single_index(key=key, query_text=value, index_file_name=SearchService._index_mapping[key], vibe_exist=('vibe' in llm_results and llm_results['vibe']), playlist_id=playlist_id, filters=filters, with_mood=not page_size)
                     search_coroutines.append(job)
                     task_keys.append(key)                         
         try:
@@ -276,62 +299,16 @@ class SearchService:
         t3 = time.time()
         logging.info(f'''FAISS 검색 완료({text}): {t3 - t2}''')
 
-        merged = defaultdict(lambda: None)
-
-        for (query_key, group) in results_list:                
-            for key, song_info in group.items():                        
-                if merged[key] is None:
-                    # 처음 등장하는 곡이면 복사
-                    merged[key] = song_info.copy()
-                    merged[key]["index_name_set"] = set([merged[key]["index_name"]])      
-                    if query_key == 'vibe' and 'title' in task_keys and 'artist' not in task_keys:                        
-                        merged[key]["dis"] = 0.05 * merged[key]["dis"]              
-                                                       
-                else:                                        
-                    merged[key]["count"] += 1
-                    if query_key == 'vibe' and 'title' in task_keys and 'artist' not in task_keys:
-                        merged[key]["dis"] = 0.1 * merged[key]["dis"]                        
-                    if song_info.get("index_name") in merged[key]["index_name_set"]:                        
-                        merged[key]["dis"] = min(merged[key]["dis"] / 2, song_info.get("dis") / 2)                                                
-                    else:
-                        merged[key]["dis"] *= song_info.get("dis", 0.0)
-                        merged[key]["index_name_set"].add(song_info.get("index_name"))            
+        merged = MuseHits.merge(results_list, task_keys)
 
         t4 = time.time()
         logging.info(f'''결과 병합 완료({text}: {t4 - t3}''')        
+        MuseMetrics.observe('muse_merge_seconds', t4 - t3)
         
-        # title, vibe 점수 조작, hit_year면 올린다.                
-
-        for key, song in merged.items():
-            if 'vibe' in task_keys and 'title' in task_keys and song['hit_year']:
-                # song['dis'] *= 0.5
-                song['dis'] *= 0.001
-
-        # dict → list 변환
-        merged_list = list(merged.values())
-
-        merged_list.sort(key=lambda x: x["dis"], reverse=False)     
-        # merged_list.sort(key=lambda x: (SearchService.priority_score(x["index_name_set"]), x["dis"]), reverse=False)   
-        
-        total_dict = {}
-
-        for song_dict in merged_list:
-            if not vibe_only and len(total_dict) >= 500:
-                break
-            if vibe_only and len(total_dict) >= 5000:
-                break
-            song_key_artist = song_dict['artist'].lower().replace(' ','').strip() if song_dict['artist'] else ''
-            song_key_title = song_dict['song_name'].lower().replace(' ','').strip() if song_dict['song_name'] else ''            
-            song_key = f'''{song_key_artist}_{song_key_title} '''
-            if song_key not in total_dict:
-                total_dict[song_key] = deepcopy(song_dict)                
-                continue
-            if total_dict[song_key]['hit_year']:
-               continue
-            elif song_dict['hit_year']:                
-                total_dict[song_key] = deepcopy(song_dict)
-
-        total_list = [ v for _, v in total_dict.items() ]           
+        # title, vibe 점수 조작, hit_year면 올린 뒤 거리 순 정렬, 아티스트 + 곡명 중복 제거
+        merged_list = MuseHits.rank(merged, task_keys)
+        total_list = MuseHits.dedup(merged_list, 5000 if vibe_only else 500)
+        MuseMetrics.observe('muse_dedup_seconds', time.time() - t4, endpoint='text')
 
         total_results = {
             'year_list': llm_results['year'] if 'year' in llm_results else [],
@@ -339,11 +316,102 @@ class SearchService:
             'search_keyword': llm_results,
             'results': total_list
         }        
-        
+
+        if page_size:
+            return await SearchService._paginate(total_results, page_size)
+        # 응답으로 나가는 곡만 dict로 변환
+        total_results['results'] = [hit.to_dict() for hit in total_list]
+        return total_results
+
+    @staticmethod
+    async def _fill_mood(songs: list):
+        """페이지 곡에만 mood / bpm / energy_level 채움"""
+        if not songs:
+            return
+        mood_value_dict, mood_dict, bpm_value_dict = await SearchService._fetch_mood(
+            [(song['disc_comm_seq'], song['track_no']) for song in songs]
+        )
+        for song in songs:
+            song.update(SearchService._mood_fields(f"{song['disc_comm_seq']}_{song['track_no']}", mood_value_dict, mood_dict, bpm_value_dict))
+
+    @staticmethod
+    async def _paginate(total_results: dict, page_size: int) -> dict:
+        """
+        순위가 매겨진 전체 결과는 (곡 id, 점수)만 Redis에 보관하고 첫 페이지만 반환
+        다음 페이지는 get_page(cursor)로 LLM / 임베딩 / FAISS 없이 해당 페이지 메타데이터만 조회
+        """
+        page_size = min(max(page_size, 1), SearchService._max_page_size)
+        hits = total_results['results']
+        next_cursor = None
+        if len(hits) > page_size:
+            result_id = uuid.uuid4().hex
+            stored = {
+                'year_list': total_results['year_list'],
+                'popular': total_results['popular'],
+                'search_keyword': total_results['search_keyword'],
+                'entries': [
+                    [hit.meta['disc_comm_seq'], hit.meta['track_no'], hit.dis, hit.count, hit.index_name, sorted(hit.index_names or [hit.index_name])]
+                    for hit in hits
+                ]
+            }
+            loop = asyncio.get_event_loop()
+            if await loop.run_in_executor(SearchService._query_executor, MuseTrace.bind(RedisClient.set_search_result), result_id, stored, SearchService._result_ttl):
+                next_cursor = f'{result_id}.{page_size}'
+
+        page = [hit.to_dict() for hit in hits[:page_size]]
+        await SearchService._fill_mood(page)
+        total_results['results'] = page
+        total_results['total'] = len(hits)
+        total_results['next_cursor'] = next_cursor
         return total_results
+
+    @staticmethod
+    async def get_page(cursor: str, page_size: int) -> Optional[dict]:
+        """search_text(page_size=...)가 반환한 cursor의 다음 페이지 (만료 / 잘못된 cursor면 None)"""
+        try:
+            result_id, offset = cursor.rsplit('.', 1)
+            offset = int(offset)
+        except ValueError:
+            return None
+        page_size = min(max(page_size, 1), SearchService._max_page_size)
+
+        loop = asyncio.get_event_loop()
+        stored = await loop.run_in_executor(SearchService._query_executor, MuseTrace.bind(RedisClient.get_search_result), result_id)
+        if stored is None:
+            return None
+
+        entries = stored['entries'][offset:offset + page_size]
+        song_meta_dict = await loop.run_in_executor(
+            SearchService._query_executor,
+            MuseTrace.bind(SearchDAO.get_song_batch_meta),
+            [(disccommseq, trackno) for disccommseq, trackno, *_ in entries]
+        )
+        page = []
+        for disccommseq, trackno, dis, count, index_name, index_name_set in entries:
+            song = song_meta_dict.get(f'{disccommseq}_{trackno}')
+            if song is None:
+                continue
+            song.update({
+                'dis': dis,
+                'count': count,
+                'index_name': index_name,
+                'index_name_set': set(index_name_set)
+            })
+            page.append(song)
+        await SearchService._fill_mood(page)
+
+        next_offset = offset + len(entries)
+        return {
+            'year_list': stored['year_list'],
+            'popular': stored['popular'],
+            'search_keyword': stored['search_keyword'],
+            'results': page,
+            'total': len(stored['entries']),
+            'next_cursor': f'{result_id}.{next_offset}' if next_offset < len(stored['entries']) else None
+        }
     
     @staticmethod
-    async def _search_single_index(key: str, query_text: str, index_file_name: str, vibe_exist: bool = False, timeout: float = 30.0, playlist_id: str = None) -> List:
+    async def _search_single_index(key: str, query_text: str, index_file_name: str, vibe_exist: bool = False, timeout: float = 30.0, playlist_id: str = None, filters: Dict = None, with_mood: bool = True) -> List:
         try:
             # 공유 스레드 풀 사용 (교착상태 방지)
             loop = asyncio.get_event_loop()
@@ -352,8 +420,8 @@ class SearchService:
             result = await asyncio.wait_for(
                 loop.run_in_executor(
                     SearchService._executor,  # 명시적 executor 사용
-                    SearchService._faiss_search,
-                    key, query_text, index_file_name, vibe_exist, playlist_id
+                    MuseTrace.bind(SearchService._faiss_search, span='index', key=key, query=query_text),
+                    key, query_text, index_file_name, vibe_exist, playlist_id, filters, with_mood
                 ),
                 timeout=timeout
             )
@@ -366,19 +434,51 @@ class SearchService:
             return []
     
     @staticmethod
-    def _faiss_search(key: str, query_text: Any, index_file_name: str, vibe_exist: bool, playlist_id: str) -> Tuple:
+    def _faiss_search(key: str, query_text: Any, index_file_name: str, vibe_exist: bool, playlist_id: str, filters: Dict = None, with_mood: bool = True) -> Tuple:
         #artist, title, vibe
         try:                
             t1 = time.time()
             query_vector = EmbeddingService.get_vector(key=key, text=query_text.lower().replace(' ',''))                       
-            if key not in ['artist', 'title', 'lyrics', 'lyrics_3', 'lyrics_summary', 'vibe', 'album_name']:
-            # if key not in ['artist', 'title', 'lyrics', 'lyrics_summary', 'vibe']:
+            if key not in SearchService._index_mapping:
                 return (key, {})
         
+            lexical_ids = None
+            k = SearchService._k_mapping[key]
+            # 역색인 / float16 사본은 FAISS id == MySQL idx - 1 기준으로 만들어지므로 song id 인덱스에는 사용하지 않음
+            song_id = MuseFaiss.is_song_id(key)
+            if not song_id and key in SearchService._lexical_k_mapping:
+                with MuseMetrics.timer('muse_lexical_seconds', key=key):
+                    lexical_ids = MuseNameIndex.lookup(key, query_text)
+                # 이름이 일치하는 곡이 있을 때만 k를 줄임 (일치 곡이 없으면 벡터 후보를 그대로 유지)
+                # vibe가 함께 있으면 역색인 결과를 합치지 않으므로 기존 k 유지
+                if lexical_ids is not None and len(lexical_ids) and not vibe_exist:
+                    k = SearchService._lexical_k_mapping[key]
+                lexical_distance = SearchService._lexical_distance.get(key, 0.0)
+            elif not song_id and key in SearchService._phrase_k_mapping:
+                with MuseMetrics.timer('muse_lexical_seconds', key=key):
+                    phrase = MuseLyricsIndex.lookup(key, query_text)
+                if phrase is not None:
+                    lexical_ids, lexical_distance, exact = phrase
+                    if exact and not vibe_exist:
+                        k = SearchService._phrase_k_mapping[key]
+
+            search_k = k
+            refine = MuseRefine.available(key) and not song_id
+            if refine:
+                k = min(k, SearchService._refine_k_mapping.get(key, k))
+                search_k = MuseRefine.candidate_k(k)
+
             if playlist_id:
-                D, I = FaissService.search_with_include(key=key, query_vector=query_vector, k=SearchService._k_mapping[key], playlist_id=playlist_id)            
+                D, I = FaissService.search_with_include(key=key, query_vector=query_vector, k=search_k, playlist_id=playlist_id, filters=filters)            
             else:
-                D, I = FaissService.search(key=key, query_vector=query_vector, k=SearchService._k_mapping[key])            
+                D, I = FaissService.search(key=key, query_vector=query_vector, k=search_k, filters=filters)            
+
+            if refine:
+                with MuseMetrics.timer('muse_refine_seconds', key=key):
+                    D, I = MuseRefine.rerank(key, query_vector, D, I, k)
+
+            if lexical_ids is not None and len(lexical_ids):
+                D, I = FaissService.fuse_lexical(key, lexical_ids, lexical_distance, D, I, playlist_id=playlist_id, filters=filters, vibe_exist=vibe_exist)
             
             # logging.info(f''' FAISS SEARCH: {key}, {query_text} {D} {I}''')
             if D is None or I is None:
@@ -392,8 +492,10 @@ class SearchService:
             batched_D = []
             batched_I = []
 
+            # FAISS id → MySQL idx (song id 인덱스는 id 그대로 디코딩)
+            id_base = 0 if song_id else 1
             for i in range(0, len(I[0]), SearchService._batch_size):
-                batched_I.append([ int(I[0][idx])+1 for idx in range(i, min(len(I[0]), i+SearchService._batch_size))])                                
+                batched_I.append([ int(I[0][idx])+id_base for idx in range(i, min(len(I[0]), i+SearchService._batch_size))])                                
                 batched_D.append([ float(D[0][idx]) for idx in range(i, min(len(I[0]), i+SearchService._batch_size))])                            
             
             t2 = time.time()                
@@ -401,7 +503,7 @@ class SearchService:
             # 병렬 처리를 위한 태스크 생성
             tasks = []
             for batch_idx_list, batch_dist_list in zip(batched_I, batched_D):
-                tasks.append(SearchService._process_batch(key, query_text, batch_idx_list, batch_dist_list, vibe_exist))
+                tasks.append(SearchService._process_batch(key, query_text, batch_idx_list, batch_dist_list, vibe_exist, with_mood))
             
             # 이벤트 루프에서 비동기 함수 실행
             try:
@@ -465,6 +567,16 @@ class SearchService:
             # rapidfuzz가 없으면 정규화 매칭만 사용
             return False
 
+    @staticmethod
+    def _song_vectors(key, disccommseq, trackno, dao_method) -> List[np.ndarray]:
+        """기준 곡 벡터: 로컬 스냅샷(MuseSnapshot)에 있으면 mmap에서, 없으면 SearchDAO blob 조회 후 decode"""
+        vectors = MuseSnapshot.vectors(key, disccommseq, trackno)
+        if vectors is not None:
+            return vectors
+        # raw float32 / float16, 기존 npy blob 모두 지원 (MuseVectorCodec)
+        dimension = (MuseRegistry.get(key) or {}).get('dimension')
+        return [MuseVectorCodec.decode(blob, dimension) for blob in dao_method(key=key, disccommseq=disccommseq, trackno=trackno)]
+
     @staticmethod
     async def search_similar_song(key, disccommseq, trackno, playlist_id=None):
         try:
@@ -477,30 +589,34 @@ class SearchService:
             
             #SearchDAO    에서 disc_comm_seq, track_no 관련된 곡 시퀀스 정보 가져오기
             if key == 'vibe':
-                embedding_results = SearchDAO.get_song_clap_embedding(key=key, disccommseq=disccommseq, trackno=trackno)
+                embedding_results = SearchService._song_vectors(key, disccommseq, trackno, SearchDAO.get_song_clap_embedding)
             elif key == 'lyrics_summary':
-                embedding_results = SearchDAO.get_song_clap_lyric_summary(key=key, disccommseq=disccommseq, trackno=trackno)                                
+                embedding_results = SearchService._song_vectors(key, disccommseq, trackno, SearchDAO.get_song_clap_lyric_summary)
                 if not embedding_results:
                     key = 'title'
-                    embedding_results=SearchDAO.get_song_bgem3_song_name(key=key, disccommseq=disccommseq, trackno=trackno)
+                    embedding_results = SearchService._song_vectors(key, disccommseq, trackno, SearchDAO.get_song_bgem3_song_name)
                     
             else:
                 embedding_results = []
             
-            embedding_results = [ np.atleast_2d(np.load(io.BytesIO(embedding_result), allow_pickle=True))[0] for embedding_result in embedding_results]
             batched_I = []
+            song_id = MuseFaiss.is_song_id(key)
+            id_base = 0 if song_id else 1
 
             if playlist_id:
                 for embedding_result in embedding_results:
                     D, I = FaissService.search_with_include(key=key, query_vector=embedding_result, k=100, playlist_id=playlist_id)                                                    
-                    batched_I.append([int(idx)+1 for idx in I[0]])
+                    batched_I.append([int(idx)+id_base for idx in I[0]])
             else:
                 for embedding_result in embedding_results:
                     D, I = FaissService.search(key=key, query_vector=embedding_result, k=100)                                                    
-                    batched_I.append([int(idx)+1 for idx in I[0]])
+                    batched_I.append([int(idx)+id_base for idx in I[0]])
             
             for _, batch_idx_list in enumerate(batched_I):
-                song_info_dict = SearchDAO.get_song_batch_info(key=key, idx_list=batch_idx_list)
+                if song_id:
+                    song_info_dict = MuseSongId.song_info(batch_idx_list)
+                else:
+                    song_info_dict = SearchDAO.get_song_batch_info(key=key, idx_list=batch_idx_list)
                 if song_info_dict:
                     disc_track_pairs = []
                     for _, song_info_list in song_info_dict.items():
@@ -532,6 +648,7 @@ class SearchService:
             sorted_results = sorted(results.items(), key=lambda x: x[1]['count'], reverse=True)
             
             # 중복 제거 로직 추가
+            dedup_start = time.time()
             final_tracks = []
             seen_songs = []  # (artist, title) 튜플 저장
             
@@ -566,6 +683,7 @@ class SearchService:
                         'mp3_path_flag': meta['mp3_path_flag']
                     })
                     seen_songs.append((current_artist, current_title))
+            MuseMetrics.observe('muse_dedup_seconds', time.time() - dedup_start, endpoint='similar')
             
             return {'similar_tracks': final_tracks}
         except Exception as e:
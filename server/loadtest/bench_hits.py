@@ -0,0 +1,171 @@
+"""
+검색 결과 hit 표현 벤치마크 (dict vs SongHit)
+
+search_text의 index별 결과(_process_batch) → 병합 → 순위 / 중복 제거 → 응답 dict 변환 구간을
+기존 dict 방식(곡마다 row dict 수정 / copy / deepcopy)과 SongHit(__slots__, row 참조) 방식으로 실행하고
+tracemalloc 기준 최대 메모리 / 할당 블록 수와 소요 시간을 비교해 JSON으로 저장
+
+사용 예)
+    cd server && python loadtest/bench_hits.py --keys vibe=10000,title=5000,artist=5000 --output ./loadtest/results/hits.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from copy import deepcopy
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app')
+sys.path.insert(0, APP_PATH)
+from common.hit_common import SongHit, MuseHits
+
+MOODS = ['잔잔한', '신나는', '감성적인', '몽환적인', '슬픈', '따뜻한', '강렬한', '로맨틱한']
+
+
+def make_rows(keys, catalog_size, seed):
+    """key별 Oracle 메타 row (get_song_batch_meta 결과처럼 key마다 별도 dict)"""
+    rng = random.Random(seed)
+    groups = []
+    for key, k in keys.items():
+        rows = {}
+        for song_no in rng.sample(range(catalog_size), k):
+            disccommseq, trackno = 100000 + song_no // 12, str(song_no % 12 + 1)
+            year = str(1970 + song_no % 55)
+            rows[f'{disccommseq}_{trackno}'] = ({
+                'artist': f'아티스트 {song_no % 997}', 'player': None, 'band_name': None,
+                'song_name': f'노래 제목 {song_no % (catalog_size // 2)}', 'play_time': '0330',
+                'disc_name': f'앨범 {song_no // 12}', 'disc_comm_seq': disccommseq, 'track_no': trackno,
+                'mastering_year': year, 'hit_year': year if song_no % 3 == 0 else None,
+                'disc_genre_txt': '국내 발라드', 'jpg_file_name': f'/images/{disccommseq}.jpg',
+                'mp3_path': f'/mp3/{disccommseq}/{trackno}.mp3', 'mp3_path_flag': 1
+            }, rng.random())
+        groups.append((key, rows))
+    return groups
+
+
+def mood_fields(rng):
+    return {'main_mood': rng.sample(MOODS, 3), 'bpm': {'bpm': rng.uniform(60, 180)}, 'energy_level': rng.uniform(0, 100)}
+
+
+def legacy_pipeline(groups, task_keys, limit):
+    """변경 전 search_service 구현 (row dict에 점수 / mood를 쓰고 병합 시 copy, 중복 제거 시 deepcopy)"""
+    rng = random.Random(0)
+    results_list = []
+    for key, rows in groups:
+        batch_results = {}
+        for song_key, (song_meta, dis) in rows.items():
+            song_meta['count'] = 1
+            song_meta['dis'] = dis
+            song_meta['index_name'] = key
+            song_meta.update(mood_fields(rng))
+            batch_results[song_key] = song_meta
+        results_list.append((key, batch_results))
+
+    merged = {}
+    for (query_key, group) in results_list:
+        for key, song_info in group.items():
+            if merged.get(key) is None:
+                merged[key] = song_info.copy()
+                merged[key]['index_name_set'] = set([merged[key]['index_name']])
+                if query_key == 'vibe' and 'title' in task_keys and 'artist' not in task_keys:
+                    merged[key]['dis'] = 0.05 * merged[key]['dis']
+            else:
+                merged[key]['count'] += 1
+                if query_key == 'vibe' and 'title' in task_keys and 'artist' not in task_keys:
+                    merged[key]['dis'] = 0.1 * merged[key]['dis']
+                if song_info.get('index_name') in merged[key]['index_name_set']:
+                    merged[key]['dis'] = min(merged[key]['dis'] / 2, song_info.get('dis') / 2)
+                else:
+                    merged[key]['dis'] *= song_info.get('dis', 0.0)
+                    merged[key]['index_name_set'].add(song_info.get('index_name'))
+
+    for key, song in merged.items():
+        if 'vibe' in task_keys and 'title' in task_keys and song['hit_year']:
+            song['dis'] *= 0.001
+    merged_list = list(merged.values())
+    merged_list.sort(key=lambda x: x['dis'])
+
+    total_dict = {}
+    for song_dict in merged_list:
+        if len(total_dict) >= limit:
+            break
+        song_key_artist = song_dict['artist'].lower().replace(' ', '').strip() if song_dict['artist'] else ''
+        song_key_title = song_dict['song_name'].lower().replace(' ', '').strip() if song_dict['song_name'] else ''
+        song_key = f'''{song_key_artist}_{song_key_title} '''
+        if song_key not in total_dict:
+            total_dict[song_key] = deepcopy(song_dict)
+            continue
+        if total_dict[song_key]['hit_year']:
+            continue
+        elif song_dict['hit_year']:
+            total_dict[song_key] = deepcopy(song_dict)
+    return [v for _, v in total_dict.items()]
+
+
+def hit_pipeline(groups, task_keys, limit):
+    """SongHit 구현 (row는 참조, 응답 곡만 dict 변환)"""
+    rng = random.Random(0)
+    results_list = []
+    for key, rows in groups:
+        batch_results = {}
+        for song_key, (song_meta, dis) in rows.items():
+            hit = SongHit(song_meta, dis, key)
+            hit.set_mood(mood_fields(rng))
+            batch_results[song_key] = hit
+        results_list.append((key, batch_results))
+
+    merged = MuseHits.merge(results_list, task_keys)
+    hits = MuseHits.dedup(MuseHits.rank(merged, task_keys), limit)
+    return [hit.to_dict() for hit in hits]
+
+
+def measure(pipeline, keys, catalog_size, limit, repeat):
+    task_keys = list(keys)
+    timings, peaks, blocks = [], [], []
+    for i in range(repeat):
+        groups = make_rows(keys, catalog_size, seed=i)
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        start = time.perf_counter()
+        results = pipeline(groups, task_keys, limit)
+        elapsed = time.perf_counter() - start
+        after = tracemalloc.take_snapshot()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        blocks.append(sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0))
+        timings.append(elapsed * 1000)
+        del results
+    return {
+        'ms_p50': round(statistics.median(timings), 2),
+        'peak_mb': round(statistics.median(peaks) / 1024 / 1024, 2),
+        'retained_blocks': int(statistics.median(blocks))
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--keys', type=str, default='vibe=10000,title=5000,artist=5000', help='index key=k list')
+    parser.add_argument('--catalog', type=int, default=40000, help='distinct songs (overlap between keys)')
+    parser.add_argument('--limit', type=int, default=500, help='dedup limit (vibe_only 5000)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', type=str, default=None)
+    args = parser.parse_args()
+
+    keys = {key: int(k) for key, k in (item.split('=') for item in args.keys.split(',') if item)}
+    # 할당 블록 수는 tracemalloc 시작 / 종료 사이 증가분 (응답 dict 포함), 시간은 tracemalloc 오버헤드 포함
+    report = {
+        'keys': keys,
+        'catalog': args.catalog,
+        'limit': args.limit,
+        'dict': measure(legacy_pipeline, keys, args.catalog, args.limit, args.repeat),
+        'song_hit': measure(hit_pipeline, keys, args.catalog, args.limit, args.repeat)
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            f.write(text)
@@ -0,0 +1,124 @@
+"""
+/search/text 응답 직렬화 벤치마크
+
+search_text 결과와 같은 구조의 합성 곡 dict(Oracle row + mood / bpm / index_name_set)로
+기존 방식(jsonable_encoder + JSONResponse)과 MuseJSONResponse(orjson) / msgpack / compact 스키마의
+응답 크기(원본 / gzip)와 인코딩 시간을 비교해 JSON으로 저장
+
+사용 예)
+    cd server && python loadtest/bench_serialize.py --rows 500,5000 --output ./loadtest/results/serialize.json
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+import numpy as np
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app')
+sys.path.insert(0, APP_PATH)
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from common.response_common import MuseJSONResponse, MsgpackResponse, msgpack, orjson
+from common.result_common import MuseResult
+
+MOODS = ['잔잔한', '신나는', '감성적인', '몽환적인', '슬픈', '따뜻한', '강렬한', '로맨틱한']
+INDEX_NAMES = ['vibe', 'title', 'artist', 'lyrics', 'lyrics_3', 'lyrics_summary', 'album_name']
+
+
+def make_result(rows, seed=0):
+    rng = random.Random(seed)
+    songs = []
+    for song_no in range(rows):
+        year = str(rng.randint(1970, 2025))
+        index_name = rng.choice(INDEX_NAMES)
+        songs.append({
+            'artist': f'아티스트 {song_no % 997}',
+            'player': None,
+            'band_name': None,
+            'song_name': f'노래 제목 {song_no}',
+            'play_time': f'0{rng.randint(2, 5)}{rng.randint(10, 59)}',
+            'disc_name': f'앨범 {song_no // 12}',
+            'disc_comm_seq': 100000 + song_no // 12,
+            'track_no': str(song_no % 12 + 1),
+            'mastering_year': year,
+            'hit_year': year if rng.random() < 0.3 else None,
+            'disc_genre_txt': rng.choice(['국내 발라드', '국내 힙합', '해외 팝', '재즈']),
+            'jpg_file_name': f'/images/{100000 + song_no // 12}.jpg',
+            'mp3_path': f'/mp3/{100000 + song_no // 12}/{song_no % 12 + 1}.mp3' if rng.random() < 0.8 else None,
+            'mp3_path_flag': 1,
+            'count': rng.randint(1, 3),
+            # _process_batch / search_text 병합 결과처럼 float 연산 결과
+            'dis': rng.random() * 0.5,
+            'index_name': index_name,
+            'index_name_set': {index_name, rng.choice(INDEX_NAMES)},
+            'main_mood': rng.sample(MOODS, 3),
+            'bpm': {'bpm': float(np.float32(rng.uniform(60, 180)))},
+            'energy_level': rng.uniform(0, 100)
+        })
+    return {
+        'year_list': [],
+        'popular': False,
+        'search_keyword': {'vibe': ['비 오는 날 듣기 좋은 잔잔한 노래'], 'case': 6, 'year': [], 'popular': False},
+        'results': songs
+    }
+
+
+def measure(encode, repeat):
+    timings = []
+    body = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = encode()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'bytes': len(body),
+        'gzip_bytes': len(gzip.compress(body, compresslevel=9)),
+        'encode_ms_p50': round(float(np.percentile(timings, 50)), 2),
+        'encode_ms_min': round(min(timings), 2)
+    }
+
+
+def run(rows, repeat):
+    result = make_result(rows)
+    compact = MuseResult.compact_response(make_result(rows), None)
+    compact_fields = MuseResult.compact_response(make_result(rows), ['artist', 'song_name', 'disc_name', 'jpg_file_name', 'playable', 'dis'])
+
+    cases = {
+        # 기존 경로: FastAPI가 dict 반환 시 jsonable_encoder 후 json.dumps
+        'default_json': lambda: JSONResponse(content=jsonable_encoder(result)).body,
+        'fast_json': lambda: MuseJSONResponse(content=result).body,
+        'compact_fast_json': lambda: MuseJSONResponse(content=compact).body,
+        'compact_fields_fast_json': lambda: MuseJSONResponse(content=compact_fields).body
+    }
+    if msgpack is not None:
+        cases['compact_msgpack'] = lambda: MsgpackResponse(content=compact).body
+
+    report = {name: measure(encode, repeat) for name, encode in cases.items()}
+    baseline = report['default_json']
+    for stats in report.values():
+        stats['bytes_ratio'] = round(stats['bytes'] / baseline['bytes'], 3)
+        stats['speedup'] = round(baseline['encode_ms_p50'] / stats['encode_ms_p50'], 2) if stats['encode_ms_p50'] else None
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=str, default='500,5000', help='comma separated result sizes')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', type=str, default=None)
+    args = parser.parse_args()
+
+    report = {
+        'orjson': orjson is not None,
+        'msgpack': msgpack is not None,
+        'rows': {rows: run(int(rows), args.repeat) for rows in args.rows.split(',') if rows}
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            f.write(text)
@@ -0,0 +1,325 @@
+"""
+부하 테스트용 로컬 대체 백엔드
+
+- config 모듈: 임시 디렉토리 기준 경로/접속 정보
+- MySQL / Oracle: SQLite 파일 DB (SearchDAO의 실제 SQL을 그대로 실행)
+- Redis: fakeredis
+- FAISS 인덱스: 합성 벡터로 key별 IVF 인덱스 생성
+
+server/app 모듈을 import 하기 전에 install()을 호출해야 함
+"""
+import io
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import types
+import zlib
+import numpy as np
+
+class SyntheticVectors:
+    """
+    임베딩 stub과 FAISS 인덱스가 공유하는 topic 중심 벡터
+
+    카탈로그 벡터와 쿼리 벡터를 같은 topic 중심 주변에서 생성하여
+    artist/title/lyrics threshold(0.9)를 통과하는 결과가 나오도록 함
+    """
+    dimensions = {'bgem3': 1024, 'clap': 512}
+
+    def __init__(self, n_topics=64, seed=0):
+        self.n_topics = n_topics
+        self.centers = {}
+        for model, d in self.dimensions.items():
+            rng = np.random.default_rng([seed, d])
+            self.centers[model] = self._normalize(rng.standard_normal((n_topics, d), dtype=np.float32))
+
+    @staticmethod
+    def _normalize(x):
+        return (x / np.linalg.norm(x, axis=-1, keepdims=True)).astype('float32')
+
+    def catalog(self, model, n, seed):
+        rng = np.random.default_rng([seed, n])
+        centers = self.centers[model]
+        noise = rng.standard_normal((n, centers.shape[1]), dtype=np.float32) * (0.3 / np.sqrt(centers.shape[1]))
+        return self._normalize(centers[np.arange(n) % self.n_topics] + noise)
+
+    def query(self, model, text):
+        seed = zlib.crc32(text.encode('utf-8'))
+        rng = np.random.default_rng(seed)
+        centers = self.centers[model]
+        noise = rng.standard_normal(centers.shape[1], dtype=np.float32) * (0.1 / np.sqrt(centers.shape[1]))
+        return self._normalize(centers[seed % self.n_topics] + noise)
+
+
+class FakeCatalog:
+    """SearchDAO가 조회하는 MySQL / Oracle 테이블을 SQLite로 생성"""
+    tracks_per_album = 12
+    vibe_chunks = 2
+    lyrics_windows = 3
+    moods = {
+        'calm': '차분한', 'happy': '행복한', 'sad': '슬픈', 'energetic': '신나는', 'romantic': '로맨틱한',
+        'dreamy': '몽환적인', 'dark': '어두운', 'groovy': '그루비한', 'hopeful': '희망적인', 'lonely': '쓸쓸한'
+    }
+    genres = ['재즈', '힙합', '댄스', '락', '팝', '포크', '일렉', 'R&B', '발라드', 'OST']
+
+    # key → (테이블, 모델, 곡당 row 수)
+    tables = {
+        'artist': ('tb_embedding_bgem3_artist_h', 'bgem3', 1),
+        'title': ('tb_embedding_bgem3_song_name_h', 'bgem3', 1),
+        'vibe': ('tb_embedding_clap_h', 'clap', vibe_chunks),
+        'lyrics': ('tb_embedding_bgem3_lyrics_slide_h', 'bgem3', lyrics_windows),
+        'lyrics_3': ('tb_embedding_bgem3_lyrics_3_slide_h', 'bgem3', lyrics_windows),
+        'lyrics_summary': ('tb_embedding_clap_lyrics_summary_h', 'clap', 1),
+        'album_name': ('tb_embedding_bgem3_album_name_h', 'bgem3', None)
+    }
+
+    def __init__(self, base_path, n_songs, vectors, seed=0):
+        self.base_path = base_path
+        self.n_songs = n_songs
+        self.vectors = vectors
+        self.seed = seed
+        self.mysql_path = f'{base_path}/mysql.db'
+        self.muse_path = f'{base_path}/muse.db'
+        self.mibis_path = f'{base_path}/mibis.db'
+        self.rows = {}
+
+    def song(self, song_no):
+        return 100000 + song_no // self.tracks_per_album, f'{song_no % self.tracks_per_album + 1:02d}'
+
+    @staticmethod
+    def _blob(vector):
+        buffer = io.BytesIO()
+        np.save(buffer, vector.reshape(1, -1))
+        return buffer.getvalue()
+
+    def build(self):
+        rng = np.random.default_rng(self.seed)
+        n_albums = (self.n_songs + self.tracks_per_album - 1) // self.tracks_per_album
+
+        mibis = sqlite3.connect(self.mibis_path)
+        mibis.executescript('''
+            CREATE TABLE MI_SONG_INFO (DISC_COMM_SEQ INTEGER, TRACK_NO TEXT, ARTIST TEXT, PLAYER TEXT, BAND_NAME TEXT,
+                SONG_NAME TEXT, PLAY_TIME TEXT, MASTERING_YEAR TEXT, HIT_YEAR TEXT, MP3_PATH TEXT);
+            CREATE INDEX MI_SONG_INFO_PK ON MI_SONG_INFO (DISC_COMM_SEQ, TRACK_NO);
+            CREATE TABLE MI_DISC_INFO (DISC_COMM_SEQ INTEGER PRIMARY KEY, DISC_NAME TEXT, DISC_GENRE_TXT TEXT);
+            CREATE TABLE MI_DISC_COMM_INFO (DISC_COMM_SEQ INTEGER PRIMARY KEY, JPG_FILE_NAME TEXT);
+        ''')
+        songs = []
+        for song_no in range(self.n_songs):
+            disccommseq, trackno = self.song(song_no)
+            year = int(rng.integers(1970, 2026))
+            songs.append((
+                disccommseq, trackno, f'artist {song_no % 997}', None, None, f'song {song_no}', '0330',
+                str(year), str(year) if rng.random() < 0.3 else None,
+                f'/mp3/{disccommseq}_{trackno}.mp3' if rng.random() < 0.8 else None
+            ))
+        mibis.executemany('INSERT INTO MI_SONG_INFO VALUES (?,?,?,?,?,?,?,?,?,?)', songs)
+        mibis.executemany('INSERT INTO MI_DISC_INFO VALUES (?,?,?)', [
+            (100000 + album_no, f'album {album_no}', self.genres[album_no % len(self.genres)]) for album_no in range(n_albums)
+        ])
+        mibis.executemany('INSERT INTO MI_DISC_COMM_INFO VALUES (?,?)', [
+            (100000 + album_no, f'{100000 + album_no}.jpg') for album_no in range(n_albums)
+        ])
+        mibis.commit()
+        mibis.close()
+
+        muse = sqlite3.connect(self.muse_path)
+        muse.executescript('''
+            CREATE TABLE tb_mood_mapping_m (eng_mood TEXT, kor_mood TEXT);
+            CREATE TABLE tb_info_song_mood_h (disccommseq INTEGER, trackno TEXT, mood_list TEXT, arousal REAL, valence REAL);
+            CREATE INDEX tb_info_song_mood_h_pk ON tb_info_song_mood_h (disccommseq, trackno);
+            CREATE TABLE tb_info_song_bpm_h (disccommseq INTEGER, trackno TEXT, bpm REAL);
+            CREATE INDEX tb_info_song_bpm_h_pk ON tb_info_song_bpm_h (disccommseq, trackno);
+            CREATE TABLE tb_info_song_category_m (region TEXT, genre TEXT, valid INTEGER);
+        ''')
+        mood_names = list(self.moods)
+        muse.executemany('INSERT INTO tb_mood_mapping_m VALUES (?,?)', list(self.moods.items()))
+        muse.executemany('INSERT INTO tb_info_song_mood_h VALUES (?,?,?,?,?)', [
+            (*self.song(song_no), json.dumps([mood_names[(song_no + i) % len(mood_names)] for i in range(3)]),
+             float(rng.uniform(1, 9)), float(rng.uniform(1, 9)))
+            for song_no in range(self.n_songs)
+        ])
+        muse.executemany('INSERT INTO tb_info_song_bpm_h VALUES (?,?,?)', [
+            (*self.song(song_no), float(rng.integers(60, 180))) for song_no in range(self.n_songs)
+        ])
+        muse.executemany('INSERT INTO tb_info_song_category_m VALUES (?,?,1)', [
+            (region, genre) for region in ('국내', '외국', '전체') for genre in self.genres
+        ])
+        muse.commit()
+        muse.close()
+
+        mysql = sqlite3.connect(self.mysql_path)
+        for key, (table, model, per_song) in self.tables.items():
+            if key == 'album_name':
+                mysql.execute(f'CREATE TABLE {table} (idx INTEGER PRIMARY KEY, disccommseq INTEGER, album_name_embedding BLOB)')
+                mysql.executemany(f'INSERT INTO {table} VALUES (?,?,NULL)', [
+                    (album_no + 1, 100000 + album_no) for album_no in range(n_albums)
+                ])
+                self.rows[key] = n_albums
+                continue
+
+            mysql.execute(f'''CREATE TABLE {table} (idx INTEGER PRIMARY KEY, disccommseq INTEGER, trackno TEXT,
+                chunk_num INTEGER, summary_num INTEGER, song_name TEXT, embedding_result BLOB, song_name_embedding BLOB)''')
+            mysql.execute(f'CREATE INDEX {table}_song ON {table} (disccommseq, trackno)')
+
+            n_rows = self.n_songs * per_song
+            # 유사곡 검색(vibe, lyrics_summary, title fallback)에서 읽는 테이블만 임베딩 blob 저장
+            store_blob = key in ('vibe', 'lyrics_summary', 'title')
+            vectors = self.vectors.catalog(model, n_rows, seed=self.seed) if store_blob else None
+            rows = []
+            for row_no in range(n_rows):
+                song_no = row_no // per_song
+                blob = self._blob(vectors[row_no]) if store_blob else None
+                rows.append((
+                    row_no + 1, *self.song(song_no), row_no % per_song, row_no % per_song, f'song {song_no}',
+                    blob if key != 'title' else None, blob if key == 'title' else None
+                ))
+            mysql.executemany(f'INSERT INTO {table} VALUES (?,?,?,?,?,?,?,?)', rows)
+            self.rows[key] = n_rows
+        mysql.commit()
+        mysql.close()
+        return self.rows
+
+
+class FakeDatabase:
+    """common.mysql_common.Database 대체 (SQLite, muse 스키마 attach)"""
+    _mysql_path = None
+    _muse_path = None
+    _local = threading.local()
+
+    @staticmethod
+    def _connection():
+        if getattr(FakeDatabase._local, 'connection', None) is None:
+            connection = sqlite3.connect(FakeDatabase._mysql_path)
+            connection.execute(f"ATTACH DATABASE '{FakeDatabase._muse_path}' AS muse")
+            FakeDatabase._local.connection = connection
+        return FakeDatabase._local.connection
+
+    @staticmethod
+    def execute_query(query, params=None, fetchone=False, fetchall=False, count_row=False, last_id=False):
+        try:
+            cursor = FakeDatabase._connection().cursor()
+            cursor.execute(query.replace('%s', '?'), params or [])
+            if fetchone:
+                result = cursor.fetchone()
+            elif fetchall:
+                result = cursor.fetchall()
+            elif count_row:
+                result = [cursor.rowcount, cursor.lastrowid] if last_id else cursor.rowcount
+            else:
+                result = None
+            return result, 200
+        except Exception as e:
+            return e, 500
+
+
+class FakeOracleDB:
+    """common.oracle_common.OracleDB 대체 (SQLite, MIBIS 스키마 attach)"""
+    _mibis_path = None
+    _local = threading.local()
+    _pool_initialized = False
+
+    # SQLite 수식 깊이 제한(1000) 때문에 SearchDAO의 긴 OR 조건을 IN (VALUES ...)로 변환
+    _song_term = r"\(A\.DISC_COMM_SEQ=(\d+) AND A\.TRACK_NO='([^']*)'\)"
+    _disc_term = r"\(DISC_COMM_SEQ=(\d+)\)"
+
+    @staticmethod
+    def _collapse_or_chain(query, term, columns):
+        values = re.findall(term, query)
+        if len(values) < 2:
+            return query, []
+        chain = re.compile(f"{term}(?:\\s+OR\\s+{term})*")
+        placeholders = ','.join(['(' + ','.join(['?'] * len(columns)) + ')'] * len(values))
+        query = chain.sub(lambda _: f"({', '.join(columns)}) IN (VALUES {placeholders})", query, count=1)
+        # 첫 컬럼(DISC_COMM_SEQ)은 숫자 컬럼이므로 int로 바인딩
+        rows = [(row,) if isinstance(row, str) else row for row in values]
+        params = [value for row in rows for value in (int(row[0]), *row[1:])]
+        return query, params
+
+    @staticmethod
+    def initialize_pool():
+        FakeOracleDB._pool_initialized = True
+
+    @staticmethod
+    def close_pool():
+        FakeOracleDB._pool_initialized = False
+
+    @staticmethod
+    def is_pool_initialized() -> bool:
+        return FakeOracleDB._pool_initialized
+
+    @staticmethod
+    def execute_query(query, params=None):
+        if getattr(FakeOracleDB._local, 'connection', None) is None:
+            connection = sqlite3.connect(':memory:')
+            connection.execute(f"ATTACH DATABASE '{FakeOracleDB._mibis_path}' AS MIBIS")
+            FakeOracleDB._local.connection = connection
+
+        query, chain_params = FakeOracleDB._collapse_or_chain(query, FakeOracleDB._song_term, ['A.DISC_COMM_SEQ', 'A.TRACK_NO'])
+        if not chain_params:
+            query, chain_params = FakeOracleDB._collapse_or_chain(query, FakeOracleDB._disc_term, ['DISC_COMM_SEQ'])
+
+        cursor = FakeOracleDB._local.connection.cursor()
+        cursor.execute(query, chain_params or params or [])
+        columns = [col[0].lower() for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def install(base_path, catalog):
+    """server/app 모듈 import 전에 config / DB 모듈을 로컬 대체 구현으로 등록"""
+    index_path = f'{base_path}/index'
+    log_path = f'{base_path}/logs'
+    for path in (index_path, log_path):
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+    config = types.ModuleType('config')
+    config.API_NAME = 'MUSE LOADTEST'
+    config.BASE_LOG_PATH = log_path
+    config.INDEX_PATH = index_path
+    config.DATABASE_CONFIG = [{}]
+    config.ORACLE_DATABASE_CONFIG = {'host': 'localhost', 'port': 1521, 'service_name': 'loadtest', 'user_name': '', 'password': ''}
+    config.ORACLE_DATABASE_PATH = None
+    config.REDIS_CONFIG = {}
+    sys.modules['config'] = config
+
+    FakeDatabase._mysql_path = catalog.mysql_path
+    FakeDatabase._muse_path = catalog.muse_path
+    FakeOracleDB._mibis_path = catalog.mibis_path
+
+    mysql_module = types.ModuleType('common.mysql_common')
+    mysql_module.Database = FakeDatabase
+    sys.modules['common.mysql_common'] = mysql_module
+
+    oracle_module = types.ModuleType('common.oracle_common')
+    oracle_module.OracleDB = FakeOracleDB
+    sys.modules['common.oracle_common'] = oracle_module
+    return index_path
+
+
+def build_indices(index_path, catalog, vectors):
+    """key별 합성 벡터로 IVF-Flat 인덱스 생성 (FAISS id = MySQL idx - 1)"""
+    import faiss
+
+    for key, (_, model, _) in catalog.tables.items():
+        xb = vectors.catalog(model, catalog.rows[key], seed=catalog.seed)
+        nlist = max(1, int(np.sqrt(len(xb))))
+        index = faiss.index_factory(xb.shape[1], f'IVF{nlist},Flat')
+        index.train(xb)
+        index.add(xb)
+        index.nprobe = min(16, nlist)
+        faiss.write_index(index, f'{index_path}/muse_{key}.index')
+
+
+def install_redis(catalog, playlist_id, ratio=0.1, seed=0):
+    """RedisClient를 fakeredis로 교체하고 playlist include_ids 등록"""
+    import fakeredis
+    from common.redis_common import RedisClient
+
+    RedisClient._client = fakeredis.FakeRedis()
+    rng = np.random.default_rng(seed)
+    for key, n_rows in catalog.rows.items():
+        include_ids = sorted(rng.choice(n_rows, size=max(1, int(n_rows * ratio)), replace=False).tolist())
+        RedisClient.get_client().set(f"playlist_idx:{playlist_id}_{key}", json.dumps(include_ids))
@@ -0,0 +1,97 @@
+"""
+open-loop 부하 발생기
+
+목표 QPS에 맞춰 요청 시작 시각을 고정(응답 대기와 무관)하고,
+endpoint별 latency 히스토그램 / 백분위 / 처리량 / 오류 수를 집계
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+
+# latency 히스토그램 bucket 상한 (ms), 마지막은 +Inf
+BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class EndpointStats:
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms, ok):
+        with self._lock:
+            self.latencies.append(latency_ms)
+            if not ok:
+                self.errors += 1
+
+    def report(self, duration):
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+        counts = np.histogram(latencies, bins=[0] + BUCKETS_MS + [np.inf])[0] if self.latencies else np.zeros(len(BUCKETS_MS) + 1)
+        return {
+            'requests': len(self.latencies),
+            'errors': self.errors,
+            'throughput_rps': round(len(self.latencies) / duration, 2),
+            'p50_ms': round(float(np.percentile(latencies, 50)), 1),
+            'p90_ms': round(float(np.percentile(latencies, 90)), 1),
+            'p99_ms': round(float(np.percentile(latencies, 99)), 1),
+            'max_ms': round(float(latencies.max()), 1),
+            'histogram_ms': {
+                **{f'le_{bucket}': int(count) for bucket, count in zip(BUCKETS_MS, counts)},
+                'le_inf': int(counts[-1])
+            }
+        }
+
+
+class LoadGenerator:
+    """
+    endpoints: [{'name', 'path', 'weight', 'bodies': [json body, ...]}]
+    """
+
+    def __init__(self, base_url, endpoints, qps, duration, max_workers=256, timeout=60, seed=0):
+        self.base_url = base_url.rstrip('/')
+        self.endpoints = endpoints
+        self.qps = qps
+        self.duration = duration
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.stats = {endpoint['name']: EndpointStats(endpoint['name']) for endpoint in endpoints}
+        self.late = 0
+
+    def _send(self, endpoint, body):
+        start = time.perf_counter()
+        try:
+            response = requests.post(f'{self.base_url}{endpoint["path"]}', json=body, timeout=self.timeout)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        self.stats[endpoint['name']].record((time.perf_counter() - start) * 1000, ok)
+
+    def run(self):
+        weights = [endpoint['weight'] for endpoint in self.endpoints]
+        total = int(self.qps * self.duration)
+        interval = 1.0 / self.qps
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for i in range(total):
+                delay = start + i * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -interval:
+                    # 스케줄보다 늦게 발사된 요청 수 (발생기 자체가 병목인지 확인용)
+                    self.late += 1
+                endpoint = self.rng.choices(self.endpoints, weights=weights)[0]
+                executor.submit(self._send, endpoint, self.rng.choice(endpoint['bodies']))
+        elapsed = time.perf_counter() - start
+
+        return {
+            'target_qps': self.qps,
+            'duration_sec': round(elapsed, 2),
+            'late_requests': self.late,
+            'endpoints': {name: stats.report(elapsed) for name, stats in self.stats.items()}
+        }
@@ -0,0 +1,133 @@
+"""
+MUSE 검색 서버 end-to-end 부하 테스트
+
+LLM / 임베딩 / MySQL / Oracle / Redis를 로컬 대체 구현으로 띄우고
+실제 FastAPI 앱(server/app)을 uvicorn으로 실행한 뒤 목표 QPS로 요청을 보내
+endpoint별 latency 히스토그램과 처리량을 JSON으로 저장
+
+사용 예)
+    cd server && python loadtest/run_loadtest.py --qps 20 --duration 60 --output ./loadtest/results/qps20.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_backends import SyntheticVectors, FakeCatalog, install, build_indices, install_redis
+from loadgen import LoadGenerator
+from stubs import SCENARIOS, LLMStub, EmbeddingStub
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app')
+PLAYLIST_ID = 'loadtest'
+
+
+def make_endpoints(catalog, mix):
+    texts = list(SCENARIOS)
+    moods = [[], ['calm'], ['happy', 'romantic']]
+    text_bodies = [{'text': text, 'mood': mood} for text in texts for mood in moods]
+    similar_bodies = []
+    for song_no in range(0, catalog.n_songs, max(1, catalog.n_songs // 200)):
+        disccommseq, trackno = catalog.song(song_no)
+        similar_bodies.append({'disccommseq': disccommseq, 'trackno': trackno})
+
+    endpoints = {
+        'text': {'path': '/search/text', 'bodies': text_bodies},
+        'text_playlist': {'path': '/search/text_playlist', 'bodies': [{**body, 'playlist_id': PLAYLIST_ID} for body in text_bodies]},
+        'similar': {'path': '/search/similar', 'bodies': similar_bodies}
+    }
+    return [{'name': name, 'weight': weight, **endpoints[name]} for name, weight in mix.items() if weight > 0]
+
+
+def wait_ready(base_url, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f'{base_url}/health/ready', timeout=1).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def _mix(value):
+    # text=0.6,text_playlist=0.2,similar=0.2
+    return {name: float(weight) for name, weight in (item.split('=') for item in value.split(',') if item)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--qps', type=float, default=10, help='target requests per second')
+    parser.add_argument('--duration', type=int, default=60, help='load duration (sec)')
+    parser.add_argument('--output', type=str, required=True, help='result json path')
+    parser.add_argument('--songs', type=int, default=20000, help='synthetic catalog size')
+    parser.add_argument('--mix', type=_mix, default={'text': 0.6, 'text_playlist': 0.2, 'similar': 0.2}, help='endpoint weights')
+    parser.add_argument('--llm_latency', type=int, default=800, help='mean LLM parse latency (ms)')
+    parser.add_argument('--reason_latency', type=int, default=1500, help='mean LLM reason latency (ms)')
+    parser.add_argument('--embedding_latency', type=int, default=30, help='mean embedding latency (ms)')
+    parser.add_argument('--port', type=int, default=18000)
+    parser.add_argument('--workers', type=int, default=256, help='max in-flight requests of load generator')
+    parser.add_argument('--base_path', type=str, default=None, help='work dir (default: temp dir)')
+    args = parser.parse_args()
+
+    base_path = args.base_path or tempfile.mkdtemp(prefix='muse_loadtest_')
+    print(f'work dir: {base_path}')
+
+    # 1. 합성 카탈로그 + 로컬 DB / 인덱스 / Redis
+    vectors = SyntheticVectors()
+    catalog = FakeCatalog(base_path, n_songs=args.songs, vectors=vectors)
+    print(f'catalog rows: {catalog.build()}')
+    index_path = install(base_path, catalog)
+    build_indices(index_path, catalog, vectors)
+
+    sys.path.insert(0, APP_PATH)
+    install_redis(catalog, playlist_id=PLAYLIST_ID)
+
+    # 2. LLM / 임베딩 stub
+    llm = LLMStub(latency_ms=args.llm_latency, reason_latency_ms=args.reason_latency).start()
+    embedding = EmbeddingStub(vectors, latency_ms=args.embedding_latency).start()
+
+    from common.llm_common import MuseLLM
+    from services.embedding_service import EmbeddingService
+    MuseLLM._gemma_url = f'{llm.url}/v1/chat/completions'
+    MuseLLM._oss_url = f'{llm.url}/v1/chat/completions'
+    for model, info in EmbeddingService.embedding_requests_info.items():
+        info['url'] = f'{embedding.url}/embedding/{model}'
+
+    # 3. 서버 기동
+    import uvicorn
+    from main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=args.port, log_level='warning'))
+    server_thread = threading.Thread(target=server.run, daemon=True)
+    server_thread.start()
+
+    base_url = f'http://127.0.0.1:{args.port}'
+    if not wait_ready(base_url, timeout=300):
+        print('server not ready')
+        sys.exit(1)
+
+    # 4. 부하 발생
+    generator = LoadGenerator(base_url, make_endpoints(catalog, args.mix), qps=args.qps, duration=args.duration, max_workers=args.workers)
+    report = generator.run()
+    report.update({
+        'catalog': {'songs': args.songs, 'rows': catalog.rows},
+        'stub_latency_ms': {'llm': args.llm_latency, 'reason': args.reason_latency, 'embedding': args.embedding_latency}
+    })
+
+    server.should_exit = True
+    server_thread.join(timeout=10)
+    llm.stop()
+    embedding.stop()
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(json.dumps(report['endpoints'], indent=2, ensure_ascii=False))
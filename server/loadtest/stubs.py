@@ -0,0 +1,144 @@
+"""
+부하 테스트용 HTTP stub 서버
+
+- LLM: OpenAI 호환 /v1/chat/completions, 쿼리 텍스트별 고정 파싱 결과를 지연시간과 함께 반환
+- 임베딩: /embedding/bgem3, /embedding/clap, 텍스트 해시 기반 결정적 벡터 반환
+"""
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 부하 테스트 쿼리 → LLM 파싱 결과 (MuseLLM 시스템 프롬프트의 JSON 스키마)
+SCENARIOS = {
+    '아이유 노래': {
+        'artist': ['아이유', 'iu'], 'title': [], 'album_name': [], 'region': [], 'genre': [], 'mood': [],
+        'popular': [False], 'year': [], 'vibe': [], 'lyrics': [], 'lyrics_summary': [], 'case': 0
+    },
+    '아이유 좋은날': {
+        'artist': ['아이유', 'iu'], 'title': ['좋은날', 'good day'], 'album_name': [], 'region': [], 'genre': [], 'mood': [],
+        'popular': [False], 'year': [], 'vibe': [], 'lyrics': [], 'lyrics_summary': [], 'case': 2
+    },
+    '90년대 유행한 국내 힙합': {
+        'artist': [], 'title': [], 'album_name': [], 'region': ['국내'], 'genre': ['힙합'], 'mood': [],
+        'popular': [True], 'year': [1990, 1999], 'vibe': ['energetic korean hip hop with punchy drums'],
+        'lyrics': [], 'lyrics_summary': [], 'case': 3
+    },
+    '비오는 날 듣기 좋은 재즈': {
+        'artist': [], 'title': ['비', 'rain'], 'album_name': [], 'region': ['전체'], 'genre': ['재즈'], 'mood': ['calm'],
+        'popular': [False], 'year': [],
+        'vibe': ['relaxing jazz for rainy days', 'soft piano and brush drums', 'mellow saxophone ballad'],
+        'lyrics': [], 'lyrics_summary': [], 'case': 6
+    },
+    '니가 없는 거리에는 라는 가사 들어간 노래': {
+        'artist': [], 'title': [], 'album_name': [], 'region': [], 'genre': [], 'mood': [],
+        'popular': [False], 'year': [], 'vibe': [], 'lyrics': ['니가 없는 거리에는'], 'lyrics_summary': [], 'case': 9
+    },
+    '버터플라이 앨범': {
+        'artist': [], 'title': [], 'album_name': ['버터플라이', 'butterfly'], 'region': [], 'genre': [], 'mood': [],
+        'popular': [False], 'year': [], 'vibe': [], 'lyrics': [], 'lyrics_summary': [], 'case': 10
+    }
+}
+
+DEFAULT_SCENARIO = {
+    'artist': [], 'title': [], 'album_name': [], 'region': [], 'genre': [], 'mood': [],
+    'popular': [False], 'year': [], 'vibe': ['calm acoustic music'], 'lyrics': [], 'lyrics_summary': [], 'case': 6
+}
+
+
+class _Latency:
+    """평균 latency 기준 ±jitter 비율로 균등 분포 지연"""
+
+    def __init__(self, mean_ms, jitter=0.3):
+        self.mean_ms = mean_ms
+        self.jitter = jitter
+
+    def sleep(self):
+        if self.mean_ms > 0:
+            time.sleep(self.mean_ms * random.uniform(1 - self.jitter, 1 + self.jitter) / 1000)
+
+
+def _handler(route):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            status, response = route(self.path, body)
+            payload = json.dumps(response).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+    return Handler
+
+
+class StubServer:
+    def __init__(self, route, host='127.0.0.1', port=0):
+        self.server = ThreadingHTTPServer((host, port), _handler(route))
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+
+
+class LLMStub(StubServer):
+    """OpenAI 호환 chat completions stub"""
+    _query_pattern = re.compile(r'쿼리: (.*), 무드:')
+
+    def __init__(self, latency_ms=800, reason_latency_ms=1500, **kwargs):
+        self.latency = _Latency(latency_ms)
+        self.reason_latency = _Latency(reason_latency_ms)
+        super().__init__(self.route, **kwargs)
+
+    def route(self, path, body):
+        if not path.endswith('/v1/chat/completions'):
+            return 404, {'error': path}
+        messages = body.get('messages', [])
+
+        if len(messages) < 2:
+            # MuseLLM.get_reason (system 프롬프트만 전달)
+            self.reason_latency.sleep()
+            content = json.dumps({'description': ['부하 테스트용 추천 사유입니다.']}, ensure_ascii=False)
+        else:
+            self.latency.sleep()
+            match = self._query_pattern.search(messages[1].get('content', ''))
+            text = match.group(1).strip() if match else ''
+            content = json.dumps(SCENARIOS.get(text, DEFAULT_SCENARIO), ensure_ascii=False)
+
+        return 200, {
+            'id': 'loadtest',
+            'object': 'chat.completion',
+            'model': body.get('model'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}]
+        }
+
+
+class EmbeddingStub(StubServer):
+    """/embedding/{bgem3|clap} stub (SyntheticVectors.query 결과 반환)"""
+
+    def __init__(self, vectors, latency_ms=30, **kwargs):
+        self.vectors = vectors
+        self.latency = _Latency(latency_ms)
+        super().__init__(self.route, **kwargs)
+
+    def route(self, path, body):
+        model = path.rstrip('/').rsplit('/', 1)[-1]
+        if model not in self.vectors.dimensions:
+            return 404, {'error': path}
+        self.latency.sleep()
+        return 200, {'results': self.vectors.query(model, body.get('text', '')).tolist()}